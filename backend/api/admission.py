@@ -0,0 +1,304 @@
+import json
+import random
+import threading
+import time
+
+import numpy as np
+from django.conf import settings
+from scipy.optimize import nnls
+
+from .logic.compact_graph import CompactGraph
+from .logic.connectivity import ConnectivitySolver
+from .logic.graph_engine import GraphAnalyzer
+from .logic.hamiltonian import DEFAULT_MAX_VERTICES, DEFAULT_TIME_BUDGET
+from .logic.invariants import InvariantsSolver
+from .logic.pathfinding import FLOYD_HISTORY_MODES, PathFinder
+
+# --- Модель вартості ---
+# Оцінка часу операції - лінійна комбінація ознак графа (V, E, щільність,
+# орієнтованість) з невід'ємними коефіцієнтами (секунди на одиницю ознаки)
+
+
+def _max_edges(V, is_directed):
+    return V * (V - 1) if is_directed else V * (V - 1) // 2
+
+
+def _connectivity_features(V, E, is_directed):
+    # Повний граф (щільність 1) і тривіальні графи не доходять до max-flow
+    if V < 3 or E >= _max_edges(V, is_directed):
+        return [0]
+    # Есфаханіан-Хакімі: ~V + δ²/2 пар, кожна - потік за O(V + E);
+    # δ оцінюється зверху середнім степенем неорієнтованої основи
+    degree = min(2 * E / V, V - 1)
+    return [(V + degree * degree / 2) * (V + E)]
+
+
+FEATURES = {
+    'base': lambda V, E, d: [V + E],
+    'floyd/final': lambda V, E, d: [V ** 3, V ** 2],
+    'floyd/delta': lambda V, E, d: [V ** 3, V ** 2],
+    'floyd/full': lambda V, E, d: [V ** 3, V ** 2],
+    # Дейкстра з кожної вершини; V^2 - формування матриць відповіді
+    'apsp/dijkstra': lambda V, E, d: [V * (V + E) * np.log2(V + 1), V ** 2],
+    'dense_matrices': lambda V, E, d: [V * V + V * E],
+    # Повний режим /analyze/: рядки по вершинах і розріджені матриці у відповіді
+    'analyze/full': lambda V, E, d: [V + E],
+    'connectivity': _connectivity_features,
+    # Початкові межі точного методу: O(V^2) кроків з бітовими масками довжини V
+    'invariants': lambda V, E, d: [V ** 2, V ** 3],
+}
+
+# Виміряно `manage.py calibrate_costs` (Python 3.11, NumPy 2.x)
+DEFAULT_COEFFICIENTS = {
+    'base': [1.6e-06],
+    'floyd/final': [1.8e-09, 7.9e-07],
+    'floyd/delta': [2e-08, 1.4e-05],
+    'floyd/full': [3.6e-07, 5.4e-06],
+    'apsp/dijkstra': [1.6e-09, 7.4e-07],
+    'dense_matrices': [1.1e-07],
+    'analyze/full': [3.7e-06],
+    'connectivity': [2.6e-07],
+    'invariants': [1.2e-06, 1.2e-09],
+}
+
+
+class CostModel:
+    def __init__(self, coefficients=None):
+        self.coefficients = {**DEFAULT_COEFFICIENTS, **(coefficients or {})}
+
+    def estimate(self, op, V, E, is_directed=False):
+        """Оцінка часу операції op у секундах"""
+        features = FEATURES[op](V, E, is_directed)
+        return float(sum(c * f for c, f in zip(self.coefficients[op], features)))
+
+
+# --- Рішення про допуск: виконати, спростити (degrade) або відхилити ---
+
+MATRIX_FIELDS = ('adjacency_matrix', 'incidence_matrix')
+# Поля, що у повному режимі дають O(V + E) у відповіді (режим large їх стискає або пропускає)
+LIST_FIELDS = MATRIX_FIELDS + ('adjacency_list', 'degrees')
+
+
+class AdmissionRejected(Exception):
+    """Навіть найдешевший варіант запиту перевищує ліміт часу"""
+
+    def __init__(self, decision):
+        super().__init__(decision['error'])
+        self.decision = decision
+
+
+def _floyd_plans(options):
+    """Варіанти Флойда від запитаного до найдешевшого: full -> delta -> final"""
+    history = options['history']
+    if history not in FLOYD_HISTORY_MODES:
+        return [({}, options)]
+    start = FLOYD_HISTORY_MODES.index(history)
+    return [({'history': h} if h != history else {}, {**options, 'history': h})
+            for h in FLOYD_HISTORY_MODES[start:]]
+
+
+def _analyze_plans(options):
+    """Запитаний варіант, далі розріджені матриці, далі без κ/λ, далі режим великого графа"""
+    plans = [({}, options)]
+    if options['mode'] == 'large':
+        return plans
+    changes = {}
+    if options['matrix_format'] == 'dense' and any(f in options['fields'] for f in MATRIX_FIELDS):
+        changes = {'matrix_format': 'csr'}
+        plans.append((changes, {**options, **changes}))
+    if 'connectivity' in options['fields']:
+        fields = [f for f in options['fields'] if f != 'connectivity']
+        plans.append(({**changes, 'skipped_fields': ['connectivity']},
+                      {**options, **changes, 'fields': fields}))
+    plans.append(({'mode': 'large'}, {**options, 'mode': 'large'}))
+    return plans
+
+
+def _solve_plans(options):
+    """Запитаний варіант, далі жадібні оцінки інваріантів замість точних"""
+    plans = [({}, options)]
+    if 'invariants' in options['fields'] and not options['approximate_invariants']:
+        plans.append(({'approximate_invariants': True}, {**options, 'approximate_invariants': True}))
+    return plans
+
+
+def _floyd_cost(model, V, E, is_directed, options):
+    history = options['history'] if options['history'] in FLOYD_HISTORY_MODES else 'final'
+    return model.estimate('base', V, E) + model.estimate(f'floyd/{history}', V, E, is_directed)
+
+
+def _apsp_cost(model, V, E, is_directed, options):
+    floyd = model.estimate('floyd/final', V, E, is_directed)
+    dijkstra = model.estimate('apsp/dijkstra', V, E, is_directed)
+    # 'auto' обирає дешевший метод; Джонсон - та сама Дейкстра після перезважування
+    costs = {'floyd': floyd, 'dijkstra': dijkstra, 'johnson': dijkstra}
+    return model.estimate('base', V, E) + costs.get(options['method'], min(floyd, dijkstra))
+
+
+def _analyze_cost(model, V, E, is_directed, options):
+    cost = model.estimate('base', V, E)
+    if options['mode'] == 'large':
+        return cost
+    if any(f in options['fields'] for f in LIST_FIELDS):
+        cost += model.estimate('analyze/full', V, E, is_directed)
+    if options['matrix_format'] == 'dense' and any(f in options['fields'] for f in MATRIX_FIELDS):
+        cost += model.estimate('dense_matrices', V, E, is_directed)
+    if 'connectivity' in options['fields']:
+        cost += model.estimate('connectivity', V, E, is_directed)
+    return cost
+
+
+def _solve_cost(model, V, E, is_directed, options):
+    cost = model.estimate('base', V, E)
+    # Переборні задачі обмежені лімітом часу, тож до оцінки додається сам ліміт
+    if 'hamilton' in options['fields'] and 0 < V <= DEFAULT_MAX_VERTICES:
+        cost += DEFAULT_TIME_BUDGET
+    if 'invariants' in options['fields'] and not options['approximate_invariants']:
+        cost += DEFAULT_TIME_BUDGET + model.estimate('invariants', V, E, is_directed)
+    return cost
+
+
+PLANNERS = {
+    'floyd': (_floyd_plans, _floyd_cost),
+    'apsp': (lambda options: [({}, options)], _apsp_cost),
+    'analyze': (_analyze_plans, _analyze_cost),
+    'solve': (_solve_plans, _solve_cost),
+}
+
+
+def admit(endpoint, V, E, is_directed, options, model=None, max_seconds=None):
+    """Параметри, з якими запит буде виконано, та звіт про рішення.
+
+    Повертає (options, decision); decision['decision'] - 'run' або 'degrade'.
+    Якщо жоден варіант не вкладається в ліміт - AdmissionRejected.
+    """
+    config = getattr(settings, 'GRAPH_ADMISSION', {})
+    if endpoint not in PLANNERS or not config.get('ENABLED', True):
+        return options, None
+    model = model or get_cost_model()
+    if max_seconds is None:
+        max_seconds = config.get('MAX_SECONDS', 10)
+
+    plans, cost = PLANNERS[endpoint]
+    requested = None
+    for changes, candidate in plans(options):
+        estimate = cost(model, V, E, is_directed, candidate)
+        if requested is None:
+            requested = estimate
+        if estimate <= max_seconds:
+            decision = {
+                'decision': 'degrade' if changes else 'run',
+                'estimated_ms': round(estimate * 1000, 1),
+                'limit_ms': round(max_seconds * 1000, 1),
+            }
+            if changes:
+                decision.update(requested_estimated_ms=round(requested * 1000, 1), changes=changes)
+            return candidate, decision
+
+    raise AdmissionRejected({
+        'decision': 'reject',
+        'estimated_ms': round(estimate * 1000, 1),
+        'requested_estimated_ms': round(requested * 1000, 1),
+        'limit_ms': round(max_seconds * 1000, 1),
+        'error': f"Запит завеликий: оцінка часу {requested:.1f} с перевищує ліміт {max_seconds:.0f} с "
+                 f"(V={V}, E={E})",
+    })
+
+
+# --- Калібрування за реальним часом виконання ---
+
+
+def _calibration_graph(V, degree, rng):
+    """Два випадкові Гамільтонові цикли (δ >= 2, без точок зчленування) і
+    випадкові ребра до середнього степеня degree - κ рахується через max-flow"""
+    pairs = set()
+    for _ in range(2):
+        order = list(range(V))
+        rng.shuffle(order)
+        pairs.update((min(u, v), max(u, v)) for u, v in zip(order, order[1:] + order[:1]))
+    while len(pairs) < V * degree // 2:
+        u, v = rng.randrange(V), rng.randrange(V)
+        if u != v:
+            pairs.add((min(u, v), max(u, v)))
+    nodes = [{'id': i} for i in range(V)]
+    edges = [{'id': k, 'from': u, 'to': v, 'weight': rng.randint(1, 20)} for k, (u, v) in enumerate(sorted(pairs))]
+    return nodes, edges
+
+
+def _render(result):
+    return json.dumps(result, ensure_ascii=False)
+
+
+# Операція -> (розміри (V, середній степінь) для вимірювання, функція від графа)
+CALIBRATION = {
+    'base': ([(1000, 4), (5000, 8), (20000, 8)], None),
+    'floyd/final': ([(100, 6), (200, 6), (300, 6)],
+                    lambda g: _render(PathFinder(None, None, graph=g).run_floyd_warshall('final'))),
+    'floyd/delta': ([(100, 6), (200, 6), (300, 6)],
+                    lambda g: _render(PathFinder(None, None, graph=g).run_floyd_warshall('delta'))),
+    'floyd/full': ([(60, 6), (100, 6), (140, 6)],
+                   lambda g: _render(PathFinder(None, None, graph=g).run_floyd_warshall('full'))),
+    'apsp/dijkstra': ([(500, 6), (1000, 6), (1000, 80), (2000, 6)],
+                      lambda g: _render(PathFinder(None, None, graph=g).run_apsp('dijkstra'))),
+    'dense_matrices': ([(200, 6), (400, 10), (800, 10)], lambda g: _render([
+        GraphAnalyzer(None, None, graph=g).get_adjacency_matrix(),
+        GraphAnalyzer(None, None, graph=g).get_incidence_matrix(),
+    ])),
+    'analyze/full': ([(5000, 8), (20000, 8), (50000, 8)], lambda g: _render(
+        GraphAnalyzer(None, None, graph=g, matrix_format='csr').get_all_properties(list(LIST_FIELDS))
+    )),
+    'connectivity': ([(200, 8), (400, 10), (800, 10)], lambda g: ConnectivitySolver(g).run(1)),
+    'invariants': ([(300, 6), (600, 6), (1200, 6)], lambda g: InvariantsSolver(g, time_budget=0.01).run()),
+}
+
+
+def calibrate(ops=None, seed=0, log=None):
+    """Вимірює операції на згенерованих графах і підбирає коефіцієнти (NNLS)"""
+    rng = random.Random(seed)
+    coefficients = {}
+    for op, (sizes, run) in CALIBRATION.items():
+        if ops and op not in ops:
+            continue
+        rows, timings = [], []
+        for V, degree in sizes:
+            nodes, edges = _calibration_graph(V, degree, rng)
+            started = time.perf_counter()
+            graph = CompactGraph.from_payload(nodes, edges)
+            if run is not None:
+                started = time.perf_counter()
+                run(graph)
+            elapsed = time.perf_counter() - started
+            rows.append(FEATURES[op](V, len(edges), False))
+            timings.append(elapsed)
+            if log:
+                log(op, V, len(edges), elapsed)
+        # Відносна похибка: кожен рядок ділиться на виміряний час
+        A = np.array(rows, dtype=float) / np.array(timings)[:, None]
+        solution, _ = nnls(A, np.ones(len(timings)))
+        coefficients[op] = [float(f'{c:.2g}') for c in solution]
+    return coefficients
+
+
+def save_coefficients(coefficients, path):
+    # Операції, яких не калібрували, лишаються з коефіцієнтами за замовчуванням
+    with open(path, 'w', encoding='utf-8') as f:
+        json.dump({'coefficients': coefficients}, f, indent=2)
+
+
+_model = None
+_model_lock = threading.Lock()
+
+
+def get_cost_model():
+    """Модель з коефіцієнтами за замовчуванням або з файлу settings.GRAPH_ADMISSION['COST_MODEL']"""
+    global _model
+    if _model is None:
+        with _model_lock:
+            if _model is None:
+                path = getattr(settings, 'GRAPH_ADMISSION', {}).get('COST_MODEL')
+                coefficients = None
+                if path:
+                    with open(path, encoding='utf-8') as f:
+                        coefficients = json.load(f)['coefficients']
+                _model = CostModel(coefficients)
+    return _model
@@ -0,0 +1,124 @@
+import asyncio
+import json
+
+from django.http import HttpResponse
+from django.utils.decorators import method_decorator
+from django.views import View
+from django.views.decorators.csrf import csrf_exempt
+
+from .cache import get_result_cache
+from .admission import AdmissionRejected
+from .executor import QueueFull, WorkerCrashed, get_compute_executor
+from .graph_store import GraphNotFound
+from .singleflight import get_single_flight
+from .logic import timing
+from .views import (
+    admission_header, analyze_task, apsp_task, dijkstra_task, floyd_task, solve_task, task_call, task_key,
+    traverse_task, with_admission
+)
+
+
+def json_response(payload, status=200):
+    return HttpResponse(
+        json.dumps(payload, ensure_ascii=False),
+        status=status,
+        content_type='application/json'
+    )
+
+
+def _lookup(task, data):
+    """Ключ кешу та збережений результат (None при промаху) - виконується в потоці"""
+    key = task_key(task, data)
+    return key, get_result_cache().get(key)
+
+
+async def run_task(data, task):
+    """Відповідь із кешу або обчислення в пулі процесів; хешування, (де)серіалізація
+    кешу та рендеринг JSON - у потоках, щоб не блокувати цикл подій"""
+    key, result = await asyncio.to_thread(_lookup, task, data)
+    state = 'HIT'
+    if result is None:
+        func, args = task_call(task)
+
+        async def compute():
+            # Для збереженого графа процес пулу сам читає його зі сховища
+            value = await get_compute_executor().run(func, *args)
+            await asyncio.to_thread(get_result_cache().set, key, value)
+            return value
+
+        # Однакові одночасні запити (і з синхронних views) чекають на одне обчислення
+        flight = get_single_flight()
+        result, shared = await flight.do_async(key, compute) if flight else (await compute(), False)
+        state = 'SHARED' if shared else 'MISS'
+    with timing.phase('render'):
+        body = await asyncio.to_thread(json.dumps, with_admission(result, task.admission), ensure_ascii=False)
+    response = HttpResponse(body, content_type='application/json')
+    response['X-Cache'] = state
+    if task.admission:
+        response['X-Admission'] = admission_header(task.admission)
+    return response
+
+
+@method_decorator(csrf_exempt, name='dispatch')
+class AsyncTaskView(View):
+    """Асинхронний варіант ендпоінта з тим самим форматом запиту і відповіді.
+
+    Запит розбирається в циклі подій і проходить контроль допуску (422 для
+    завеликих), обчислення виконується в обмеженому пулі процесів
+    (ComputeExecutor): коли черга пулу заповнена - 429.
+    Якщо клієнт відключається, Django під ASGI скасовує view, а разом
+    з нею і процес, що виконує обчислення.
+    """
+    http_method_names = ['post', 'options']
+    task = None
+
+    async def post(self, request, **kwargs):
+        try:
+            data = json.loads(request.body or b'{}')
+            task = await asyncio.to_thread(self.task, data, **kwargs)
+        except GraphNotFound as e:
+            return json_response({"error": str(e)}, status=404)
+        except AdmissionRejected as e:
+            return json_response({"error": str(e), "admission": e.decision}, status=422)
+        except (KeyError, TypeError, ValueError) as e:
+            return json_response({"error": str(e)}, status=400)
+        try:
+            return await run_task(data, task)
+        except QueueFull as e:
+            response = json_response({"error": str(e)}, status=429)
+            response['Retry-After'] = '1'
+            return response
+        except WorkerCrashed as e:
+            return json_response({"error": str(e)}, status=500)
+        except ValueError as e:
+            return json_response({"error": str(e)}, status=400)
+
+
+class AsyncAnalyzeGraphView(AsyncTaskView):
+    task = staticmethod(analyze_task)
+
+
+class AsyncSolveGraphView(AsyncTaskView):
+    task = staticmethod(solve_task)
+
+
+class AsyncDijkstraView(AsyncTaskView):
+    task = staticmethod(dijkstra_task)
+
+
+class AsyncFloydView(AsyncTaskView):
+    task = staticmethod(floyd_task)
+
+
+class AsyncApspView(AsyncTaskView):
+    task = staticmethod(apsp_task)
+
+
+class AsyncTraverseView(AsyncTaskView):
+    """Обхід DFS/BFS; потоковий протокол "delta" - лише через синхронний /traverse/"""
+
+    @staticmethod
+    def task(data, type):
+        if data.get('protocol') == 'delta':
+            raise ValueError("Потоковий протокол доступний лише через /api/traverse/")
+        return traverse_task(data, type)
@@ -0,0 +1,127 @@
+import multiprocessing
+import threading
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+from concurrent.futures.process import BrokenProcessPool
+
+from django.conf import settings
+
+from .logic.compact_graph import CompactGraph
+
+BATCH_ORDERS = ('input', 'completed')
+
+
+class BatchItem:
+    """Один граф пакета: розбирається один раз і спільний для всіх операцій над ним
+    (CompactGraph кешує CSR, степені та індекси між операціями)."""
+
+    def __init__(self, graph_data):
+        self.graph = CompactGraph.from_payload(
+            graph_data.get('nodes', []),
+            graph_data.get('edges', []),
+            graph_data.get('is_directed', False)
+        )
+
+    def run(self, func, args):
+        """Функція ендпоінта (run_analyze, run_floyd, ...) над розібраним графом;
+        args - її аргументи після nodes і edges"""
+        return func(None, None, *args, graph=self.graph)
+
+
+def run_item(index, item):
+    """Виконує обчислення одного елемента: item = {"graph": {...}, "calls": [(номер
+    операції, функція, аргументи), ...]}; помилка операції не зупиняє решту"""
+    results = []
+    if not item['calls']:
+        return {'index': index, 'results': results}
+    try:
+        batch_item = BatchItem(item['graph'])
+    except Exception as e:
+        return {'index': index, 'error': str(e)}
+    for slot, func, args in item['calls']:
+        try:
+            results.append({'slot': slot, 'result': batch_item.run(func, args)})
+        except Exception as e:
+            results.append({'slot': slot, 'error': str(e)})
+    return {'index': index, 'results': results}
+
+
+def run_chunk(chunk):
+    """Виконує групу елементів у процесі пулу (менше накладних витрат на IPC)"""
+    return [run_item(index, item) for index, item in chunk]
+
+
+class BatchRunner:
+    """Розподіляє елементи пакета між процесами пулу групами по chunk_size"""
+
+    def __init__(self, max_workers=2, chunk_size=16, start_method='spawn'):
+        self.max_workers = max_workers
+        self.chunk_size = chunk_size
+        self.start_method = start_method
+        self._executor = None
+        self._lock = threading.Lock()
+
+    def _get_executor(self):
+        with self._lock:
+            if self._executor is None:
+                self._executor = ProcessPoolExecutor(
+                    max_workers=self.max_workers,
+                    mp_context=multiprocessing.get_context(self.start_method)
+                )
+            return self._executor
+
+    def _reset(self):
+        with self._lock:
+            if self._executor is not None:
+                self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
+
+    def run(self, items, order='input'):
+        """Генератор результатів run_item: у порядку надходження ('input') або завершення ('completed')"""
+        indexed = list(enumerate(items))
+        chunks = [indexed[i:i + self.chunk_size] for i in range(0, len(indexed), self.chunk_size)]
+        if not chunks:
+            return
+        executor = self._get_executor()
+        futures = {executor.submit(run_chunk, chunk): chunk for chunk in chunks}
+        try:
+            if order == 'completed':
+                pending = set(futures)
+                while pending:
+                    done, pending = wait(pending, return_when=FIRST_COMPLETED)
+                    for future in done:
+                        yield from self._chunk_results(future, futures[future])
+            else:
+                for future, chunk in futures.items():
+                    yield from self._chunk_results(future, chunk)
+        finally:
+            # Клієнт відключився або генератор закрито - решту груп не виконуємо
+            for future in futures:
+                future.cancel()
+
+    def _chunk_results(self, future, chunk):
+        try:
+            return future.result()
+        except BrokenProcessPool:
+            self._reset()
+            return [{'index': index, 'error': "Процес пулу завершився аварійно"} for index, _ in chunk]
+        except Exception as e:
+            return [{'index': index, 'error': str(e)} for index, _ in chunk]
+
+
+_runner = None
+_runner_lock = threading.Lock()
+
+
+def get_batch_runner():
+    """Спільний пул для пакетних запитів, налаштований через settings.GRAPH_BATCH"""
+    global _runner
+    if _runner is None:
+        with _runner_lock:
+            if _runner is None:
+                config = getattr(settings, 'GRAPH_BATCH', {})
+                _runner = BatchRunner(
+                    max_workers=config.get('MAX_WORKERS', 2),
+                    chunk_size=config.get('CHUNK_SIZE', 16),
+                    start_method=config.get('START_METHOD', 'spawn'),
+                )
+    return _runner
@@ -0,0 +1,198 @@
+import json
+import platform
+import random
+import statistics
+import time
+import tracemalloc
+from datetime import datetime, timezone
+
+import numpy as np
+
+from .logic import pathfinding, traversals
+from .logic.graph_engine import GraphAnalyzer
+from .logic.solvers import run_solve
+
+# --- Генератори графів (детерміновані за seed) ---
+# Кожен повертає (nodes, edges) у форматі запиту фронтенду
+
+
+def _payload(n, pairs, rng, weighted=True):
+    nodes = [{'id': i, 'label': f"v{i}"} for i in range(n)]
+    edges = [
+        {'id': k, 'from': u, 'to': v, 'weight': rng.randint(1, 20) if weighted else 1, 'hasWeight': weighted}
+        for k, (u, v) in enumerate(pairs)
+    ]
+    return nodes, edges
+
+
+def gnp_graph(n, p, rng):
+    """Випадковий граф Ердеша-Реньї G(n, p)"""
+    pairs = [(u, v) for u in range(n) for v in range(u + 1, n) if rng.random() < p]
+    return _payload(n, pairs, rng)
+
+
+def grid_graph(rows, cols, rng):
+    pairs = []
+    for r in range(rows):
+        for c in range(cols):
+            u = r * cols + c
+            if c + 1 < cols:
+                pairs.append((u, u + 1))
+            if r + 1 < rows:
+                pairs.append((u, u + cols))
+    return _payload(rows * cols, pairs, rng)
+
+
+def complete_graph(n, rng):
+    return _payload(n, [(u, v) for u in range(n) for v in range(u + 1, n)], rng)
+
+
+def random_tree(n, rng):
+    """Випадкове рекурсивне дерево: кожна вершина приєднується до попередньої"""
+    return _payload(n, [(rng.randrange(v), v) for v in range(1, n)], rng)
+
+
+def multigraph_with_loops(n, m, rng):
+    """Випадкові кратні ребра і петлі"""
+    return _payload(n, [(rng.randrange(n), rng.randrange(n)) for _ in range(m)], rng)
+
+
+def random_dag(n, p, rng):
+    """Орієнтований ациклічний граф: дуги лише з меншого номера в більший"""
+    return gnp_graph(n, p, rng)
+
+
+# Сімейства графів: генератор, орієнтованість і параметри для кожного рівня розміру
+FAMILIES = {
+    'gnp': (False, {
+        'small': lambda rng: gnp_graph(20, 0.2, rng),
+        'medium': lambda rng: gnp_graph(200, 0.05, rng),
+        'large': lambda rng: gnp_graph(1500, 0.004, rng),
+    }),
+    'grid': (False, {
+        'small': lambda rng: grid_graph(4, 5, rng),
+        'medium': lambda rng: grid_graph(15, 15, rng),
+        'large': lambda rng: grid_graph(40, 40, rng),
+    }),
+    'complete': (False, {
+        'small': lambda rng: complete_graph(8, rng),
+        'medium': lambda rng: complete_graph(40, rng),
+        'large': lambda rng: complete_graph(150, rng),
+    }),
+    'tree': (False, {
+        'small': lambda rng: random_tree(20, rng),
+        'medium': lambda rng: random_tree(300, rng),
+        'large': lambda rng: random_tree(3000, rng),
+    }),
+    'multigraph': (False, {
+        'small': lambda rng: multigraph_with_loops(15, 40, rng),
+        'medium': lambda rng: multigraph_with_loops(150, 600, rng),
+        'large': lambda rng: multigraph_with_loops(1500, 6000, rng),
+    }),
+    'dag': (True, {
+        'small': lambda rng: random_dag(20, 0.2, rng),
+        'medium': lambda rng: random_dag(200, 0.05, rng),
+        'large': lambda rng: random_dag(1500, 0.004, rng),
+    }),
+}
+
+TIERS = ('small', 'medium', 'large')
+
+# Повна історія Флойда на великих графах - це V знімків V x V, тож там лише 'final'
+FLOYD_HISTORY = {'small': 'full', 'medium': 'delta', 'large': 'final'}
+
+
+def entry_points(tier):
+    """Публічні точки входу: назва -> функція (nodes, edges, is_directed)"""
+    return {
+        'analyze': lambda nodes, edges, d: GraphAnalyzer(nodes, edges, d).get_all_properties(),
+        'floyd': lambda nodes, edges, d: pathfinding.run_floyd(nodes, edges, d, FLOYD_HISTORY[tier]),
+        'apsp': lambda nodes, edges, d: pathfinding.run_apsp(nodes, edges, d),
+        'dijkstra': lambda nodes, edges, d: pathfinding.run_dijkstra(
+            nodes, edges, d, nodes[0]['id'], nodes[-1]['id']),
+        'dfs': lambda nodes, edges, d: traversals.run_dfs(nodes, edges, d, nodes[0]['id']),
+        'bfs': lambda nodes, edges, d: traversals.run_bfs(nodes, edges, d, nodes[0]['id']),
+        'solve': lambda nodes, edges, d: run_solve(nodes, edges, d),
+    }
+
+
+def _measure(func, args, repeat):
+    """Медіана та мінімум часу (мс) за repeat запусків і пік пам'яті (КБ) окремим запуском"""
+    timings = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        func(*args)
+        timings.append((time.perf_counter() - started) * 1000)
+
+    # tracemalloc уповільнює код, тому пам'ять міряється окремо від часу
+    tracemalloc.start()
+    try:
+        func(*args)
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    return {
+        'median_ms': round(statistics.median(timings), 3),
+        'min_ms': round(min(timings), 3),
+        'peak_kb': round(peak / 1024, 1),
+    }
+
+
+def run_benchmarks(tiers=TIERS, families=None, entries=None, repeat=3, seed=0, log=None):
+    """Прогін усіх комбінацій сімейство/рівень/точка входу; повертає JSON-сумісний словник"""
+    results = {}
+    for family, (is_directed, generators) in FAMILIES.items():
+        if families and family not in families:
+            continue
+        for tier in tiers:
+            # Окремий генератор на кожну комбінацію - граф не залежить від фільтрів
+            rng = random.Random(f"{seed}/{family}/{tier}")
+            nodes, edges = generators[tier](rng)
+            for entry, func in entry_points(tier).items():
+                if entries and entry not in entries:
+                    continue
+                key = f"{family}/{tier}/{entry}"
+                stats = _measure(func, (nodes, edges, is_directed), repeat)
+                results[key] = {'V': len(nodes), 'E': len(edges), **stats}
+                if log:
+                    log(key, results[key])
+    return {
+        'meta': {
+            'created': datetime.now(timezone.utc).isoformat(timespec='seconds'),
+            'python': platform.python_version(),
+            'numpy': np.__version__,
+            'seed': seed,
+            'repeat': repeat,
+        },
+        'results': results,
+    }
+
+
+def compare(baseline, current, threshold=0.2, min_time_ms=1.0):
+    """Порівняння з базовою лінією: список (ключ, метрика, було, стало, відношення, регресія).
+
+    Час коротший за min_time_ms занадто шумний і регресією не вважається.
+    """
+    rows = []
+    for key, now in current['results'].items():
+        before = baseline['results'].get(key)
+        if before is None:
+            continue
+        for metric in ('median_ms', 'peak_kb'):
+            old, new = before[metric], now[metric]
+            ratio = new / old if old else float('inf') if new else 1.0
+            regressed = ratio > 1 + threshold
+            if metric == 'median_ms' and new < min_time_ms:
+                regressed = False
+            rows.append((key, metric, old, new, ratio, regressed))
+    return rows
+
+
+def save(report, path):
+    with open(path, 'w', encoding='utf-8') as f:
+        json.dump(report, f, ensure_ascii=False, indent=2)
+
+
+def load(path):
+    with open(path, encoding='utf-8') as f:
+        return json.load(f)
@@ -0,0 +1,225 @@
+import hashlib
+import json
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from contextlib import contextmanager
+
+from django.conf import settings
+
+
+def canonical_key(endpoint, nodes, edges, is_directed, params=None):
+    """Хеш канонічного представлення запиту (граф + ендпоінт + параметри).
+
+    Порядок вершин і ребер зберігається, бо від нього залежить вигляд
+    відповіді (порядок рядків/стовпців матриць, протоколи обходів). Значення
+    беруться як є, з їхніми JSON-типами: 1 і "1" дають різні ключі, бо
+    відповідь повертає ID вершин і ребер у тому типі, в якому їх надіслано.
+    """
+    payload = {
+        'endpoint': endpoint,
+        'nodes': [[n.get('id'), n.get('label')] for n in nodes],
+        'edges': [
+            [e.get('id'), e.get('from'), e.get('to'), e.get('weight', 1), e.get('hasWeight', False)]
+            for e in edges
+        ],
+        'is_directed': bool(is_directed),
+        'params': params or {},
+    }
+    raw = json.dumps(payload, sort_keys=True, separators=(',', ':'), ensure_ascii=False, default=str)
+    return hashlib.sha256(raw.encode('utf-8')).hexdigest()
+
+
+def stored_graph_key(endpoint, digest, params=None):
+    """Ключ кешу для графа зі сховища: вміст графа представлений його хешем"""
+    payload = {'endpoint': endpoint, 'graph': digest, 'params': params or {}}
+    raw = json.dumps(payload, sort_keys=True, separators=(',', ':'), ensure_ascii=False, default=str)
+    return hashlib.sha256(raw.encode('utf-8')).hexdigest()
+
+
+def isomorphic_key(endpoint, fingerprint, params=None):
+    """Ключ кошика результатів для графів з однаковим відбитком Вейсфейлера-Лемана"""
+    payload = {'endpoint': endpoint, 'isomorphic': fingerprint, 'params': params or {}}
+    raw = json.dumps(payload, sort_keys=True, separators=(',', ':'), ensure_ascii=False, default=str)
+    return hashlib.sha256(raw.encode('utf-8')).hexdigest()
+
+
+class MemoryBackend:
+    """LRU у пам'яті процесу з обмеженням кількості записів та сумарного розміру"""
+
+    def __init__(self, max_entries=512, max_bytes=64 * 1024 * 1024):
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self._data = OrderedDict()
+        self._bytes = 0
+        self._lock = threading.Lock()
+        self.evictions = 0
+
+    def get(self, key):
+        with self._lock:
+            blob = self._data.get(key)
+            if blob is not None:
+                self._data.move_to_end(key)
+            return blob
+
+    def set(self, key, blob):
+        if len(blob) > self.max_bytes:
+            return
+        with self._lock:
+            old = self._data.pop(key, None)
+            if old is not None:
+                self._bytes -= len(old)
+            self._data[key] = blob
+            self._bytes += len(blob)
+            while len(self._data) > self.max_entries or self._bytes > self.max_bytes:
+                _, evicted = self._data.popitem(last=False)
+                self._bytes -= len(evicted)
+                self.evictions += 1
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+            self._bytes = 0
+
+    def size(self):
+        return len(self._data), self._bytes
+
+
+class SQLiteBackend:
+    """Локальний файловий кеш на SQLite (спільний для кількох процесів)"""
+
+    def __init__(self, path, max_entries=4096, max_bytes=512 * 1024 * 1024):
+        self.path = str(path)
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.evictions = 0
+        with self._connect() as conn:
+            conn.execute(
+                'CREATE TABLE IF NOT EXISTS result_cache ('
+                'key TEXT PRIMARY KEY, value BLOB NOT NULL, size INTEGER NOT NULL, accessed REAL NOT NULL)'
+            )
+            conn.execute('CREATE INDEX IF NOT EXISTS result_cache_accessed ON result_cache (accessed)')
+
+    @contextmanager
+    def _connect(self):
+        conn = sqlite3.connect(self.path, timeout=5)
+        try:
+            with conn:
+                yield conn
+        finally:
+            conn.close()
+
+    def get(self, key):
+        with self._connect() as conn:
+            row = conn.execute('SELECT value FROM result_cache WHERE key = ?', (key,)).fetchone()
+            if row is None:
+                return None
+            conn.execute('UPDATE result_cache SET accessed = ? WHERE key = ?', (time.time(), key))
+            return bytes(row[0])
+
+    def set(self, key, blob):
+        if len(blob) > self.max_bytes:
+            return
+        with self._connect() as conn:
+            conn.execute(
+                'INSERT OR REPLACE INTO result_cache (key, value, size, accessed) VALUES (?, ?, ?, ?)',
+                (key, blob, len(blob), time.time())
+            )
+            count, total = conn.execute('SELECT COUNT(*), COALESCE(SUM(size), 0) FROM result_cache').fetchone()
+            # Витісняємо найдавніше використані записи, доки не вкладемося в ліміти
+            while count > self.max_entries or total > self.max_bytes:
+                oldest = conn.execute(
+                    'SELECT key, size FROM result_cache ORDER BY accessed LIMIT 1'
+                ).fetchone()
+                if oldest is None:
+                    break
+                conn.execute('DELETE FROM result_cache WHERE key = ?', (oldest[0],))
+                count, total = count - 1, total - oldest[1]
+                self.evictions += 1
+
+    def clear(self):
+        with self._connect() as conn:
+            conn.execute('DELETE FROM result_cache')
+
+    def size(self):
+        with self._connect() as conn:
+            count, total = conn.execute('SELECT COUNT(*), COALESCE(SUM(size), 0) FROM result_cache').fetchone()
+            return count, total
+
+
+class ResultCache:
+    """Кеш результатів API з лічильниками влучань і промахів"""
+
+    def __init__(self, backend):
+        self.backend = backend
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        blob = self.backend.get(key)
+        with self._lock:
+            if blob is None:
+                self.misses += 1
+                return None
+            self.hits += 1
+        return json.loads(blob)
+
+    def set(self, key, result):
+        blob = json.dumps(result, ensure_ascii=False, separators=(',', ':')).encode('utf-8')
+        self.backend.set(key, blob)
+
+    def get_or_compute(self, key, compute, flight=None):
+        """Повертає (результат, стан): 'HIT', 'MISS' або 'SHARED' - результат
+        однакового одночасного обчислення, до якого приєднався запит (flight - SingleFlight)"""
+        result = self.get(key)
+        if result is not None:
+            return result, 'HIT'
+
+        def compute_and_store():
+            value = compute()
+            self.set(key, value)
+            return value
+
+        if flight is None:
+            return compute_and_store(), 'MISS'
+        result, shared = flight.do(key, compute_and_store)
+        return result, 'SHARED' if shared else 'MISS'
+
+    def stats(self):
+        entries, size = self.backend.size()
+        return {
+            'backend': type(self.backend).__name__,
+            'hits': self.hits,
+            'misses': self.misses,
+            'evictions': self.backend.evictions,
+            'entries': entries,
+            'bytes': size,
+        }
+
+    def clear(self):
+        self.backend.clear()
+
+
+def _create_cache():
+    config = getattr(settings, 'GRAPH_RESULT_CACHE', {})
+    kind = config.get('BACKEND', 'memory')
+    limits = {key.lower(): config[key] for key in ('MAX_ENTRIES', 'MAX_BYTES') if key in config}
+    if kind == 'sqlite':
+        return ResultCache(SQLiteBackend(config['PATH'], **limits))
+    return ResultCache(MemoryBackend(**limits))
+
+
+_cache = None
+_cache_lock = threading.Lock()
+
+
+def get_result_cache():
+    """Спільний екземпляр кешу, налаштований через settings.GRAPH_RESULT_CACHE"""
+    global _cache
+    if _cache is None:
+        with _cache_lock:
+            if _cache is None:
+                _cache = _create_cache()
+    return _cache
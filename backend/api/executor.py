@@ -0,0 +1,196 @@
+import asyncio
+import multiprocessing
+import threading
+from collections import deque
+
+from django.conf import settings
+
+from .logic import timing
+
+
+class QueueFull(Exception):
+    """Усі обчислювачі зайняті, а черга очікування заповнена"""
+
+
+class WorkerCrashed(Exception):
+    """Процес-обчислювач завершився, не повернувши результату"""
+
+
+def _serve(conn):
+    """Цикл процесу-обчислювача: (функція, аргументи) -> (статус, значення, фази, розміри)"""
+    while True:
+        try:
+            func, args = conn.recv()
+        except EOFError:
+            return
+        timings, token = timing.start()
+        try:
+            status, value = 'ok', func(*args)
+        except Exception as e:
+            status, value = 'error', str(e)
+        finally:
+            timing.stop(token)
+        conn.send((status, value, timings.phases, timings.sizes))
+
+
+class _Worker:
+    """Постійний дочірній процес; стартує під час першого виклику"""
+
+    def __init__(self, context):
+        self.context = context
+        self.process = None
+        self.conn = None
+        self.closed = False
+        self._lock = threading.Lock()
+
+    def _start(self):
+        with self._lock:
+            if self.closed:
+                raise EOFError
+            if self.process is None:
+                self.conn, child = self.context.Pipe()
+                self.process = self.context.Process(target=_serve, args=(child,), daemon=True)
+                self.process.start()
+                child.close()
+
+    def call(self, func, args):
+        """Блокуючий виклик - виконується в потоці, не в циклі подій"""
+        self._start()
+        self.conn.send((func, args))
+        return self.conn.recv()
+
+    def alive(self):
+        return not self.closed and (self.process is None or self.process.is_alive())
+
+    def close(self):
+        # Потік, що чекає у call(), отримає EOFError після завершення процесу
+        with self._lock:
+            self.closed = True
+            process = self.process
+        if process is not None and process.is_alive():
+            process.kill()
+            process.join(1)
+
+
+class ComputeExecutor:
+    """Обмежений пул постійних процесів для обчислень асинхронних ендпоінтів.
+
+    Одночасно виконується не більше max_workers викликів, ще max_queued
+    чекають на вільний слот, решта отримує QueueFull. Процеси переживають
+    запити (без витрат на запуск для кожного), але скасування корутини -
+    напр. коли клієнт відключився - вбиває процес разом із обчисленням.
+    Стан синхронізується потоковими примітивами, тож пул можна ділити між
+    різними циклами подій (async_to_sync під WSGI створює власний цикл).
+    """
+
+    def __init__(self, max_workers=2, max_queued=16, start_method='spawn'):
+        self.max_workers = max_workers
+        self.max_queued = max_queued
+        self._context = multiprocessing.get_context(start_method)
+        self._lock = threading.Lock()
+        self._busy = 0
+        self._idle = []
+        self._waiters = deque()
+        self.rejected = 0
+        self.cancelled = 0
+
+    async def run(self, func, *args):
+        """func(*args) в процесі пулу; помилка обчислення - ValueError з її текстом"""
+        with timing.phase('queue'):
+            await self._acquire()
+        with self._lock:
+            worker = self._idle.pop() if self._idle else _Worker(self._context)
+        try:
+            status, value, phases, sizes = await asyncio.to_thread(worker.call, func, args)
+        except asyncio.CancelledError:
+            worker.close()
+            self._release(None)
+            with self._lock:
+                self.cancelled += 1
+            raise
+        except (EOFError, OSError):
+            worker.close()
+            self._release(None)
+            raise WorkerCrashed("Процес обчислення завершився аварійно")
+        self._release(worker)
+        # Фази, виміряні в дочірньому процесі, - в метрики поточного запиту
+        timing.merge(phases, sizes)
+        if status == 'error':
+            raise ValueError(value)
+        return value
+
+    async def _acquire(self):
+        with self._lock:
+            if self._busy < self.max_workers:
+                self._busy += 1
+                return
+            if len(self._waiters) >= self.max_queued:
+                self.rejected += 1
+                raise QueueFull("Сервер перевантажений, спробуйте пізніше")
+            loop = asyncio.get_running_loop()
+            waiter = loop.create_future()
+            entry = (loop, waiter)
+            self._waiters.append(entry)
+        try:
+            await waiter
+        except asyncio.CancelledError:
+            with self._lock:
+                queued = entry in self._waiters
+                if queued:
+                    self._waiters.remove(entry)
+            # Слот уже встигли передати - повертаємо його наступному
+            if not queued and waiter.done() and not waiter.cancelled():
+                self._release(None)
+            raise
+
+    def _grant(self, waiter):
+        if waiter.done():
+            # Очікувач скасований, поки слот передавався
+            self._release(None)
+        else:
+            waiter.set_result(None)
+
+    def _release(self, worker):
+        """Повертає процес у пул і передає слот першому з черги"""
+        with self._lock:
+            if worker is not None and worker.alive():
+                self._idle.append(worker)
+            while self._waiters:
+                loop, waiter = self._waiters.popleft()
+                try:
+                    loop.call_soon_threadsafe(self._grant, waiter)
+                    return
+                except RuntimeError:
+                    # Цикл подій очікувача вже закрито
+                    continue
+            self._busy -= 1
+
+    def stats(self):
+        with self._lock:
+            return {
+                'max_workers': self.max_workers,
+                'busy': self._busy,
+                'queued': len(self._waiters),
+                'idle_processes': len(self._idle),
+                'rejected': self.rejected,
+                'cancelled': self.cancelled,
+            }
+
+
+_executor = None
+_executor_lock = threading.Lock()
+
+
+def get_compute_executor():
+    """Спільний пул для асинхронних ендпоінтів, налаштований через settings.GRAPH_ASYNC"""
+    global _executor
+    if _executor is None:
+        with _executor_lock:
+            if _executor is None:
+                config = getattr(settings, 'GRAPH_ASYNC', {})
+                _executor = ComputeExecutor(
+                    max_workers=config.get('MAX_WORKERS', 2),
+                    max_queued=config.get('MAX_QUEUED', 16),
+                    start_method=config.get('START_METHOD', 'spawn'),
+                )
+    return _executor
@@ -0,0 +1,157 @@
+import hashlib
+import io
+import sqlite3
+import threading
+import time
+import uuid
+from collections import OrderedDict, namedtuple
+from contextlib import contextmanager
+
+import numpy as np
+from django.conf import settings
+
+from .logic.compact_graph import CompactGraph
+from .logic.timing import phase, record_graph
+
+# Метадані збереженого графа (без самих масивів); digest - хеш вмісту для ключів кешу
+GraphInfo = namedtuple('GraphInfo', 'id name is_directed nodes edges components digest size created')
+
+
+class GraphNotFound(Exception):
+    def __init__(self, graph_id):
+        super().__init__(f"Граф {graph_id} не знайдено у сховищі")
+        self.graph_id = graph_id
+
+
+def encode_graph(graph):
+    """Бінарний блоб (.npz без стиснення) і хеш вмісту графа"""
+    arrays = graph.to_arrays()
+    digest = hashlib.sha256()
+    for name in sorted(arrays):
+        array = np.ascontiguousarray(arrays[name])
+        digest.update(f'{name}:{array.dtype.str}:{array.shape}'.encode())
+        digest.update(array.tobytes())
+    buffer = io.BytesIO()
+    np.savez(buffer, **arrays)
+    return buffer.getvalue(), digest.hexdigest()
+
+
+def decode_graph(blob):
+    with np.load(io.BytesIO(blob), allow_pickle=False) as data:
+        return CompactGraph.from_arrays({name: data[name] for name in data.files})
+
+
+class GraphStore:
+    """Сховище графів на SQLite: масиви ребер і готові індекси одним блобом.
+
+    Графи незмінні; останні max_loaded розібраних графів тримаються в пам'яті
+    процесу (LRU), а перед видачею з LRU перевіряється, що граф не видалено.
+    """
+
+    COLUMNS = 'id, name, is_directed, nodes, edges, components, digest, size, created'
+
+    def __init__(self, path, max_loaded=8):
+        self.path = str(path)
+        self.max_loaded = max_loaded
+        self._loaded = OrderedDict()
+        self._lock = threading.Lock()
+        with self._connect() as conn:
+            conn.execute(
+                'CREATE TABLE IF NOT EXISTS graphs ('
+                'id TEXT PRIMARY KEY, name TEXT NOT NULL, is_directed INTEGER NOT NULL, '
+                'nodes INTEGER NOT NULL, edges INTEGER NOT NULL, components INTEGER NOT NULL, '
+                'digest TEXT NOT NULL, size INTEGER NOT NULL, created REAL NOT NULL, data BLOB NOT NULL)'
+            )
+
+    @contextmanager
+    def _connect(self):
+        conn = sqlite3.connect(self.path, timeout=5)
+        try:
+            with conn:
+                yield conn
+        finally:
+            conn.close()
+
+    @staticmethod
+    def _info(row):
+        graph_id, name, is_directed, nodes, edges, components, digest, size, created = row
+        return GraphInfo(graph_id, name, bool(is_directed), nodes, edges, components, digest, size, created)
+
+    def save(self, graph, name=''):
+        """Зберігає CompactGraph; повертає GraphInfo з новим id"""
+        blob, digest = encode_graph(graph)
+        info = GraphInfo(uuid.uuid4().hex, name, graph.is_directed, graph.n, graph.m,
+                         graph.components_count(), digest, len(blob), time.time())
+        with self._connect() as conn:
+            conn.execute(
+                f'INSERT INTO graphs ({self.COLUMNS}, data) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)',
+                (*info[:2], int(info.is_directed), *info[3:], blob)
+            )
+        return info
+
+    def info(self, graph_id):
+        with self._connect() as conn:
+            row = conn.execute(f'SELECT {self.COLUMNS} FROM graphs WHERE id = ?', (graph_id,)).fetchone()
+        return self._info(row) if row else None
+
+    def list(self):
+        with self._connect() as conn:
+            rows = conn.execute(f'SELECT {self.COLUMNS} FROM graphs ORDER BY created').fetchall()
+        return [self._info(row) for row in rows]
+
+    def load(self, graph_id):
+        """(GraphInfo, CompactGraph) без розбору JSON; GraphNotFound, якщо графа немає"""
+        info = self.info(graph_id)
+        if info is None:
+            with self._lock:
+                self._loaded.pop(graph_id, None)
+            raise GraphNotFound(graph_id)
+        with self._lock:
+            entry = self._loaded.get(graph_id)
+            if entry is not None:
+                self._loaded.move_to_end(graph_id)
+                return info, entry
+        with phase('load'):
+            with self._connect() as conn:
+                row = conn.execute('SELECT data FROM graphs WHERE id = ?', (graph_id,)).fetchone()
+            if row is None:
+                raise GraphNotFound(graph_id)
+            graph = decode_graph(bytes(row[0]))
+        record_graph(graph.n, graph.m)
+        with self._lock:
+            self._loaded[graph_id] = graph
+            while len(self._loaded) > self.max_loaded:
+                self._loaded.popitem(last=False)
+        return info, graph
+
+    def delete(self, graph_id):
+        with self._lock:
+            self._loaded.pop(graph_id, None)
+        with self._connect() as conn:
+            return conn.execute('DELETE FROM graphs WHERE id = ?', (graph_id,)).rowcount > 0
+
+
+def run_stored(path, graph_id, func, *args):
+    """func(*args, graph=...) над збереженим графом. Придатна і для пулу
+    процесів: граф читається з файла сховища, а не передається через IPC"""
+    _, graph = store_at(path).load(graph_id)
+    return func(*args, graph=graph)
+
+
+_stores = {}
+_stores_lock = threading.Lock()
+
+
+def store_at(path, max_loaded=8):
+    """Один екземпляр сховища на файл у кожному процесі (спільний LRU)"""
+    path = str(path)
+    with _stores_lock:
+        if path not in _stores:
+            _stores[path] = GraphStore(path, max_loaded)
+        return _stores[path]
+
+
+def get_graph_store():
+    """Спільне сховище, налаштоване через settings.GRAPH_STORE"""
+    config = getattr(settings, 'GRAPH_STORE', {})
+    return store_at(config.get('PATH', 'graph_store.sqlite3'), config.get('LOADED_GRAPHS', 8))
@@ -0,0 +1,64 @@
+from django.conf import settings
+
+from .cache import get_result_cache, isomorphic_key
+from .logic.compact_graph import CompactGraph
+from .logic.isomorphism import find_isomorphism, index_view, translate_solution, wl_colors
+from .logic.solvers import GraphSolvers
+from .logic.timing import phase
+
+
+def _config():
+    return {'ENABLED': True, 'MAX_VERTICES': 200, 'MAX_EDGES': 2000, 'BUCKET_SIZE': 4,
+            **getattr(settings, 'GRAPH_ISOMORPHIC_REUSE', {})}
+
+
+def _without_timings(result):
+    """Результат без виміряного часу розв'язувачів"""
+    result = dict(result)
+    if 'hamilton' in result:
+        result['hamilton'] = {k: v for k, v in result['hamilton'].items() if k != 'elapsed_ms'}
+    if 'details' in result.get('invariants', {}):
+        details = {name: {k: v for k, v in info.items() if k != 'elapsed_ms'}
+                   for name, info in result['invariants']['details'].items()}
+        result['invariants'] = {**result['invariants'], 'details': details}
+    return result
+
+
+def run_solve_reusing(nodes, edges, is_directed, fields=None, approximate_invariants=False, graph=None):
+    """/solve/ з повторним використанням результату для ізоморфного графа.
+
+    Результати зберігаються в кеші результатів у формі, незалежній від ID
+    (над index_view), у кошику за відбитком Вейсфейлера-Лемана. Збіг відбитка
+    лише пропонує кандидата: результат переноситься на новий граф тільки після
+    сертифікованого ізоморфізму, інакше задача розв'язується заново.
+    У перенесеному результаті немає elapsed_ms: час вимірювався для іншого
+    графа. Статуси exact/bounded описують сам результат і лишаються чинними.
+    """
+    if graph is None:
+        graph = CompactGraph.from_payload(nodes, edges, is_directed)
+    config = _config()
+    solve = lambda g: GraphSolvers(None, None, graph=g, approximate_invariants=approximate_invariants
+                                   ).get_all_solutions(fields)
+    if not config['ENABLED'] or not graph.n or graph.n > config['MAX_VERTICES'] or graph.m > config['MAX_EDGES']:
+        return solve(graph)
+
+    src, dst = graph.edge_src.tolist(), graph.edge_dst.tolist()
+    with phase('fingerprint'):
+        colors, fingerprint = wl_colors(graph.n, src, dst, graph.is_directed)
+    cache = get_result_cache()
+    key = isomorphic_key('solve', fingerprint, {'fields': fields, 'approximate_invariants': approximate_invariants})
+    bucket = cache.get(key) or []
+
+    for entry in bucket:
+        with phase('isomorphism'):
+            entry_colors, _ = wl_colors(entry['n'], entry['src'], entry['dst'], graph.is_directed)
+            mapping = find_isomorphism((entry['n'], entry['src'], entry['dst'], entry_colors),
+                                       (graph.n, src, dst, colors), graph.is_directed)
+        if mapping is not None:
+            return {**_without_timings(translate_solution(entry['solution'], graph, *mapping)),
+                    'isomorphic_reuse': True}
+
+    solution = solve(index_view(graph))
+    bucket = bucket + [{'n': graph.n, 'src': src, 'dst': dst, 'solution': solution}]
+    cache.set(key, bucket[-config['BUCKET_SIZE']:])
+    return translate_solution(solution, graph)
@@ -0,0 +1,224 @@
+import multiprocessing
+import threading
+import time
+import uuid
+
+from django.conf import settings
+
+from .cache import canonical_key, get_result_cache
+from .logic.graph_engine import GraphAnalyzer
+from .logic.hamiltonian import DEFAULT_TIME_BUDGET
+from .logic.solvers import GraphSolvers
+
+JOB_KINDS = {'solve': GraphSolvers, 'analyze': GraphAnalyzer}
+FINISHED = ('done', 'failed', 'cancelled', 'timeout')
+
+
+def _job_phases(kind, nodes, edges, is_directed, fields, time_budget):
+    """Генератор пар (назва фази, результат) - виконується в дочірньому процесі"""
+    if kind == 'solve':
+        # Гамільтонів пошук та інваріанти ділять ліміт задачі порівну
+        target = GraphSolvers(nodes, edges, is_directed, time_budget=time_budget)
+    else:
+        target = GraphAnalyzer(nodes, edges, is_directed)
+    # Кожна властивість - окрема фаза; порядок як у синхронній відповіді
+    for name in fields:
+        yield name, target.get_property(name)
+    yield 'computed_fields', fields
+
+
+def _worker(conn, kind, nodes, edges, is_directed, fields, time_budget):
+    """Точка входу дочірнього процесу: надсилає часткові результати по каналу"""
+    try:
+        for name, value in _job_phases(kind, nodes, edges, is_directed, fields, time_budget):
+            conn.send(('partial', name, value))
+        conn.send(('done', None, None))
+    except Exception as e:
+        conn.send(('failed', None, str(e)))
+    finally:
+        conn.close()
+
+
+class Job:
+    def __init__(self, kind, data, timeout):
+        self.id = uuid.uuid4().hex
+        self.kind = kind
+        self.nodes = data.get('nodes', [])
+        self.edges = data.get('edges', [])
+        self.is_directed = data.get('is_directed', False)
+        self.fields = JOB_KINDS[kind].select_fields(data.get('fields'))
+        self.timeout = timeout
+        self.status = 'queued'
+        self.partial = {}
+        self.result = None
+        self.error = None
+        self.created = time.monotonic()
+        self.started = None
+        self.finished = None
+        self.cancel_requested = False
+        # Номер зміни стану - для потокової видачі оновлень
+        self.revision = 0
+        self.changed = threading.Condition()
+
+    @property
+    def time_budget(self):
+        # Половина ліміту задачі на кожну з двох переборних задач
+        return self.timeout / 2
+
+    def cache_key(self):
+        """Ключ кешу результату. Аналіз збігається з синхронним /analyze/, а
+        розв'язок - лише з тим самим лімітом часу переборних задач: з іншим
+        лімітом межі та статуси можуть відрізнятися, тож ліміт входить у ключ"""
+        params = {} if self.fields == list(JOB_KINDS[self.kind].FIELDS) else {'fields': self.fields}
+        if self.kind == 'solve' and self.time_budget != DEFAULT_TIME_BUDGET:
+            params['time_budget'] = self.time_budget
+        return canonical_key(self.kind, self.nodes, self.edges, self.is_directed, params or None)
+
+    def _update(self, **fields):
+        with self.changed:
+            for key, value in fields.items():
+                setattr(self, key, value)
+            self.revision += 1
+            self.changed.notify_all()
+
+    def wait_change(self, revision, timeout):
+        """Чекає зміни стану після revision; повертає поточну ревізію"""
+        with self.changed:
+            self.changed.wait_for(lambda: self.revision != revision, timeout)
+            return self.revision
+
+    def snapshot(self):
+        end = self.finished or time.monotonic()
+        return {
+            'job_id': self.id,
+            'kind': self.kind,
+            'status': self.status,
+            'partial': dict(self.partial),
+            'result': self.result,
+            'error': self.error,
+            'elapsed_ms': round((end - self.started) * 1000, 3) if self.started else None,
+        }
+
+
+class JobManager:
+    """Фонові задачі в обмеженому пулі процесів з таймаутом і скасуванням.
+
+    Кожна задача виконується в окремому дочірньому процесі, тому її можна
+    примусово зупинити; одночасно працює не більше max_workers процесів,
+    решта чекає в черзі (не довшій за max_queued).
+    """
+
+    def __init__(self, max_workers=2, max_queued=32, default_timeout=60, keep_finished=600,
+                 start_method='spawn'):
+        self.max_queued = max_queued
+        self.default_timeout = default_timeout
+        self.keep_finished = keep_finished
+        self._slots = threading.BoundedSemaphore(max_workers)
+        self._context = multiprocessing.get_context(start_method)
+        self._jobs = {}
+        self._lock = threading.Lock()
+
+    def submit(self, kind, data, timeout=None):
+        """Повертає Job або None, якщо черга переповнена"""
+        if kind not in JOB_KINDS:
+            raise ValueError(f"Невідомий тип задачі: {kind}")
+        timeout = min(float(timeout or self.default_timeout), self.default_timeout)
+        job = Job(kind, data, timeout)
+        with self._lock:
+            self._cleanup()
+            queued = sum(1 for j in self._jobs.values() if j.status == 'queued')
+            if queued >= self.max_queued:
+                return None
+            self._jobs[job.id] = job
+        threading.Thread(target=self._supervise, args=(job,), daemon=True).start()
+        return job
+
+    def get(self, job_id):
+        with self._lock:
+            return self._jobs.get(job_id)
+
+    def cancel(self, job_id):
+        job = self.get(job_id)
+        if job is None:
+            return None
+        if job.status not in FINISHED:
+            job._update(cancel_requested=True)
+        return job
+
+    def _cleanup(self):
+        now = time.monotonic()
+        for job_id in [j.id for j in self._jobs.values()
+                       if j.finished and now - j.finished > self.keep_finished]:
+            del self._jobs[job_id]
+
+    def _supervise(self, job):
+        with self._slots:
+            if job.cancel_requested:
+                job._update(status='cancelled', finished=time.monotonic())
+                return
+            receiver, sender = self._context.Pipe(duplex=False)
+            process = self._context.Process(
+                target=_worker, args=(sender, job.kind, job.nodes, job.edges, job.is_directed, job.fields, job.time_budget),
+                daemon=True
+            )
+            try:
+                process.start()
+            except Exception as e:
+                job._update(status='failed', error=str(e), finished=time.monotonic())
+                return
+            finally:
+                sender.close()
+            job._update(status='running', started=time.monotonic())
+            deadline = job.started + job.timeout
+            outcome = None
+            try:
+                while outcome is None:
+                    if job.cancel_requested:
+                        outcome = ('cancelled', None)
+                    elif time.monotonic() > deadline:
+                        outcome = ('timeout', "Перевищено ліміт часу виконання задачі")
+                    elif receiver.poll(0.1):
+                        try:
+                            message, name, value = receiver.recv()
+                        except EOFError:
+                            outcome = ('failed', "Процес задачі завершився аварійно")
+                            continue
+                        if message == 'partial':
+                            job._update(partial={**job.partial, name: value})
+                        else:
+                            outcome = (message, value)
+            finally:
+                if process.is_alive():
+                    process.terminate()
+                process.join(1)
+                receiver.close()
+
+        status, error = outcome
+        if status == 'done':
+            result = dict(job.partial)
+            # Синхронний ендпоінт із тим самим графом і параметрами отримає результат із кешу
+            get_result_cache().set(job.cache_key(), result)
+            job._update(status='done', result=result, finished=time.monotonic())
+        else:
+            job._update(status=status, error=error, finished=time.monotonic())
+
+
+_manager = None
+_manager_lock = threading.Lock()
+
+
+def get_job_manager():
+    """Спільний менеджер задач, налаштований через settings.GRAPH_JOBS"""
+    global _manager
+    if _manager is None:
+        with _manager_lock:
+            if _manager is None:
+                config = getattr(settings, 'GRAPH_JOBS', {})
+                _manager = JobManager(
+                    max_workers=config.get('MAX_WORKERS', 2),
+                    max_queued=config.get('MAX_QUEUED', 32),
+                    default_timeout=config.get('TIMEOUT', 60),
+                    keep_finished=config.get('KEEP_FINISHED', 600),
+                    start_method=config.get('START_METHOD', 'spawn'),
+                )
+    return _manager
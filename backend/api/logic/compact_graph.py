@@ -0,0 +1,297 @@
+import json
+
+import networkx as nx
+import numpy as np
+from scipy.sparse import csr_matrix
+from scipy.sparse.csgraph import connected_components
+
+from .timing import phase, record_graph
+
+
+class CompactGraph:
+    """Компактне представлення графа на масивах (CSR).
+
+    Вершини індексуються цілими числами 0..n-1, ребра - 0..m-1 у порядку,
+    в якому вони прийшли з фронтенду. Для кожної вершини u її інцидентні
+    записи лежать у зрізі [offsets[u], offsets[u+1]) масивів neighbors,
+    adj_edges та adj_weights. Для неорієнтованого графа ребро записане в
+    рядках обох кінців (петля - один раз), для орієнтованого - лише у рядку
+    початку дуги, а вхідні дуги зберігаються окремо (in_offsets, ...).
+    """
+
+    def __init__(self, node_ids, raw_ids, labels, edge_src, edge_dst, edge_weight,
+                 edge_ids, has_weight, is_directed=False):
+        self.is_directed = is_directed
+        self.node_ids = node_ids
+        self.raw_ids = raw_ids
+        self.labels = labels
+        self.index = {n_id: i for i, n_id in enumerate(node_ids)}
+
+        self.edge_src = np.asarray(edge_src, dtype=np.int64)
+        self.edge_dst = np.asarray(edge_dst, dtype=np.int64)
+        self.edge_weight = np.asarray(edge_weight, dtype=np.float64)
+        self.has_weight = np.asarray(has_weight, dtype=bool)
+        # Оригінальні ID ребер (числа або рядки) - повертаються клієнту як є
+        self.edge_ids = edge_ids
+
+        self.offsets, self.neighbors, self.adj_edges = self._build_csr(
+            self.edge_src, self.edge_dst, both_ways=not is_directed
+        )
+        if is_directed:
+            self.in_offsets, self.in_neighbors, self.in_edges = self._build_csr(
+                self.edge_dst, self.edge_src, both_ways=False
+            )
+        else:
+            self.in_offsets, self.in_neighbors, self.in_edges = self.offsets, self.neighbors, self.adj_edges
+        self.adj_weights = self.edge_weight[self.adj_edges]
+        self._sorted_adjacency = None
+        self._degrees = {}
+        self._components = None
+
+    @classmethod
+    def from_payload(cls, nodes, edges, is_directed=False):
+        """Розбирає JSON-списки nodes/edges у компактний граф"""
+        with phase('build'):
+            graph = cls._parse_payload(nodes, edges, is_directed)
+        record_graph(graph.n, graph.m)
+        return graph
+
+    @classmethod
+    def _parse_payload(cls, nodes, edges, is_directed):
+        node_ids, raw_ids, labels, index = [], [], [], {}
+        for node in nodes:
+            n_id = str(node['id'])
+            label = node.get('label', f"v{node['id']}")
+            if n_id in index:
+                # Повторний ID лише оновлює мітку (як add_node у NetworkX)
+                labels[index[n_id]] = label
+                continue
+            index[n_id] = len(node_ids)
+            node_ids.append(n_id)
+            raw_ids.append(node['id'])
+            labels.append(label)
+
+        src, dst, weights, edge_ids, has_weight = [], [], [], [], []
+        for edge in edges:
+            u, v = index.get(str(edge.get('from'))), index.get(str(edge.get('to')))
+            # Ребра з невідомими кінцями ігноруються
+            if u is None or v is None:
+                continue
+            src.append(u)
+            dst.append(v)
+            weights.append(float(edge.get('weight', 1)))
+            edge_ids.append(edge.get('id'))
+            has_weight.append(bool(edge.get('hasWeight', False)))
+
+        return cls(node_ids, raw_ids, labels, src, dst, weights, edge_ids, has_weight, is_directed)
+
+    # --- Бінарне представлення для сховища графів ---
+
+    def to_arrays(self):
+        """Словник масивів NumPy: ребра та готові індекси (CSR, відсортована
+        суміжність, степені, мітки компонент) - відновлюється без побудови"""
+        raw_ids, raw_kind = _pack_values(self.raw_ids)
+        labels, labels_kind = _pack_values(self.labels)
+        edge_ids, edge_kind = _pack_values(self.edge_ids)
+        sorted_offsets, sorted_neighbors, sorted_edges = self.sorted_adjacency()
+        arrays = {
+            'meta': np.array([int(self.is_directed)], dtype=np.int64),
+            'kinds': np.array([raw_kind, labels_kind, edge_kind]),
+            'node_ids': np.array(self.node_ids, dtype=str),
+            'raw_ids': raw_ids,
+            'labels': labels,
+            'edge_ids': edge_ids,
+            'edge_src': self.edge_src,
+            'edge_dst': self.edge_dst,
+            'edge_weight': self.edge_weight,
+            'has_weight': self.has_weight,
+            'offsets': self.offsets,
+            'neighbors': self.neighbors,
+            'adj_edges': self.adj_edges,
+            'sorted_offsets': sorted_offsets,
+            'sorted_neighbors': sorted_neighbors,
+            'sorted_edges': sorted_edges,
+            'component_labels': self.component_labels()[1],
+        }
+        if self.is_directed:
+            arrays.update(in_offsets=self.in_offsets, in_neighbors=self.in_neighbors, in_edges=self.in_edges,
+                          out_degrees=self.out_degrees(), in_degrees=self.in_degrees())
+        else:
+            arrays['degrees'] = self.degrees()
+        return arrays
+
+    @classmethod
+    def from_arrays(cls, arrays):
+        """Граф із масивів to_arrays() без розбору JSON і перебудови індексів"""
+        graph = cls.__new__(cls)
+        raw_kind, labels_kind, edge_kind = arrays['kinds'].tolist()
+        graph.is_directed = bool(arrays['meta'][0])
+        graph.node_ids = arrays['node_ids'].tolist()
+        graph.raw_ids = _unpack_values(arrays['raw_ids'], raw_kind)
+        graph.labels = _unpack_values(arrays['labels'], labels_kind)
+        graph.edge_ids = _unpack_values(arrays['edge_ids'], edge_kind)
+        graph.index = {n_id: i for i, n_id in enumerate(graph.node_ids)}
+        for name in ('edge_src', 'edge_dst', 'edge_weight', 'has_weight', 'offsets', 'neighbors', 'adj_edges'):
+            setattr(graph, name, arrays[name])
+        if graph.is_directed:
+            graph.in_offsets, graph.in_neighbors, graph.in_edges = (
+                arrays['in_offsets'], arrays['in_neighbors'], arrays['in_edges'])
+            graph._degrees = {'out': arrays['out_degrees'], 'in': arrays['in_degrees']}
+        else:
+            graph.in_offsets, graph.in_neighbors, graph.in_edges = graph.offsets, graph.neighbors, graph.adj_edges
+            graph._degrees = {'total': arrays['degrees']}
+        graph.adj_weights = graph.edge_weight[graph.adj_edges]
+        graph._sorted_adjacency = arrays['sorted_offsets'], arrays['sorted_neighbors'], arrays['sorted_edges']
+        labels = arrays['component_labels']
+        graph._components = (int(labels.max()) + 1 if len(labels) else 0, labels)
+        return graph
+
+    def _build_csr(self, rows, cols, both_ways):
+        n = len(self.node_ids)
+        edge_idx = np.arange(len(rows), dtype=np.int64)
+        if both_ways:
+            # Чергуємо прямий і зворотний запис кожного ребра, щоб стабільне
+            # сортування зберегло порядок ребер усередині рядка
+            loops = rows == cols
+            r = np.column_stack((rows, cols)).ravel()
+            c = np.column_stack((cols, rows)).ravel()
+            e = np.repeat(edge_idx, 2)
+            keep = np.ones(len(r), dtype=bool)
+            keep[1::2] = ~loops
+            r, c, e = r[keep], c[keep], e[keep]
+        else:
+            r, c, e = rows, cols, edge_idx
+
+        order = np.argsort(r, kind='stable')
+        offsets = np.zeros(n + 1, dtype=np.int64)
+        np.cumsum(np.bincount(r, minlength=n), out=offsets[1:])
+        return offsets, c[order], e[order]
+
+    @property
+    def n(self):
+        return len(self.node_ids)
+
+    @property
+    def m(self):
+        return len(self.edge_ids)
+
+    def label(self, i):
+        return self.labels[i]
+
+    def row(self, u):
+        """Сусіди (наступники) вершини u та індекси відповідних ребер"""
+        start, end = self.offsets[u], self.offsets[u + 1]
+        return self.neighbors[start:end], self.adj_edges[start:end]
+
+    def unique_neighbors(self, u):
+        """Унікальні сусіди u у порядку першої появи з індексом першого ребра"""
+        first_edge = {}
+        neighbors, edge_idx = self.row(u)
+        for v, e in zip(neighbors.tolist(), edge_idx.tolist()):
+            if v not in first_edge:
+                first_edge[v] = e
+        return first_edge
+
+    def sorted_adjacency(self):
+        """Унікальні сусіди кожної вершини, відсортовані за лейблом (CSR).
+
+        Повертає (offsets, neighbors, edge_idx): для кожної пари (u, v)
+        залишається перше за порядком ребро, сусіди з однаковим лейблом
+        ідуть у порядку першої появи. Обчислюється один раз на граф.
+        """
+        if self._sorted_adjacency is None:
+            # Щільний ранг лейблів (рівні лейбли - рівний ранг)
+            rank = np.zeros(self.n, dtype=np.int64)
+            order = sorted(range(self.n), key=self.labels.__getitem__)
+            for prev, cur in zip(order, order[1:]):
+                rank[cur] = rank[prev] + (self.labels[cur] != self.labels[prev])
+
+            rows = np.repeat(np.arange(self.n, dtype=np.int64), np.diff(self.offsets))
+            cols, edges = self.neighbors, self.adj_edges
+            # Перше ребро для кожної пари (u, v)
+            first = np.lexsort((edges, cols, rows))
+            rows, cols, edges = rows[first], cols[first], edges[first]
+            keep = np.ones(len(rows), dtype=bool)
+            keep[1:] = (rows[1:] != rows[:-1]) | (cols[1:] != cols[:-1])
+            rows, cols, edges = rows[keep], cols[keep], edges[keep]
+
+            order = np.lexsort((edges, rank[cols], rows))
+            offsets = np.zeros(self.n + 1, dtype=np.int64)
+            np.cumsum(np.bincount(rows, minlength=self.n), out=offsets[1:])
+            self._sorted_adjacency = offsets, cols[order], edges[order]
+        return self._sorted_adjacency
+
+    def degrees(self):
+        """Степені вершин неорієнтованого графа (петля дає +2)"""
+        if 'total' not in self._degrees:
+            self._degrees['total'] = self.out_degrees() + self.in_degrees()
+        return self._degrees['total']
+
+    def out_degrees(self):
+        if 'out' not in self._degrees:
+            self._degrees['out'] = np.bincount(self.edge_src, minlength=self.n)
+        return self._degrees['out']
+
+    def in_degrees(self):
+        if 'in' not in self._degrees:
+            self._degrees['in'] = np.bincount(self.edge_dst, minlength=self.n)
+        return self._degrees['in']
+
+    def component_labels(self):
+        """(кількість компонент, мітка компоненти кожної вершини); для орієнтованих - слабка зв'язність"""
+        if self._components is None:
+            if not self.n:
+                self._components = 0, np.zeros(0, dtype=np.int32)
+            else:
+                count, labels = connected_components(self.to_scipy(), directed=False)
+                self._components = int(count), labels
+        return self._components
+
+    def components_count(self):
+        """Кількість компонент (для орієнтованих - слабка зв'язність)"""
+        return self.component_labels()[0]
+
+    def to_scipy(self):
+        """Розріджена матриця кількості ребер між вершинами (без дублювання петель)"""
+        ones = np.ones(len(self.neighbors), dtype=np.int64)
+        return csr_matrix((ones, self.neighbors, self.offsets), shape=(self.n, self.n))
+
+    def to_networkx(self):
+        """Мультиграф NetworkX для алгоритмів, ще не перенесених на масиви"""
+        G = nx.MultiDiGraph() if self.is_directed else nx.MultiGraph()
+        G.add_nodes_from(self.node_ids)
+        ids = self.node_ids
+        G.add_edges_from(
+            (ids[u], ids[v], {'weight': w, 'id': e_id})
+            for u, v, w, e_id in zip(self.edge_src.tolist(), self.edge_dst.tolist(),
+                                     self.edge_weight.tolist(), self.edge_ids)
+        )
+        return G
+
+    def to_undirected_networkx(self, multigraph=False):
+        """Неорієнтований граф NetworkX без петель (простий або мультиграф)"""
+        G = nx.MultiGraph() if multigraph else nx.Graph()
+        G.add_nodes_from(self.node_ids)
+        ids = self.node_ids
+        G.add_edges_from(
+            (ids[u], ids[v])
+            for u, v in zip(self.edge_src.tolist(), self.edge_dst.tolist()) if u != v
+        )
+        return G
+
+
+def _pack_values(values):
+    """ID чи лейбли як масив NumPy: цілі, рядки або (інші типи) JSON-рядки"""
+    if all(type(v) is int for v in values):
+        try:
+            return np.array(values, dtype=np.int64), 'int'
+        except OverflowError:
+            pass
+    elif all(type(v) is str for v in values):
+        return np.array(values, dtype=str), 'str'
+    return np.array([json.dumps(v, ensure_ascii=False) for v in values], dtype=str), 'json'
+
+
+def _unpack_values(array, kind):
+    values = array.tolist()
+    return [json.loads(v) for v in values] if kind == 'json' else values
@@ -0,0 +1,89 @@
+import numpy as np
+
+
+class EulerSolver:
+    """Ейлерові цикли та шляхи ітеративним алгоритмом Гірхольцера за O(V + E).
+
+    Працює прямо з CSR CompactGraph: кожне ребро (у тому числі кратне і петля)
+    має власний індекс, тож послідовність ID ребер отримується без пошуку.
+    Умови існування перевіряються за степенями (для орієнтованого графа -
+    баланс вхідних і вихідних дуг) та зв'язністю вершин з ненульовим степенем.
+    """
+
+    def __init__(self, graph):
+        self.graph = graph
+
+    def run(self):
+        """{'type': 'cycle' | 'path' | 'none', 'vertices': [...], 'edges': [...]} в індексах графа"""
+        none = {'type': 'none', 'vertices': [], 'edges': []}
+        g = self.graph
+        if not g.m:
+            return none
+
+        if g.is_directed:
+            out_deg, in_deg = g.out_degrees(), g.in_degrees()
+            active = (out_deg + in_deg) > 0
+        else:
+            degrees = g.degrees()
+            active = degrees > 0
+
+        # Усі вершини з ребрами мають бути в одній (слабкій) компоненті
+        _, component = g.component_labels()
+        if len(np.unique(component[active])) != 1:
+            return none
+
+        if g.is_directed:
+            balance = out_deg - in_deg
+            unbalanced = np.flatnonzero(balance)
+            if not len(unbalanced):
+                kind, start = 'cycle', int(np.flatnonzero(active)[0])
+            elif len(unbalanced) == 2 and sorted(balance[unbalanced].tolist()) == [-1, 1]:
+                kind, start = 'path', int(unbalanced[balance[unbalanced] == 1][0])
+            else:
+                return none
+        else:
+            odd = np.flatnonzero(degrees % 2)
+            if not len(odd):
+                kind, start = 'cycle', int(np.flatnonzero(active)[0])
+            elif len(odd) == 2:
+                kind, start = 'path', int(odd[0])
+            else:
+                return none
+
+        vertices, edges = self._hierholzer(start)
+        return {'type': kind, 'vertices': vertices, 'edges': edges}
+
+    def _hierholzer(self, start):
+        """Обхід без рекурсії: стек вершин і ребер, курсор невикористаних ребер кожної вершини"""
+        g = self.graph
+        offsets = g.offsets.tolist()
+        neighbors = g.neighbors.tolist()
+        adj_edges = g.adj_edges.tolist()
+        cursor = offsets[:-1]
+        used = bytearray(g.m)
+
+        stack_v, stack_e = [start], [-1]
+        path_v, path_e = [], []
+        push_v, push_e = stack_v.append, stack_e.append
+        pop_v, pop_e = stack_v.pop, stack_e.pop
+        emit_v, emit_e = path_v.append, path_e.append
+        while stack_v:
+            u = stack_v[-1]
+            slot, end = cursor[u], offsets[u + 1]
+            # Для неорієнтованого графа ребро є в рядках обох кінців
+            while slot < end and used[adj_edges[slot]]:
+                slot += 1
+            cursor[u] = slot
+            if slot < end:
+                e = adj_edges[slot]
+                used[e] = 1
+                push_v(neighbors[slot])
+                push_e(e)
+            else:
+                emit_v(pop_v())
+                emit_e(pop_e())
+
+        path_v.reverse()
+        path_e.reverse()
+        # Перший запис - фіктивне ребро входу в стартову вершину
+        return path_v, path_e[1:]
@@ -1,137 +1,270 @@
-import networkx as nx
+import logging
+
 import numpy as np
+from scipy.sparse import coo_matrix
+from .compact_graph import CompactGraph
+from .connectivity import ConnectivitySolver
+from .large_graph import EdgeArrays, degree_summary, edge_stats, payload_edges
+from .lazy import LazyProperties
 
-class GraphAnalyzer:
-    def __init__(self, nodes, edges, is_directed=False):
-        self.is_directed = is_directed
-        # ВИПРАВЛЕНО: Використовуємо Multi-типи для підтримки кратних ребер
-        self.G = nx.MultiDiGraph() if is_directed else nx.MultiGraph()
-        
-        for node in nodes:
-            self.G.add_node(str(node['id']), label=node.get('label', f"v{node['id']}"))
-        
-        for edge in edges:
-            # Кожне крате ребро додається як окремий запис
-            self.G.add_edge(str(edge['from']), str(edge['to']), weight=float(edge.get('weight', 1)))
+logger = logging.getLogger(__name__)
+
+# Формати матриць у відповіді: щільний вкладений список або розріджені COO/CSR
+MATRIX_FORMATS = ('dense', 'coo', 'csr')
+# Режими аналізу: усі властивості або лише лінійні за V (для великих графів)
+ANALYZE_MODES = ('full', 'large')
+
+def sparse_payload(matrix, matrix_format):
+    """JSON-представлення розрідженої матриці SciPy у форматі coo або csr"""
+    if matrix_format == 'coo':
+        matrix = matrix.tocoo()
+        return {
+            'format': 'coo',
+            'shape': list(matrix.shape),
+            'row': matrix.row.tolist(),
+            'col': matrix.col.tolist(),
+            'data': matrix.data.tolist(),
+        }
+    matrix = matrix.tocsr()
+    matrix.sort_indices()
+    return {
+        'format': 'csr',
+        'shape': list(matrix.shape),
+        'indptr': matrix.indptr.tolist(),
+        'indices': matrix.indices.tolist(),
+        'data': matrix.data.tolist(),
+    }
+
+class GraphAnalyzer(LazyProperties):
+    # Властивості, які можна запитати через fields (у порядку відповіді)
+    FIELDS = ('adjacency_matrix', 'incidence_matrix', 'adjacency_list', 'degrees',
+              'is_regular', 'connectivity', 'is_directed')
+
+    def __init__(self, nodes, edges, is_directed=False, graph=None, matrix_format='dense'):
+        if matrix_format not in MATRIX_FORMATS:
+            raise ValueError(f"Невідомий формат матриці: {matrix_format}")
+        # Граф будується один раз на запит; кратні ребра та петлі зберігаються як окремі записи
+        self.graph = graph if graph is not None else CompactGraph.from_payload(nodes, edges, is_directed)
+        self.is_directed = self.graph.is_directed
+        self.matrix_format = matrix_format
 
     def get_adjacency_matrix(self):
-        if not self.G.nodes: return []
-        # nx.adjacency_matrix для MultiGraph повертає кількість ребер між i та j
-        matrix = nx.adjacency_matrix(self.G, weight=None).todense()
-        return matrix.tolist()
+        g = self.graph
+        if not g.n: return []
+        # Кількість ребер між i та j (петля враховується один раз)
+        matrix = self._adjacency_csr()
+        if self.matrix_format == 'dense':
+            return matrix.toarray().tolist()
+        # Кратні ребра - повторні записи CSR, їх підсумовуємо
+        matrix = matrix.copy()
+        matrix.sum_duplicates()
+        return sparse_payload(matrix, self.matrix_format)
 
     def get_incidence_matrix(self):
-        nodes = list(self.G.nodes())
-        # Отримуємо всі ребра з ключами (для мультиграфів)
-        edges = list(self.G.edges(keys=True))
-        
-        if not nodes or not edges: return []
-        
-        num_nodes = len(nodes)
-        num_edges = len(edges)
-        # Створюємо нульову матрицю: рядки - вершини, стовпці - ребра
-        matrix = np.zeros((num_nodes, num_edges), dtype=int)
-        
-        # Карта для швидкого пошуку індексу рядка за ID вершини
-        node_to_idx = {node_id: i for i, node_id in enumerate(nodes)}
-        
-        for j, (u, v, key) in enumerate(edges):
-            u_idx = node_to_idx[u]
-            v_idx = node_to_idx[v]
-            
-            if u == v:
-                # ВИПРАВЛЕНО: Якщо це петля (u == v), пишемо 2 у слот вершини
-                matrix[u_idx, j] = 2
-            else:
-                if self.is_directed:
-                    # Для дуг: -1 (вихід), 1 (вхід)
-                    matrix[u_idx, j] = -1
-                    matrix[v_idx, j] = 1
-                else:
-                    # Для ребер: 1 для обох кінців
-                    matrix[u_idx, j] = 1
-                    matrix[v_idx, j] = 1
-                    
+        g = self.graph
+        if not g.n or not g.m: return []
+
+        # Рядки - вершини, стовпці - ребра у порядку надходження
+        cols = np.arange(g.m)
+        loops = g.edge_src == g.edge_dst
+
+        if self.matrix_format != 'dense':
+            # Ненульові елементи будуються прямо з масивів ребер, без щільної матриці:
+            # початок ребра (-1 для дуги, 1 для ребра), кінець (1), петля - один запис 2
+            proper = ~loops
+            rows = np.concatenate((g.edge_src[proper], g.edge_dst[proper], g.edge_src[loops]))
+            columns = np.concatenate((cols[proper], cols[proper], cols[loops]))
+            data = np.concatenate((
+                np.full(proper.sum(), -1 if self.is_directed else 1),
+                np.ones(proper.sum(), dtype=int),
+                np.full(loops.sum(), 2),
+            ))
+            matrix = coo_matrix((data, (rows, columns)), shape=(g.n, g.m))
+            return sparse_payload(matrix, self.matrix_format)
+
+        matrix = np.zeros((g.n, g.m), dtype=int)
+        if self.is_directed:
+            # Для дуг: -1 (вихід), 1 (вхід)
+            matrix[g.edge_src, cols] = -1
+            matrix[g.edge_dst, cols] = 1
+        else:
+            # Для ребер: 1 для обох кінців
+            matrix[g.edge_src, cols] = 1
+            matrix[g.edge_dst, cols] = 1
+        # Петля (u == v) дає 2 у слоті вершини
+        matrix[g.edge_src[loops], cols[loops]] = 2
+
         return matrix.tolist()
-    
+
     def get_adjacency_list(self):
+        g = self.graph
         adj_list = []
         # Сортуємо вершини за ID для стабільного виводу
-        for n_id in sorted(self.G.nodes()):
-            label = self.G.nodes[n_id].get('label', f"v{n_id}")
-            # Отримуємо унікальних сусідів (для мультиграфів neighbors повертає набір вузлів)
-            # Для орієнтованих графів neighbors() еквівалентний successors()
-            neighbors = self.G.neighbors(n_id)
-            neighbor_labels = [self.G.nodes[nb].get('label', nb) for nb in neighbors]
-            
+        for n_id in self._memoized('sorted_node_ids', lambda: sorted(g.node_ids)):
+            u = g.index[n_id]
+            # Унікальні сусіди (для орієнтованих графів - наступники)
+            neighbor_labels = [g.label(v) for v in g.unique_neighbors(u)]
+
             adj_list.append({
-                'vertex': label,
+                'vertex': g.label(u),
                 'neighbors': ", ".join(neighbor_labels) if neighbor_labels else "—"
             })
         return adj_list
 
     def get_degrees_info(self):
+        # Степені спільні для полів degrees та is_regular
+        return self._memoized('degrees_info', self._degrees_info)
+
+    def _degrees_info(self):
+        g = self.graph
         degree_list = []
         degrees_values = []
-        for n_id, data in self.G.nodes(data=True):
-            label = data.get('label', f"v{n_id}")
-            if self.is_directed:
-                in_deg, out_deg = self.G.in_degree(n_id), self.G.out_degree(n_id)
-                degree_list.append({'label': label, 'in_degree': in_deg, 'out_degree': out_deg, 'total': in_deg + out_deg})
+        if self.is_directed:
+            for i, (in_deg, out_deg) in enumerate(zip(g.in_degrees().tolist(), g.out_degrees().tolist())):
+                degree_list.append({'label': g.label(i), 'in_degree': in_deg, 'out_degree': out_deg, 'total': in_deg + out_deg})
                 degrees_values.append((in_deg, out_deg))
-            else:
-                deg = self.G.degree(n_id)
-                degree_list.append({'label': label, 'degree': deg})
+        else:
+            for i, deg in enumerate(g.degrees().tolist()):
+                degree_list.append({'label': g.label(i), 'degree': deg})
                 degrees_values.append(deg)
         is_regular = all(d == degrees_values[0] for d in degrees_values) if degrees_values else False
         return degree_list, is_regular
 
     def get_connectivity_info(self):
+        g = self.graph
         res = {'components_count': 0, 'vertex_connectivity': 0, 'edge_connectivity': 0}
-        if not self.G.nodes: return res
+        if not g.n: return res
         
         # Кількість компонент (для орієнтованих - слабка зв'язність)
-        res['components_count'] = (
-            nx.number_weakly_connected_components(self.G) 
-            if self.is_directed else nx.number_connected_components(self.G)
-        )
+        res['components_count'] = self._components_count()
         
         try:
-            # ВИПРАВЛЕНО: Розрахунок характеристик зв'язності
-            
-            # 1. Для вершинної зв'язності використовуємо ПРОСТИЙ граф (без петель і кратності)
-            # Бо видалення вершини видаляє всі ребра, незалежно від їх кількості
-            simple_ug = nx.Graph(self.G.to_undirected())
-            simple_ug.remove_edges_from(nx.selfloop_edges(simple_ug))
-            
-            # 2. Для реберної зв'язності використовуємо МУЛЬТИГРАФ, але без петель
-            multi_ug = self.G.to_undirected()
-            multi_ug.remove_edges_from(nx.selfloop_edges(multi_ug))
-
-            # Перевіряємо, чи граф зв'язний в принципі
-            if nx.is_connected(simple_ug):
-                # Вершинна зв'язність не може бути більшою за N-1
-                res['vertex_connectivity'] = nx.node_connectivity(simple_ug)
-                # Реберна зв'язність враховує кратні ребра
-                res['edge_connectivity'] = nx.edge_connectivity(multi_ug)
-            else:
-                res['vertex_connectivity'] = 0
-                res['edge_connectivity'] = 0
-                
-        except Exception as e:
-            print(f"Connectivity calculation error: {e}")
-            pass
-            
+            # Дешеві точні випадки (дерево, цикл, повний граф, Тарʼян, мінімальний
+            # степінь) перевіряються до max-flow; 'method' показує, який спрацював
+            solver = self._memoized('connectivity_solver', lambda: ConnectivitySolver(g))
+            res.update(solver.run(res['components_count']))
+        except Exception:
+            # Відповідь лишається з кількістю компонент, але збій видно в журналі сервера
+            logger.exception("Помилка обчислення зв'язності (V=%d, E=%d)", g.n, g.m)
+
         return res
 
-    def get_all_properties(self):
-        degrees, is_regular = self.get_degrees_info()
+    # --- Спільні проміжні результати ---
+
+    def _adjacency_csr(self):
+        return self._memoized('adjacency_csr', self.graph.to_scipy)
+
+    def _components_count(self):
+        """Кількість компонент (для орієнтованих - слабка зв'язність); у збереженого графа - готова"""
+        return self.graph.components_count()
+
+    def _field_getters(self):
+        return {
+            'adjacency_matrix': self.get_adjacency_matrix,
+            'incidence_matrix': self.get_incidence_matrix,
+            'adjacency_list': self.get_adjacency_list,
+            'degrees': lambda: self.get_degrees_info()[0],
+            'is_regular': lambda: self.get_degrees_info()[1],
+            'connectivity': self.get_connectivity_info,
+            'is_directed': lambda: self.is_directed,
+        }
+
+    def get_all_properties(self, fields=None):
+        """Лише запитані властивості (усі, якщо fields не задано) + computed_fields"""
+        return self.collect(fields)
+
+class LargeGraphAnalyzer(LazyProperties):
+    """Режим великого графа: лише властивості, для яких вистачає O(V) пам'яті.
+
+    З JSON розбираються лише масиви кінців ребер (без CSR, міток і ID).
+    Компоненти та степені рахуються одним проходом по цих масивах
+    (union-find і bincount), степені повертаються розподілом, а не списком
+    вершин. Матриці суміжності та інцидентності (O(V^2) і O(V*E)) та рядки
+    списку суміжності не будуються - вони перелічені у skipped_fields.
+    """
+
+    FIELDS = GraphAnalyzer.FIELDS
+    SKIPPED = ('adjacency_matrix', 'incidence_matrix', 'adjacency_list')
+
+    def __init__(self, nodes, edges, is_directed=False, graph=None):
+        self.is_directed = graph.is_directed if graph is not None else is_directed
+        self._payload = nodes, edges
+        if graph is not None:
+            self._graph = graph
+            self.arrays = EdgeArrays(graph.n, graph.edge_src, graph.edge_dst)
+        else:
+            # Із JSON беруться лише кінці ребер; CSR будується, тільки якщо його попросить поле
+            self._graph = None
+            self.arrays = payload_edges(nodes, edges)
+
+    @property
+    def graph(self):
+        """Повний CompactGraph (CSR, мітки) - будується при першому зверненні"""
+        if self._graph is None:
+            nodes, edges = self._payload
+            self._graph = CompactGraph.from_payload(nodes, edges, self.is_directed)
+        return self._graph
+
+    def _stats(self):
+        a = self.arrays
+        return self._memoized('edge_stats', lambda: edge_stats(a.n, a.edge_src, a.edge_dst))
+
+    def get_degrees_info(self):
+        stats = self._stats()
+        total = stats.out_degrees + stats.in_degrees
+        if self.is_directed:
+            return {
+                'in_degree': degree_summary(stats.in_degrees),
+                'out_degree': degree_summary(stats.out_degrees),
+                'total': degree_summary(total),
+            }
+        return {'degree': degree_summary(total)}
+
+    def is_regular(self):
+        stats = self._stats()
+        if not len(stats.out_degrees):
+            return False
+        if self.is_directed:
+            return bool(np.ptp(stats.in_degrees) == 0 and np.ptp(stats.out_degrees) == 0)
+        return bool(np.ptp(stats.out_degrees + stats.in_degrees) == 0)
+
+    def get_connectivity_info(self):
+        """Кількість компонент; κ і λ - лише у тривіальних випадках, інакше None"""
+        n, m = self.arrays.n, len(self.arrays.edge_src)
+        count = self._stats().components
+        res = {'components_count': count}
+        if n <= 1 or count != 1:
+            reason = 'trivial' if n <= 1 else 'disconnected'
+            kappa, lam = 0, 0
+        elif m == n - 1:
+            reason, kappa, lam = 'tree', 1, 1
+        else:
+            reason, kappa, lam = 'skipped', None, None
+        res.update(vertex_connectivity=kappa, edge_connectivity=lam,
+                   method={'vertex_connectivity': reason, 'edge_connectivity': reason})
+        return res
+
+    def _field_getters(self):
         return {
-            'adjacency_matrix': self.get_adjacency_matrix(),
-            'incidence_matrix': self.get_incidence_matrix(),
-            'adjacency_list': self.get_adjacency_list(),
-            'degrees': degrees,
-            'is_regular': is_regular,
-            'connectivity': self.get_connectivity_info(),
-            'is_directed': self.is_directed
-        }
\ No newline at end of file
+            'degrees': self.get_degrees_info,
+            'is_regular': self.is_regular,
+            'connectivity': self.get_connectivity_info,
+            'is_directed': lambda: self.is_directed,
+        }
+
+    def get_all_properties(self, fields=None):
+        """Запитані властивості, крім пропущених через розмір (skipped_fields)"""
+        names = self.select_fields(fields)
+        computed = [name for name in names if name not in self.SKIPPED]
+        result = {name: self.get_property(name) for name in computed}
+        skipped = [name for name in names if name in self.SKIPPED]
+        if 'connectivity' in result and result['connectivity']['vertex_connectivity'] is None:
+            skipped += ['connectivity.vertex_connectivity', 'connectivity.edge_connectivity']
+        result.update(mode='large', computed_fields=computed, skipped_fields=skipped)
+        return result
+
+def run_analyze(nodes, edges, is_directed, fields=None, matrix_format='dense', mode='full', graph=None):
+    if mode == 'large':
+        return LargeGraphAnalyzer(nodes, edges, is_directed, graph=graph).get_all_properties(fields)
+    analyzer = GraphAnalyzer(nodes, edges, is_directed, graph=graph, matrix_format=matrix_format)
+    return analyzer.get_all_properties(fields)
@@ -0,0 +1,413 @@
+import threading
+
+from .graph_engine import GraphAnalyzer
+from .lazy import LazyProperties
+from .solvers import GraphSolvers
+
+
+class UnionFind:
+    """Система неперетинних множин для підрахунку компонент при додаванні ребер"""
+
+    def __init__(self):
+        self.parent = {}
+        self.size = {}
+        self.count = 0
+
+    def add(self, x):
+        if x not in self.parent:
+            self.parent[x] = x
+            self.size[x] = 1
+            self.count += 1
+
+    def find(self, x):
+        root = x
+        while self.parent[root] != root:
+            root = self.parent[root]
+        while self.parent[x] != root:
+            self.parent[x], x = root, self.parent[x]
+        return root
+
+    def union(self, a, b):
+        a, b = self.find(a), self.find(b)
+        if a == b:
+            return
+        if self.size[a] < self.size[b]:
+            a, b = b, a
+        self.parent[b] = a
+        self.size[a] += self.size[b]
+        self.count -= 1
+
+
+def _weight(value):
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        raise ValueError("Вага ребра має бути числом")
+
+
+class GraphSession(LazyProperties):
+    """Граф, що живе на сервері між запитами і змінюється дельтами.
+
+    Дешеві властивості (степені, кількість компонент, список і матриці
+    суміжності та інцидентності) оновлюються інкрементально при кожній зміні
+    і збираються у відповідь лише на вимогу (fields); без fields - лише
+    DEFAULT_FIELDS, бо матриці коштують O(V^2) і O(V*E). Важкі результати
+    (вершинна/реберна зв'язність, розв'язки) лише позначаються застарілими і
+    перераховуються за потреби. Пачка операцій застосовується атомарно.
+    """
+
+    FIELDS = ('adjacency_matrix', 'incidence_matrix', 'adjacency_list', 'degrees', 'is_regular', 'connectivity')
+    # Відповідь за замовчуванням: дешеві дельти без матриць і рядків списку суміжності
+    DEFAULT_FIELDS = ('degrees', 'is_regular', 'connectivity')
+    HEAVY = ('connectivity', 'solutions')
+    # Дешеві властивості, які змінює операція
+    CHANGES = {
+        'add_node': FIELDS,
+        'remove_node': FIELDS,
+        'rename_node': ('adjacency_list', 'degrees'),
+        'add_edge': FIELDS,
+        'remove_edge': FIELDS,
+        'set_weight': (),
+    }
+
+    def __init__(self, nodes, edges, is_directed=False, max_vertices=None, max_edges=None):
+        self.is_directed = is_directed
+        self.max_vertices = max_vertices
+        self.max_edges = max_edges
+        self._check_size(len(nodes), len(edges))
+        self.version = 0
+        # Порядок вершин і ребер - порядок додавання (як у запитах без сесії)
+        self.labels = {}
+        self.edges = {}
+        # Оригінальні ID ребер (числа або рядки) за їхнім рядковим ключем
+        self.edge_ids_raw = {}
+        self.node_pos = {}
+        self.edge_pos = {}
+        self.in_degree = {}
+        self.out_degree = {}
+        self.adj_matrix = []
+        self.inc_matrix = []
+        self._dsu = UnionFind()
+        self._heavy = {}
+        # Запити до однієї сесії виконуються послідовно
+        self.lock = threading.Lock()
+
+        # Початковий граф нормалізується як у CompactGraph.from_payload
+        for node in nodes:
+            label = node.get('label', f"v{node['id']}")
+            if str(node['id']) in self.labels:
+                # Повторний ID лише оновлює мітку
+                self.labels[str(node['id'])] = label
+            else:
+                self.add_node(node['id'], label)
+        for edge in edges:
+            if str(edge.get('from')) not in self.labels or str(edge.get('to')) not in self.labels:
+                continue
+            key = str(edge.get('id'))
+            if edge.get('id') is None or key in self.edges:
+                # Ребро без ID або з повторним ID входить у граф, але операції його не адресують
+                key = ('unaddressable', len(self.edge_pos))
+            self.add_edge(edge.get('id'), edge.get('from'), edge.get('to'),
+                          edge.get('weight', 1), edge.get('hasWeight', False), key=key)
+        self.version = 0
+
+    # --- Дельти ---
+
+    def apply(self, ops):
+        """Застосовує список операцій [{'op': 'add_node', ...}, ...] атомарно:
+        якщо будь-яка операція некоректна, граф не змінюється. Повертає
+        змінені дешеві властивості в канонічному порядку"""
+        changed, _, _ = self.check(ops)
+        handlers = {
+            'add_node': lambda op: self.add_node(op['id'], op.get('label', f"v{op['id']}")),
+            'remove_node': lambda op: self.remove_node(op['id']),
+            'rename_node': lambda op: self.rename_node(op['id'], op['label']),
+            'add_edge': lambda op: self.add_edge(op.get('id'), op['from'], op['to'],
+                                                 op.get('weight', 1), op.get('hasWeight', False)),
+            'remove_edge': lambda op: self.remove_edge(op['id']),
+            'set_weight': lambda op: self.set_weight(op['id'], op['weight']),
+        }
+        for op in ops:
+            handlers[op['op']](op)
+        return changed
+
+    def check(self, ops):
+        """Прогін пачки на множинах ID вершин і ребер (поверх поточного графа)
+        без зміни самого графа: ловить усі помилки, які дали б операції.
+        Повертає (змінені дешеві властивості, вершин і ребер після пачки)"""
+        if not isinstance(ops, list) or not all(isinstance(op, dict) for op in ops):
+            raise ValueError("ops має бути списком операцій")
+        added, removed = set(), set()
+        # Змінені ребра: ID -> (from, to) або None для видаленого
+        edges = {}
+
+        def has_node(n_id):
+            return n_id in added or (n_id in self.labels and n_id not in removed)
+
+        def require_node(node_id):
+            n_id = str(node_id)
+            if not has_node(n_id):
+                raise ValueError(f"Вершину з ID {n_id} не знайдено")
+            return n_id
+
+        def has_edge(e_key):
+            return edges[e_key] is not None if e_key in edges else e_key in self.edges
+
+        def require_edge(edge_id):
+            if not has_edge(str(edge_id)):
+                raise ValueError(f"Ребро з ID {edge_id} не знайдено")
+
+        nodes_count, edges_count = len(self.labels), len(self.edges)
+        changed = set()
+        for op in ops:
+            kind = op.get('op')
+            if kind not in self.CHANGES:
+                raise ValueError(f"Невідома операція: {kind}")
+            if kind == 'add_node':
+                n_id = str(op['id'])
+                if has_node(n_id):
+                    raise ValueError(f"Вершина з ID {n_id} вже існує")
+                added.add(n_id)
+                removed.discard(n_id)
+                nodes_count += 1
+            elif kind == 'remove_node':
+                n_id = require_node(op['id'])
+                incident = [e_key for e_key, (u, v, _, _) in self.edges.items()
+                            if n_id in (u, v) and e_key not in edges]
+                incident += [e_key for e_key, ends in edges.items() if ends is not None and n_id in ends]
+                for e_key in incident:
+                    edges[e_key] = None
+                added.discard(n_id)
+                removed.add(n_id)
+                nodes_count -= 1
+                edges_count -= len(incident)
+            elif kind == 'rename_node':
+                require_node(op['id'])
+                if 'label' not in op:
+                    raise KeyError('label')
+            elif kind == 'add_edge':
+                ends = require_node(op['from']), require_node(op['to'])
+                e_key = str(op.get('id'))
+                if has_edge(e_key):
+                    raise ValueError(f"Ребро з ID {op.get('id')} вже існує")
+                _weight(op.get('weight', 1))
+                edges[e_key] = ends
+                edges_count += 1
+            elif kind == 'remove_edge':
+                require_edge(op['id'])
+                edges[str(op['id'])] = None
+                edges_count -= 1
+            else:
+                require_edge(op['id'])
+                _weight(op['weight'])
+            changed.update(self.CHANGES[kind])
+        self._check_size(nodes_count, edges_count)
+        return [name for name in self.FIELDS if name in changed], nodes_count, edges_count
+
+    def _check_size(self, nodes_count, edges_count):
+        if self.max_vertices is not None and nodes_count > self.max_vertices:
+            raise ValueError(f"Сесія завелика: понад {self.max_vertices} вершин")
+        if self.max_edges is not None and edges_count > self.max_edges:
+            raise ValueError(f"Сесія завелика: понад {self.max_edges} ребер")
+
+    def _touch(self):
+        self.version += 1
+        self._heavy.clear()
+        self.__dict__.pop('_memo', None)
+
+    def add_node(self, node_id, label):
+        n_id = str(node_id)
+        if n_id in self.labels:
+            raise ValueError(f"Вершина з ID {n_id} вже існує")
+        self.labels[n_id] = label
+        self.node_pos[n_id] = len(self.node_pos)
+        self.in_degree[n_id] = 0
+        self.out_degree[n_id] = 0
+        for row in self.adj_matrix:
+            row.append(0)
+        self.adj_matrix.append([0] * len(self.node_pos))
+        self.inc_matrix.append([0] * len(self.edge_pos))
+        if self._dsu is not None:
+            self._dsu.add(n_id)
+        self._touch()
+
+    def remove_node(self, node_id):
+        n_id = self._require_node(node_id)
+        for e_key in [e_key for e_key, (u, v, _, _) in self.edges.items() if n_id in (u, v)]:
+            self._remove_edge_key(e_key)
+        pos = self.node_pos.pop(n_id)
+        for other, p in self.node_pos.items():
+            if p > pos:
+                self.node_pos[other] = p - 1
+        del self.labels[n_id], self.in_degree[n_id], self.out_degree[n_id]
+        del self.adj_matrix[pos], self.inc_matrix[pos]
+        for row in self.adj_matrix:
+            del row[pos]
+        # Видалення не підтримується системою множин - перебудуємо за потреби
+        self._dsu = None
+        self._touch()
+
+    def rename_node(self, node_id, label):
+        self.labels[self._require_node(node_id)] = label
+        self._touch()
+
+    def add_edge(self, edge_id, u, v, weight=1, has_weight=False, key=None):
+        u, v = self._require_node(u), self._require_node(v)
+        e_key = str(edge_id) if key is None else key
+        if e_key in self.edges:
+            raise ValueError(f"Ребро з ID {edge_id} вже існує")
+        self.edges[e_key] = (u, v, _weight(weight), bool(has_weight))
+        self.edge_ids_raw[e_key] = edge_id
+        self.edge_pos[e_key] = len(self.edge_pos)
+
+        self.out_degree[u] += 1
+        self.in_degree[v] += 1
+        self._link(u, v, +1)
+
+        iu, iv = self.node_pos[u], self.node_pos[v]
+        for row in self.inc_matrix:
+            row.append(0)
+        if u == v:
+            self.inc_matrix[iu][-1] = 2
+        elif self.is_directed:
+            self.inc_matrix[iu][-1], self.inc_matrix[iv][-1] = -1, 1
+        else:
+            self.inc_matrix[iu][-1] = self.inc_matrix[iv][-1] = 1
+
+        if self._dsu is not None:
+            self._dsu.union(u, v)
+        self._touch()
+
+    def remove_edge(self, edge_id):
+        e_key = str(edge_id)
+        if e_key not in self.edges:
+            raise ValueError(f"Ребро з ID {edge_id} не знайдено")
+        self._remove_edge_key(e_key)
+
+    def _remove_edge_key(self, e_key):
+        u, v, _, _ = self.edges.pop(e_key)
+        self.edge_ids_raw.pop(e_key)
+        pos = self.edge_pos.pop(e_key)
+        for other, p in self.edge_pos.items():
+            if p > pos:
+                self.edge_pos[other] = p - 1
+
+        self.out_degree[u] -= 1
+        self.in_degree[v] -= 1
+        self._link(u, v, -1)
+        for row in self.inc_matrix:
+            del row[pos]
+        self._dsu = None
+        self._touch()
+
+    def set_weight(self, edge_id, weight):
+        e_key = str(edge_id)
+        if e_key not in self.edges:
+            raise ValueError(f"Ребро з ID {edge_id} не знайдено")
+        u, v, _, _ = self.edges[e_key]
+        # Вага не впливає на степені та матриці - лише на важкі результати
+        self.edges[e_key] = (u, v, _weight(weight), True)
+        self._touch()
+
+    def _link(self, u, v, delta):
+        """Оновлює матрицю суміжності для ребра u - v"""
+        pairs = [(u, v)] if self.is_directed or u == v else [(u, v), (v, u)]
+        for a, b in pairs:
+            self.adj_matrix[self.node_pos[a]][self.node_pos[b]] += delta
+
+    def _require_node(self, node_id):
+        n_id = str(node_id)
+        if n_id not in self.labels:
+            raise ValueError(f"Вершину з ID {n_id} не знайдено")
+        return n_id
+
+    # --- Властивості ---
+
+    def components_count(self):
+        if self._dsu is None:
+            self._dsu = UnionFind()
+            for n_id in self.labels:
+                self._dsu.add(n_id)
+            for u, v, _, _ in self.edges.values():
+                self._dsu.union(u, v)
+        return self._dsu.count
+
+    def get_degrees_info(self):
+        degree_list = []
+        degrees_values = []
+        for n_id, label in self.labels.items():
+            in_deg, out_deg = self.in_degree[n_id], self.out_degree[n_id]
+            if self.is_directed:
+                degree_list.append({'label': label, 'in_degree': in_deg, 'out_degree': out_deg, 'total': in_deg + out_deg})
+                degrees_values.append((in_deg, out_deg))
+            else:
+                # Для неорієнтованого графа петля дає +2
+                degree_list.append({'label': label, 'degree': in_deg + out_deg})
+                degrees_values.append(in_deg + out_deg)
+        is_regular = all(d == degrees_values[0] for d in degrees_values) if degrees_values else False
+        return degree_list, is_regular
+
+    def get_adjacency_list(self):
+        # Сусіди - у порядку першого ребра до них, як у /analyze/ (O(V + E))
+        neighbors = {n_id: {} for n_id in self.labels}
+        for u, v, _, _ in self.edges.values():
+            neighbors[u][v] = True
+            if not self.is_directed:
+                neighbors[v][u] = True
+        adj_list = []
+        for n_id in sorted(self.labels):
+            neighbor_labels = [self.labels[v] for v in neighbors[n_id]]
+            adj_list.append({
+                'vertex': self.labels[n_id],
+                'neighbors': ", ".join(neighbor_labels) if neighbor_labels else "—"
+            })
+        return adj_list
+
+    def to_payload(self):
+        """Поточний граф у форматі запиту (nodes, edges) для важких обчислень"""
+        nodes = [{'id': n_id, 'label': label} for n_id, label in self.labels.items()]
+        edges = [
+            {'id': self.edge_ids_raw[e_key], 'from': u, 'to': v, 'weight': w, 'hasWeight': has_weight}
+            for e_key, (u, v, w, has_weight) in self.edges.items()
+        ]
+        return nodes, edges
+
+    def _field_getters(self):
+        return {
+            'adjacency_matrix': lambda: [list(row) for row in self.adj_matrix] if self.labels else [],
+            'incidence_matrix': lambda: [list(row) for row in self.inc_matrix] if self.labels and self.edges else [],
+            'adjacency_list': self.get_adjacency_list,
+            'degrees': lambda: self._memoized('degrees_info', self.get_degrees_info)[0],
+            'is_regular': lambda: self._memoized('degrees_info', self.get_degrees_info)[1],
+            'connectivity': lambda: {'components_count': self.components_count()},
+        }
+
+    def _heavy_result(self, name, options=None):
+        """Важкий результат з параметрами options (для solutions - approximate_invariants);
+        результат з іншими параметрами перераховується"""
+        options = options or {}
+        cached = self._heavy.get(name)
+        if cached is None or cached[0] != options:
+            nodes, edges = self.to_payload()
+            if name == 'connectivity':
+                result = GraphAnalyzer(nodes, edges, self.is_directed).get_connectivity_info()
+            else:
+                result = GraphSolvers(nodes, edges, self.is_directed, **options).get_all_solutions()
+            cached = self._heavy[name] = (options, result)
+        return cached[1]
+
+    def get_properties(self, fields=None, include=(), options=None):
+        """Вибрані дешеві властивості (fields: None - DEFAULT_FIELDS, порожній список - жодної)
+        і важкі (connectivity, solutions) на вимогу; options - параметри важких
+        обчислень за назвою"""
+        for name in include:
+            if name not in self.HEAVY:
+                raise ValueError(f"Невідома властивість: {name}")
+        if fields is None:
+            fields = list(self.DEFAULT_FIELDS)
+        cheap = self.collect(fields) if fields else {'computed_fields': []}
+        result = {'version': self.version, **cheap, 'is_directed': self.is_directed}
+        for name in include:
+            result[name] = self._heavy_result(name, (options or {}).get(name))
+        result['stale'] = [name for name in self.HEAVY if name not in self._heavy]
+        return result
@@ -0,0 +1,303 @@
+import time
+
+# Ліміти за замовчуванням: час пошуку (секунди) та максимальна кількість вершин
+DEFAULT_TIME_BUDGET = 1.0
+DEFAULT_MAX_VERTICES = 40
+
+
+class BudgetExceeded(Exception):
+    pass
+
+
+class HamiltonianSearch:
+    """Пошук Гамільтонових циклів і шляхів на бітових масках.
+
+    Стан пошуку - пара (множина відвіданих вершин, поточна вершина). Продовження
+    шляху залежить лише від цього стану, тому безперспективні стани
+    запам'ятовуються (динамічне програмування Хелда-Карпа, обчислене зверху вниз)
+    і більше не розгортаються. Таблиця шляхів спільна для всіх стартових вершин.
+    Перед пошуком та на кожному кроці відсікаються гілки за степенями вершин і
+    досяжністю невідвіданої частини графа.
+    """
+
+    def __init__(self, graph, time_budget=DEFAULT_TIME_BUDGET, max_vertices=DEFAULT_MAX_VERTICES):
+        self.graph = graph
+        self.n = graph.n
+        self.is_directed = graph.is_directed
+        self.time_budget = time_budget
+        self.max_vertices = max_vertices
+        self.full = (1 << self.n) - 1
+
+        # Простий граф на бітових масках: out_adj[u] - наступники, in_adj[u] - попередники
+        self.out_adj = [0] * self.n
+        self.in_adj = [0] * self.n
+        self.loops = 0
+        for u, v in zip(graph.edge_src.tolist(), graph.edge_dst.tolist()):
+            if u == v:
+                self.loops |= 1 << u
+                continue
+            self.out_adj[u] |= 1 << v
+            self.in_adj[v] |= 1 << u
+            if not self.is_directed:
+                self.out_adj[v] |= 1 << u
+                self.in_adj[u] |= 1 << v
+
+        # Маска однієї частки, якщо граф двочастковий (визначається під час пошуку)
+        self.side = None
+        self._deadline = None
+        self._steps = 0
+
+    def run(self):
+        """Повертає {'cycle': [...] | None, 'path': [...] | None, 'exact': bool, 'elapsed_ms': float}"""
+        started = time.perf_counter()
+        result = {'cycle': None, 'path': None, 'exact': True}
+        if self.n == 0 or self.n > self.max_vertices:
+            result['exact'] = self.n == 0
+        else:
+            self._deadline = started + self.time_budget if self.time_budget else None
+            try:
+                result['cycle'], result['path'] = self._search()
+            except BudgetExceeded:
+                result['exact'] = False
+        result['elapsed_ms'] = round((time.perf_counter() - started) * 1000, 3)
+        return result
+
+    def _search(self):
+        if self.n == 1:
+            # Орієнтована петля утворює цикл з однієї вершини
+            if self.is_directed and self.loops & 1:
+                return [0, 0], None
+            return None, [0]
+
+        # Двочастковий граф: цикл чергує частки, тож вони мають бути рівні,
+        # а шлях можливий лише при різниці не більше одиниці
+        self.side = self._bipartition()
+        if self.side is not None:
+            a = bin(self.side).count('1')
+            b = self.n - a
+            if abs(a - b) > 1:
+                return None, None
+
+        cycle, path = None, None
+        if self._cycle_possible():
+            s = min(range(self.n), key=lambda u: bin(self.out_adj[u]).count('1'))
+            cycle, path = self._find_cycle(s)
+        if cycle is None and path is None:
+            path = self._find_path()
+        return cycle, path
+
+    # --- Відсікання за структурою графа ---
+
+    def _reach(self, start, allowed):
+        """Вершини з allowed, досяжні з start усередині allowed (BFS на масках)"""
+        seen = 0
+        frontier = self.out_adj[start] & allowed
+        while frontier:
+            seen |= frontier
+            nxt = 0
+            while frontier:
+                low = frontier & -frontier
+                nxt |= self.out_adj[low.bit_length() - 1]
+                frontier ^= low
+            frontier = nxt & allowed & ~seen
+        return seen
+
+    def _bipartition(self):
+        """Маска однієї частки, якщо граф (без урахування напрямків) двочастковий"""
+        sides = [0, 0]
+        assigned = 0
+        for root in range(self.n):
+            if assigned >> root & 1:
+                continue
+            frontier, side = 1 << root, 0
+            while frontier:
+                sides[side] |= frontier
+                assigned |= frontier
+                nxt = 0
+                while frontier:
+                    low = frontier & -frontier
+                    u = low.bit_length() - 1
+                    nxt |= self.out_adj[u] | self.in_adj[u]
+                    frontier ^= low
+                side ^= 1
+                if nxt & sides[side ^ 1]:
+                    return None
+                frontier = nxt & ~assigned
+        return sides[0]
+
+    def _cycle_possible(self):
+        if not self.is_directed and self.n < 3:
+            return False
+        if self.side is not None and bin(self.side).count('1') * 2 != self.n:
+            return False
+        for u in range(self.n):
+            if not self.out_adj[u] or not self.in_adj[u]:
+                return False
+            if not self.is_directed and bin(self.out_adj[u]).count('1') < 2:
+                return False
+        # Граф має бути (сильно) зв'язним
+        if self._reach(0, self.full) | 1 != self.full:
+            return False
+        if self.is_directed:
+            backward = self.out_adj
+            self.out_adj = self.in_adj
+            strongly = self._reach(0, self.full) | 1 == self.full
+            self.out_adj = backward
+            return strongly
+        # Точка зчленування виключає Гамільтонів цикл
+        for u in range(self.n):
+            rest = self.full & ~(1 << u)
+            first = (rest & -rest).bit_length() - 1
+            if self._reach(first, rest) | (1 << first) != rest:
+                return False
+        return True
+
+    def _tick(self):
+        self._steps += 1
+        if self._deadline and self._steps & 1023 == 0 and time.perf_counter() > self._deadline:
+            raise BudgetExceeded()
+
+    def _prune(self, v, rem, target):
+        """Аналіз стану (v, rem): None, якщо шлях гарантовано не покриє rem,
+        інакше маска вимушених наступних вершин (0, якщо вибір вільний).
+
+        target - маска вершини, куди треба повернутися (для циклу), або 0.
+        """
+        if self._reach(v, rem) != rem:
+            return None
+        if target and not self.in_adj[target.bit_length() - 1] & rem:
+            # У циклі повернутися до старту можна лише з ще невідвіданої вершини
+            return None
+        forced = 0
+        sole_pred = 0
+        sole_succ = 0
+        dead_ends = 0
+        left = rem
+        while left:
+            low = left & -left
+            u = low.bit_length() - 1
+            left ^= low
+            # Кожна невідвідана вершина потребує попередника серед rem та v
+            pred = self.in_adj[u] & (rem | (1 << v)) & ~low
+            if not pred:
+                return None
+            if pred & (pred - 1) == 0:
+                if pred == 1 << v:
+                    forced |= low
+                elif sole_pred & pred:
+                    # Дві вершини з тим самим єдиним попередником
+                    return None
+                sole_pred |= pred
+            succ = self.out_adj[u] & (rem | target) & ~low
+            if not succ:
+                # Вершина без продовження може бути лише кінцем шляху
+                dead_ends += 1
+                if target or dead_ends > 1:
+                    return None
+            elif target and succ & (succ - 1) == 0:
+                if sole_succ & succ:
+                    return None
+                sole_succ |= succ
+        if forced & (forced - 1):
+            # Лише одна вершина може йти безпосередньо після v
+            return None
+        return forced
+
+    def _ordered(self, candidates, rem):
+        """Кандидати за зростанням кількості подальших варіантів (правило Варнсдорфа)"""
+        options = []
+        while candidates:
+            low = candidates & -candidates
+            w = low.bit_length() - 1
+            candidates ^= low
+            options.append((bin(self.out_adj[w] & rem & ~low).count('1'), w))
+        options.sort()
+        return [w for _, w in options]
+
+    # --- Пошук ---
+
+    def _find_cycle(self, s):
+        """Цикл через s; попутно запам'ятовує перший знайдений Гамільтонів шлях із s"""
+        dead = set()
+        path = [s]
+        found_path = []
+        target = 1 << s
+
+        def extend(v, mask):
+            rem = self.full & ~mask
+            if not rem:
+                if not found_path:
+                    found_path.append(list(path))
+                return bool(self.out_adj[v] & target)
+            key = (mask << 6) | v
+            if key in dead:
+                return False
+            self._tick()
+            forced = self._prune(v, rem, target)
+            if forced is None:
+                dead.add(key)
+                return False
+            for w in self._ordered(forced or self.out_adj[v] & rem, rem):
+                path.append(w)
+                if extend(w, mask | (1 << w)):
+                    return True
+                path.pop()
+            dead.add(key)
+            return False
+
+        if extend(s, target):
+            return path + [s], None
+        return None, found_path[0] if found_path else None
+
+    def _find_path(self):
+        """Гамільтонів шлях із будь-якої вершини зі спільною таблицею тупикових станів"""
+        if self._reach(0, self.full) | 1 != self.full and not self.is_directed:
+            return None
+
+        # Вершини без вхідних (або, у неорієнтованому, степеня 1) мають бути початком
+        if self.is_directed:
+            forced = [u for u in range(self.n) if not self.in_adj[u]]
+            if len(forced) > 1 or sum(1 for u in range(self.n) if not self.out_adj[u]) > 1:
+                return None
+        else:
+            forced = [u for u in range(self.n) if bin(self.out_adj[u]).count('1') <= 1]
+            if any(not self.out_adj[u] for u in forced) or len(forced) > 2:
+                return None
+        if forced:
+            starts = forced[:1]
+        else:
+            # Кінці шляху найімовірніше серед вершин меншого степеня
+            starts = sorted(range(self.n), key=lambda u: bin(self.out_adj[u] | self.in_adj[u]).count('1'))
+        if self.side is not None and self.n % 2:
+            # Шлях непарної довжини починається і закінчується у більшій частці
+            larger = self.side if bin(self.side).count('1') * 2 > self.n else self.full & ~self.side
+            starts = [u for u in starts if larger >> u & 1]
+
+        dead = set()
+        path = []
+
+        def extend(v, mask):
+            rem = self.full & ~mask
+            if not rem:
+                return True
+            key = (mask << 6) | v
+            if key in dead:
+                return False
+            self._tick()
+            forced = self._prune(v, rem, 0)
+            if forced is None:
+                dead.add(key)
+                return False
+            for w in self._ordered(forced or self.out_adj[v] & rem, rem):
+                path.append(w)
+                if extend(w, mask | (1 << w)):
+                    return True
+                path.pop()
+            dead.add(key)
+            return False
+
+        for s in starts:
+            path[:] = [s]
+            if extend(s, 1 << s):
+                return path
+        return None
@@ -0,0 +1,199 @@
+import codecs
+
+import numpy as np
+
+from .compact_graph import CompactGraph
+from .timing import phase, record_graph
+
+# Формати імпорту: список ребер через пробіли, CSV та Matrix Market (coordinate)
+IMPORT_FORMATS = ('edgelist', 'csv', 'mtx')
+
+# Назви стовпців заголовка CSV -> роль стовпця
+CSV_COLUMNS = {'from': 'from', 'source': 'from', 'u': 'from', 'to': 'to', 'target': 'to', 'v': 'to',
+               'weight': 'weight', 'w': 'weight', 'id': 'id'}
+POSITIONAL = ('from', 'to', 'weight', 'id')
+
+
+def _is_number(text):
+    try:
+        float(text)
+    except ValueError:
+        return False
+    return True
+
+
+def iter_line_blocks(chunks):
+    """Блоки байтів, що закінчуються на межі рядка: неповний рядок переноситься в наступний блок"""
+    tail = b''
+    for chunk in chunks:
+        if not chunk:
+            continue
+        data = tail + chunk
+        cut = data.rfind(b'\n')
+        if cut < 0:
+            tail = data
+            continue
+        yield data[:cut + 1]
+        tail = data[cut + 1:]
+    if tail.strip():
+        yield tail
+
+
+class EdgeListParser:
+    """Потоковий розбір списку ребер у типізовані масиви NumPy.
+
+    Кожен блок рядків перетворюється на масиви (from, to, вага, id) цілком,
+    без Python-об'єктів на кожне ребро. Кінці ребер зберігаються як int64,
+    доки всі вони числові, інакше - як байтові рядки; вершини - це
+    унікальні кінці ребер (для Matrix Market - усі 1..n).
+    """
+
+    def __init__(self, fmt='edgelist', max_edges=None):
+        if fmt not in IMPORT_FORMATS:
+            raise ValueError(f"Невідомий формат імпорту: {fmt}")
+        self.fmt = fmt
+        self.max_edges = max_edges
+        self.delimiter = b',' if fmt == 'csv' else None
+        self.comments = (b'%',) if fmt == 'mtx' else (b'#', b'%')
+        self.columns = None
+        self.banner = None
+        self.size = None
+        self.count = 0
+        self.started = False
+        self.numeric = True
+        self._endpoints, self._weights, self._ids = [], [], []
+
+    def feed(self, block):
+        if not self.started and block.startswith(codecs.BOM_UTF8):
+            # Файли з Windows-редакторів часто починаються з BOM
+            block = block[len(codecs.BOM_UTF8):]
+        self.started = True
+        if self.fmt == 'mtx' and self.banner is None:
+            self.banner = self._parse_banner(block.split(b'\n', 1)[0])
+        lines = [line.strip() for line in block.split(b'\n')]
+        lines = [line for line in lines if line and not line.startswith(self.comments)]
+        if lines and self.columns is None:
+            lines = self._detect_columns(lines)
+        if not lines:
+            return
+
+        k = len(self.columns)
+        if self.delimiter is None:
+            tokens = b' '.join(lines).split()
+        else:
+            tokens = [token.strip() for token in b','.join(lines).split(b',')]
+        if len(tokens) != k * len(lines):
+            raise ValueError(f"Рядки мають різну кількість стовпців (очікується {k})")
+        table = np.array(tokens, dtype=bytes).reshape(-1, k)
+
+        self.count += len(table)
+        if self.max_edges is not None and self.count > self.max_edges:
+            raise ValueError(f"Забагато ребер: понад {self.max_edges}")
+
+        endpoints = np.stack((table[:, self.columns.index('from')], table[:, self.columns.index('to')]))
+        if self.numeric:
+            try:
+                endpoints = endpoints.astype(np.int64)
+            except ValueError:
+                # Нечислові ID вершин: попередні блоки теж переводимо в рядки
+                self.numeric = False
+                self._endpoints = [e.astype(bytes) for e in self._endpoints]
+        self._endpoints.append(endpoints)
+        if 'weight' in self.columns:
+            try:
+                self._weights.append(table[:, self.columns.index('weight')].astype(np.float64))
+            except ValueError:
+                raise ValueError("Вага ребра має бути числом")
+        if 'id' in self.columns:
+            self._ids.append(table[:, self.columns.index('id')])
+
+    def _parse_banner(self, line):
+        parts = line.lower().split()
+        if len(parts) != 5 or parts[0] != b'%%matrixmarket' or parts[1] != b'matrix':
+            raise ValueError("Очікується заголовок %%MatrixMarket matrix coordinate ...")
+        if parts[2] != b'coordinate':
+            raise ValueError("Підтримується лише формат Matrix Market coordinate")
+        if parts[3] not in (b'real', b'integer', b'pattern'):
+            raise ValueError(f"Непідтримуване поле Matrix Market: {parts[3].decode()}")
+        if parts[4] not in (b'general', b'symmetric'):
+            raise ValueError(f"Непідтримувана симетрія Matrix Market: {parts[4].decode()}")
+        return {'weighted': parts[3] != b'pattern', 'symmetric': parts[4] == b'symmetric'}
+
+    def _detect_columns(self, lines):
+        """Визначає стовпці за першими рядками; повертає решту рядків даних"""
+        first = lines[0].split(self.delimiter)
+        if self.fmt == 'mtx':
+            # Рядок розмірів: "рядки стовпці ненульові"
+            try:
+                rows, cols, _ = (int(x) for x in first)
+            except ValueError:
+                raise ValueError("Очікується рядок розмірів Matrix Market: rows cols nnz")
+            self.size = max(rows, cols)
+            self.columns = POSITIONAL[:3] if self.banner['weighted'] else POSITIONAL[:2]
+            return lines[1:]
+        names = [name.strip().lower().decode('utf-8', 'replace') for name in first]
+        if self.fmt == 'csv' and all(name in CSV_COLUMNS for name in names):
+            self.columns = tuple(CSV_COLUMNS[name] for name in names)
+            if 'from' not in self.columns or 'to' not in self.columns:
+                raise ValueError("У заголовку CSV мають бути стовпці from і to")
+            return lines[1:]
+        if self.fmt == 'csv' and not any(_is_number(name) for name in names):
+            # Рядок без жодного числа - заголовок, а не ребро: невідомі назви не мовчки стають вершинами
+            unknown = ', '.join(name for name in names if name not in CSV_COLUMNS)
+            raise ValueError(f"Невідомі стовпці заголовка CSV: {unknown} (очікуються from, to, weight, id)")
+        if not 2 <= len(first) <= 4:
+            raise ValueError("Рядок ребра: from to [weight [id]]")
+        self.columns = POSITIONAL[:len(first)]
+        return lines
+
+    def finish(self, is_directed=None):
+        """CompactGraph із накопичених масивів; is_directed=None - за форматом
+        (Matrix Market general - орієнтований, symmetric - ні; інші - неорієнтований)"""
+        if self.fmt == 'mtx' and self.banner is None:
+            raise ValueError("Порожній файл")
+        if is_directed is None:
+            is_directed = self.fmt == 'mtx' and not self.banner['symmetric']
+
+        if self._endpoints:
+            endpoints = np.concatenate(self._endpoints, axis=1)
+        else:
+            endpoints = np.zeros((2, 0), dtype=np.int64 if self.numeric else bytes)
+        m = endpoints.shape[1]
+
+        if self.fmt == 'mtx':
+            n = self.size or 0
+            if not self.numeric:
+                raise ValueError("Індекси вершин Matrix Market мають бути цілими числами")
+            if m and (endpoints.min() < 1 or endpoints.max() > n):
+                raise ValueError(f"Індекс вершини поза межами 1..{n}")
+            src, dst = endpoints - 1
+            raw_ids = list(range(1, n + 1))
+        else:
+            unique, inverse = np.unique(endpoints.ravel(), return_inverse=True)
+            src, dst = inverse.reshape(2, m)
+            raw_ids = unique.tolist() if self.numeric else [x.decode('utf-8') for x in unique.tolist()]
+
+        weights = np.concatenate(self._weights) if self._weights else np.ones(m)
+        has_weight = np.full(m, bool(self._weights))
+        edge_ids = list(range(m))
+        if self._ids:
+            ids = np.concatenate(self._ids)
+            try:
+                edge_ids = ids.astype(np.int64).tolist()
+            except ValueError:
+                edge_ids = [x.decode('utf-8') for x in ids.tolist()]
+
+        node_ids = [str(x) for x in raw_ids]
+        labels = [f"v{x}" for x in raw_ids]
+        return CompactGraph(node_ids, raw_ids, labels, src, dst, weights, edge_ids, has_weight, is_directed)
+
+
+def import_graph(chunks, fmt='edgelist', is_directed=None, max_edges=None):
+    """Будує CompactGraph з потоку байтових блоків (файл завантаження, тіло запиту)"""
+    with phase('import'):
+        parser = EdgeListParser(fmt, max_edges)
+        for block in iter_line_blocks(chunks):
+            parser.feed(block)
+        graph = parser.finish(is_directed)
+    record_graph(graph.n, graph.m)
+    return graph
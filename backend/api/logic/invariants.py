@@ -0,0 +1,315 @@
+import time
+
+import numpy as np
+
+from .hamiltonian import DEFAULT_TIME_BUDGET, BudgetExceeded
+
+
+class InvariantsSolver:
+    """Точні хроматичне, клікове числа та число незалежності методом гілок і меж.
+
+    Граф зберігається як бітові маски сусідів (простий неорієнтований граф без
+    петель). Максимальна кліка шукається алгоритмом Томіти (MCQ) з оцінкою через
+    жадібне розфарбування, число незалежності - як максимальна кліка доповнення.
+    Хроматичне число - точний DSATUR: нижня межа береться з кліки, верхня - з
+    жадібного DSATUR, а вершини кліки фарбуються заздалегідь.
+
+    Усі три задачі ділять один ліміт часу. Якщо його вичерпано, повертаються
+    найкращі знайдені значення зі статусом 'bounded' та межами [lower, upper].
+
+    approximate=True - лише жадібні оцінки за O(V + E) без перебору (для
+    великих графів, де навіть початкові межі точного методу коштують O(V^3)):
+    вони працюють на масивах CSR, бітові маски не будуються.
+    """
+
+    def __init__(self, graph, time_budget=DEFAULT_TIME_BUDGET, approximate=False):
+        self.graph = graph
+        self.n = graph.n
+        self.time_budget = time_budget
+        self.approximate = approximate
+        # Бітові маски (O(V^2) біт) будуються лише для точного методу
+        self.full = 0
+        self.adj = None
+
+        self._deadline = None
+        self._steps = 0
+
+    def _build_masks(self):
+        self.full = (1 << self.n) - 1
+        self.adj = [0] * self.n
+        for u, v in zip(self.graph.edge_src.tolist(), self.graph.edge_dst.tolist()):
+            if u != v:
+                self.adj[u] |= 1 << v
+                self.adj[v] |= 1 << u
+
+    def run(self):
+        if self.approximate:
+            return self._approximate()
+        self._build_masks()
+        self._deadline = time.perf_counter() + self.time_budget if self.time_budget else None
+
+        clique, clique_info = self._timed(lambda: self._max_clique(self.adj))
+        complement = [self.full & ~a & ~(1 << v) for v, a in enumerate(self.adj)]
+        independent, independence_info = self._timed(lambda: self._max_clique(complement))
+        coloring, chromatic_info = self._timed(lambda: self._chromatic(clique_info['lower'], clique))
+
+        # Спільні межі: ω(G) <= χ(G)
+        clique_info['upper'] = min(clique_info['upper'], chromatic_info['upper'])
+        chromatic_info['lower'] = max(chromatic_info['lower'], clique_info['lower'])
+        for info in (clique_info, chromatic_info):
+            if info['lower'] == info['upper']:
+                info['status'] = 'exact'
+
+        return self._result(coloring, clique_info, chromatic_info, independence_info)
+
+    def _result(self, coloring, clique_info, chromatic_info, independence_info):
+        ids = self.graph.node_ids
+        return {
+            "chromatic_number": chromatic_info['upper'],
+            "clique_number": clique_info['lower'],
+            "independence_number": independence_info['lower'],
+            "coloring": {ids[v]: c for v, c in enumerate(coloring)},
+            "details": {
+                "chromatic_number": chromatic_info,
+                "clique_number": clique_info,
+                "independence_number": independence_info,
+            }
+        }
+
+    def _simple_csr(self):
+        """Симетричний CSR простого графа (без петель і кратних ребер): offsets, neighbors"""
+        n = self.n
+        src, dst = self.graph.edge_src, self.graph.edge_dst
+        proper = src != dst
+        keys = np.unique(np.concatenate((src[proper] * n + dst[proper], dst[proper] * n + src[proper])))
+        offsets = np.zeros(n + 1, dtype=np.int64)
+        np.cumsum(np.bincount(keys // n, minlength=n), out=offsets[1:])
+        return offsets, keys % n
+
+    def _approximate(self):
+        """Жадібні кліка, незалежна множина і розфарбування (за спаданням степеня) та межі за ними"""
+        started = time.perf_counter()
+        n = self.n
+        offsets, neighbors = self._simple_csr()
+        degree = np.diff(offsets).tolist()
+        offsets, neighbors = offsets.tolist(), neighbors.tolist()
+
+        def row(v):
+            return neighbors[offsets[v]:offsets[v + 1]]
+
+        max_degree = max(degree, default=0)
+
+        # Дводольний граф фарбується в 2 кольори точно, інакше - Велш-Пауелл:
+        # верхня межа χ і ω
+        coloring = self._two_coloring(n, row)
+        if coloring is None:
+            coloring = [-1] * n
+            for v in sorted(range(n), key=lambda u: -degree[u]):
+                used = {coloring[u] for u in row(v)}
+                c = 0
+                while c in used:
+                    c += 1
+                coloring[v] = c
+        chromatic_upper = max(coloring, default=-1) + 1
+
+        # Кліка: щоразу вершина найбільшого степеня серед спільних сусідів
+        clique = []
+        candidates = range(n)
+        while candidates:
+            v = max(candidates, key=degree.__getitem__)
+            clique.append(v)
+            candidates = set(row(v)).intersection(candidates)
+
+        # Незалежна множина: жадібно за зростанням степеня
+        independent, blocked = [], bytearray(n)
+        for v in sorted(range(n), key=degree.__getitem__):
+            if not blocked[v]:
+                independent.append(v)
+                blocked[v] = 1
+                for u in row(v):
+                    blocked[u] = 1
+        # α = n - τ, а вершинне покриття τ >= E / Δ
+        simple_m = sum(degree) // 2
+        independence_upper = n - -(-simple_m // max_degree) if max_degree else n
+
+        elapsed_ms = round((time.perf_counter() - started) * 1000, 3)
+
+        def info(lower, upper):
+            return {'status': 'exact' if lower == upper else 'bounded',
+                    'lower': lower, 'upper': upper, 'elapsed_ms': elapsed_ms}
+
+        return self._result(
+            coloring,
+            info(len(clique), min(chromatic_upper, max_degree + 1)),
+            info(len(clique), chromatic_upper),
+            info(len(independent), independence_upper),
+        )
+
+    @staticmethod
+    def _two_coloring(n, row):
+        """Розфарбування обходом у ширину, якщо граф дводольний, інакше None"""
+        coloring = [-1] * n
+        for root in range(n):
+            if coloring[root] != -1:
+                continue
+            coloring[root] = 0
+            queue = [root]
+            for u in queue:
+                for v in row(u):
+                    if coloring[v] == -1:
+                        coloring[v] = 1 - coloring[u]
+                        queue.append(v)
+                    elif coloring[v] == coloring[u]:
+                        return None
+        return coloring
+
+    def _timed(self, solve):
+        started = time.perf_counter()
+        value, info = solve()
+        info['elapsed_ms'] = round((time.perf_counter() - started) * 1000, 3)
+        return value, info
+
+    def _tick(self):
+        self._steps += 1
+        if self._deadline and self._steps & 255 == 0 and time.perf_counter() > self._deadline:
+            raise BudgetExceeded()
+
+    @staticmethod
+    def _color_sort(adj, candidates):
+        """Жадібне розфарбування кандидатів: порядок вершин і номер кольору кожної"""
+        order, colors = [], []
+        color = 0
+        uncolored = candidates
+        while uncolored:
+            color += 1
+            free = uncolored
+            while free:
+                low = free & -free
+                v = low.bit_length() - 1
+                free &= ~adj[v] & ~low
+                uncolored ^= low
+                order.append(v)
+                colors.append(color)
+        return order, colors
+
+    def _max_clique(self, adj):
+        """Максимальна кліка (MCQ); повертає список вершин та межі"""
+        if not self.n:
+            return [], {'status': 'exact', 'lower': 0, 'upper': 0}
+
+        # Початкова кліка жадібно за спаданням степеня
+        best = []
+        candidates = self.full
+        for v in sorted(range(self.n), key=lambda u: -bin(adj[u]).count('1')):
+            if candidates >> v & 1:
+                best.append(v)
+                candidates &= adj[v]
+        upper = max(self._color_sort(adj, self.full)[1])
+
+        def expand(clique, candidates):
+            self._tick()
+            order, colors = self._color_sort(adj, candidates)
+            for i in range(len(order) - 1, -1, -1):
+                if len(clique) + colors[i] <= len(best):
+                    return
+                v = order[i]
+                clique.append(v)
+                rest = candidates & adj[v]
+                if rest:
+                    expand(clique, rest)
+                elif len(clique) > len(best):
+                    best[:] = clique
+                clique.pop()
+                candidates &= ~(1 << v)
+
+        try:
+            if len(best) < upper:
+                expand([], self.full)
+            return best, {'status': 'exact', 'lower': len(best), 'upper': len(best)}
+        except BudgetExceeded:
+            return best, {'status': 'bounded', 'lower': len(best), 'upper': upper}
+
+    def _dsatur_order(self, sat, uncolored):
+        """Вершина з найбільшою насиченістю (за рівності - з більшим степенем серед нефарбованих)"""
+        best, best_key = -1, None
+        left = uncolored
+        while left:
+            low = left & -left
+            v = low.bit_length() - 1
+            left ^= low
+            key = (bin(sat[v]).count('1'), bin(self.adj[v] & uncolored).count('1'))
+            if best_key is None or key > best_key:
+                best, best_key = v, key
+        return best
+
+    def _chromatic(self, lower, clique):
+        """Точний DSATUR з гілками і межами; повертає розфарбування та межі"""
+        n = self.n
+        if not n:
+            return [], {'status': 'exact', 'lower': 0, 'upper': 0}
+
+        # Верхня межа - жадібний DSATUR
+        colors = [-1] * n
+        sat = [0] * n
+        uncolored = self.full
+        while uncolored:
+            v = self._dsatur_order(sat, uncolored)
+            c = 0
+            while sat[v] >> c & 1:
+                c += 1
+            colors[v] = c
+            uncolored &= ~(1 << v)
+            self._update_sat(sat, v, c)
+        best = list(colors)
+        upper = max(best) + 1
+        lower = max(lower, 1)
+        if lower >= upper:
+            return best, {'status': 'exact', 'lower': upper, 'upper': upper}
+
+        # Вершини кліки отримують різні кольори без перебору
+        colors = [-1] * n
+        sat = [0] * n
+        uncolored = self.full
+        for c, v in enumerate(clique):
+            colors[v] = c
+            uncolored &= ~(1 << v)
+            self._update_sat(sat, v, c)
+        state = {'upper': upper, 'best': best}
+
+        def assign(uncolored, used):
+            if not uncolored:
+                state['upper'], state['best'] = used, list(colors)
+                return state['upper'] <= lower
+            self._tick()
+            v = self._dsatur_order(sat, uncolored)
+            # Новий колір допускається лише якщо це ще покращує верхню межу
+            for c in range(min(used + 1, state['upper'] - 1)):
+                if sat[v] >> c & 1:
+                    continue
+                colors[v] = c
+                saved = [(u, sat[u]) for u in self._bits(self.adj[v])]
+                self._update_sat(sat, v, c)
+                done = assign(uncolored & ~(1 << v), max(used, c + 1))
+                for u, s in saved:
+                    sat[u] = s
+                colors[v] = -1
+                if done:
+                    return True
+            return False
+
+        try:
+            assign(uncolored, len(clique))
+            return state['best'], {'status': 'exact', 'lower': state['upper'], 'upper': state['upper']}
+        except BudgetExceeded:
+            return state['best'], {'status': 'bounded', 'lower': lower, 'upper': state['upper']}
+
+    def _update_sat(self, sat, v, c):
+        for u in self._bits(self.adj[v]):
+            sat[u] |= 1 << c
+
+    @staticmethod
+    def _bits(mask):
+        while mask:
+            low = mask & -mask
+            yield low.bit_length() - 1
+            mask ^= low
@@ -0,0 +1,141 @@
+import copy
+import hashlib
+import json
+from collections import Counter, defaultdict
+
+import networkx as nx
+from networkx.algorithms import isomorphism
+
+
+def wl_colors(n, edge_src, edge_dst, is_directed=False):
+    """Уточнення кольорів Вейсфейлера-Лемана (1-WL) для мультиграфа з петлями.
+
+    Початковий колір вершини - (петлі, вихідний, вхідний степінь); далі колір
+    уточнюється відсортованою мультимножиною кольорів сусідів, доки кількість
+    класів зростає. Кольори - ранги сигнатур у відсортованому списку, тож вони
+    однакові для ізоморфних графів. Повертає (кольори, відбиток), де відбиток -
+    хеш історії сигнатур усіх раундів: різні відбитки гарантують неізоморфність,
+    однакові - лише ймовірну ізоморфність (1-WL не розрізняє, напр., регулярні
+    графи однакового степеня).
+    """
+    loops = [0] * n
+    out_nb = [[] for _ in range(n)]
+    in_nb = out_nb if not is_directed else [[] for _ in range(n)]
+    for u, v in zip(edge_src, edge_dst):
+        if u == v:
+            loops[u] += 1
+            continue
+        out_nb[u].append(v)
+        in_nb[v].append(u)
+
+    digest = hashlib.sha256(f'{n}:{len(edge_src)}:{bool(is_directed)}'.encode())
+
+    def refine(signatures):
+        ranks = {s: i for i, s in enumerate(sorted(set(signatures)))}
+        history = sorted(Counter(signatures).items())
+        digest.update(json.dumps(history, separators=(',', ':')).encode())
+        return [ranks[s] for s in signatures], len(ranks)
+
+    colors, classes = refine([(loops[u], len(out_nb[u]), len(in_nb[u])) for u in range(n)])
+    for _ in range(n):
+        signatures = [
+            (colors[u], sorted(colors[v] for v in out_nb[u]),
+             sorted(colors[v] for v in in_nb[u]) if is_directed else [])
+            for u in range(n)
+        ]
+        # Списки в сигнатурах - кортежі, щоб їх можна було хешувати
+        colors, refined = refine([(c, tuple(a), tuple(b)) for c, a, b in signatures])
+        if refined == classes:
+            break
+        classes = refined
+    return colors, digest.hexdigest()
+
+
+def _edge_key(u, v, is_directed):
+    return (u, v) if is_directed or u <= v else (v, u)
+
+
+def _multigraph(n, edge_src, edge_dst, colors, is_directed):
+    G = nx.MultiDiGraph() if is_directed else nx.MultiGraph()
+    G.add_nodes_from((u, {'color': c}) for u, c in zip(range(n), colors))
+    G.add_edges_from(zip(edge_src, edge_dst))
+    return G
+
+
+def find_isomorphism(first, second, is_directed=False):
+    """Сертифікований ізоморфізм між графами first і second, заданими як
+    (n, edge_src, edge_dst, кольори WL).
+
+    Відображення шукає VF2 з відсіканням за кольорами WL, після чого воно
+    перевіряється явно: бієкція вершин переводить мультимножину ребер first
+    точно в мультимножину ребер second. Повертає (phi, psi) - індекси вершин
+    і ребер second для кожної вершини і ребра first, або None.
+    """
+    n, src_a, dst_a, colors_a = first
+    m, src_b, dst_b, colors_b = second
+    if n != m or len(src_a) != len(src_b) or sorted(colors_a) != sorted(colors_b):
+        return None
+    if len(set(colors_a)) == n:
+        # Дискретне розбиття: кожен колір має одну вершину, відображення однозначне
+        by_color = {c: v for v, c in enumerate(colors_b)}
+        phi = [by_color[c] for c in colors_a]
+    else:
+        GA = _multigraph(n, src_a, dst_a, colors_a, is_directed)
+        GB = _multigraph(m, src_b, dst_b, colors_b, is_directed)
+        Matcher = isomorphism.MultiDiGraphMatcher if is_directed else isomorphism.MultiGraphMatcher
+        matcher = Matcher(GA, GB, node_match=lambda a, b: a['color'] == b['color'])
+        if not matcher.is_isomorphic():
+            return None
+        phi = [matcher.mapping[u] for u in range(n)]
+
+    # Сертифікат: phi - бієкція, а ребра first переходять у ребра second з тими ж кратностями
+    if sorted(phi) != list(range(n)):
+        return None
+    slots = defaultdict(list)
+    for e, (u, v) in enumerate(zip(src_b, dst_b)):
+        slots[_edge_key(u, v, is_directed)].append(e)
+    for edges in slots.values():
+        edges.reverse()
+    psi = []
+    for u, v in zip(src_a, dst_a):
+        edges = slots.get(_edge_key(phi[u], phi[v], is_directed))
+        if not edges:
+            return None
+        psi.append(edges.pop())
+    return phi, psi
+
+
+def index_view(graph):
+    """Копія CompactGraph з тими самими масивами, де ID і мітки вершин - їхні
+    індекси, а ID ребер - номери ребер. Результат задачі над нею не залежить
+    від ID графа і переноситься на ізоморфний граф через translate_solution"""
+    view = copy.copy(graph)
+    view.node_ids = [str(u) for u in range(graph.n)]
+    view.raw_ids = list(range(graph.n))
+    view.labels = list(range(graph.n))
+    view.index = {n_id: u for u, n_id in enumerate(view.node_ids)}
+    view.edge_ids = list(range(graph.m))
+    return view
+
+
+def translate_solution(solution, graph, phi=None, psi=None):
+    """Результат /solve/ над index_view ізоморфного графа -> у мітки й ID graph.
+
+    phi/psi - вершина і ребро graph для кожної вершини і ребра вихідного
+    графа (None - тотожне відображення)."""
+    phi = phi if phi is not None else range(graph.n)
+    psi = psi if psi is not None else range(graph.m)
+    result = dict(solution)
+    for name in ('euler', 'hamilton'):
+        if name in result:
+            info = result[name]
+            result[name] = {
+                **info,
+                'path': [graph.label(phi[u]) for u in info['path']],
+                'edge_ids': [graph.edge_ids[psi[e]] for e in info['edge_ids']],
+            }
+    if 'invariants' in result and 'coloring' in result['invariants']:
+        invariants = result['invariants']
+        colors = sorted((phi[int(u)], c) for u, c in invariants['coloring'].items())
+        result['invariants'] = {**invariants, 'coloring': {graph.node_ids[u]: c for u, c in colors}}
+    return result
@@ -0,0 +1,88 @@
+from collections import namedtuple
+
+import numpy as np
+
+from .timing import phase, record_graph
+
+# Скільки ребер обробляється за один крок: тимчасова пам'ять не залежить від E
+EDGE_CHUNK = 1 << 20
+
+# Результат одного проходу по масивах ребер
+EdgeStats = namedtuple('EdgeStats', 'components out_degrees in_degrees')
+# Граф як кількість вершин і кінці ребер - без міток, ID, ваг і CSR
+EdgeArrays = namedtuple('EdgeArrays', 'n edge_src edge_dst')
+
+
+def payload_edges(nodes, edges):
+    """Лише масиви кінців ребер із JSON-списків nodes/edges. Вершини
+    нумеруються й ребра відбираються так само, як у CompactGraph.from_payload
+    (повторні ID зливаються, ребра з невідомими кінцями ігноруються), але
+    мітки, ID ребер і списки суміжності не зберігаються."""
+    with phase('build'):
+        index = {}
+        for node in nodes:
+            index.setdefault(str(node['id']), len(index))
+        src, dst = [], []
+        for edge in edges:
+            u, v = index.get(str(edge.get('from'))), index.get(str(edge.get('to')))
+            if u is None or v is None:
+                continue
+            src.append(u)
+            dst.append(v)
+        arrays = EdgeArrays(len(index), np.array(src, dtype=np.int64), np.array(dst, dtype=np.int64))
+    record_graph(arrays.n, len(arrays.edge_src))
+    return arrays
+
+
+def _compress(parent):
+    """Стрибки за вказівниками: кожна вершина вказує прямо на корінь свого дерева"""
+    while True:
+        grand = parent[parent]
+        if np.array_equal(grand, parent):
+            return parent
+        parent = grand
+
+
+def _union(parent, u, v):
+    """Об'єднання множин для пачки ребер. Корінь з більшим номером підвішується
+    під найменший із суміжних коренів, тож parent[x] <= x і циклів немає"""
+    while len(u):
+        ru, rv = parent[u], parent[v]
+        differ = ru != rv
+        if not differ.any():
+            break
+        u, v, ru, rv = u[differ], v[differ], ru[differ], rv[differ]
+        np.minimum.at(parent, np.maximum(ru, rv), np.minimum(ru, rv))
+        parent = _compress(parent)
+    return parent
+
+
+def edge_stats(n, edge_src, edge_dst, chunk=EDGE_CHUNK):
+    """Компоненти (слабка зв'язність) і вхідні/вихідні степені за один прохід
+    по масивах ребер: union-find на масиві батьків і bincount по пачках.
+    Пам'ять - O(V) плюс одна пачка ребер; CSR і матриці не будуються."""
+    parent = np.arange(n, dtype=np.int64)
+    out_degrees = np.zeros(n, dtype=np.int64)
+    in_degrees = np.zeros(n, dtype=np.int64)
+    for start in range(0, len(edge_src), chunk):
+        u, v = edge_src[start:start + chunk], edge_dst[start:start + chunk]
+        out_degrees += np.bincount(u, minlength=n)
+        in_degrees += np.bincount(v, minlength=n)
+        parent = _union(parent, u, v)
+    components = int(np.count_nonzero(parent == np.arange(n)))
+    return EdgeStats(components, out_degrees, in_degrees)
+
+
+def degree_summary(degrees):
+    """Розподіл степенів без переліку вершин: мінімум, максимум, середнє
+    та гістограма [[степінь, кількість вершин], ...]"""
+    if not len(degrees):
+        return {'min': 0, 'max': 0, 'mean': 0.0, 'histogram': []}
+    counts = np.bincount(degrees)
+    present = np.flatnonzero(counts)
+    return {
+        'min': int(degrees.min()),
+        'max': int(degrees.max()),
+        'mean': round(float(degrees.mean()), 4),
+        'histogram': np.column_stack((present, counts[present])).tolist(),
+    }
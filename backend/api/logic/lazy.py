@@ -0,0 +1,49 @@
+from .timing import phase
+
+
+class LazyProperties:
+    """Ледачий шар властивостей з мемоізацією.
+
+    Підклас перелічує доступні поля у FIELDS (у порядку відповіді) і повертає
+    їхні обчислювачі з _field_getters(). Кожне поле, як і спільні проміжні
+    результати (через _memoized), обчислюється не більше одного разу.
+    """
+
+    FIELDS = ()
+
+    def _field_getters(self):
+        raise NotImplementedError
+
+    def _memoized(self, key, compute):
+        memo = self.__dict__.setdefault('_memo', {})
+        if key not in memo:
+            memo[key] = compute()
+        return memo[key]
+
+    @classmethod
+    def select_fields(cls, fields=None):
+        """Запитані поля в канонічному порядку; None або порожній список - усі"""
+        if not fields:
+            return list(cls.FIELDS)
+        if isinstance(fields, str):
+            fields = [name for name in fields.split(',') if name]
+        unknown = [name for name in fields if name not in cls.FIELDS]
+        if unknown:
+            raise ValueError(f"Невідома властивість: {', '.join(unknown)}")
+        return [name for name in cls.FIELDS if name in fields]
+
+    def get_property(self, name):
+        getter = self._field_getters()[name]
+
+        def compute():
+            # Кожне поле - окрема фаза в метриках запиту
+            with phase(name):
+                return getter()
+        return self._memoized(('field', name), compute)
+
+    def collect(self, fields=None):
+        """Словник запитаних властивостей і список полів, які було обчислено"""
+        names = self.select_fields(fields)
+        result = {name: self.get_property(name) for name in names}
+        result['computed_fields'] = names
+        return result
@@ -1,145 +1,546 @@
-import networkx as nx
+import heapq
+import math
+import multiprocessing
+import threading
+from contextlib import contextmanager
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+import numpy as np
+from scipy.sparse import csr_matrix
+from scipy.sparse.csgraph import NegativeCycleError, bellman_ford, dijkstra
+from .compact_graph import CompactGraph
+from .timing import phase
 
 class PathFinder:
-    def __init__(self, nodes, edges, is_directed=False):
-        self.is_directed = is_directed
-        self.raw_edges = edges
-        self.G = nx.MultiDiGraph() if is_directed else nx.MultiGraph()
+    def __init__(self, nodes, edges, is_directed=False, graph=None):
+        self.graph = graph if graph is not None else CompactGraph.from_payload(nodes, edges, is_directed)
+        self.is_directed = self.graph.is_directed
+        g = self.graph
         
         # 1. Сортуємо вузли за ID для стабільного порядку в матрицях (v1, v2, v3...)
-        sorted_nodes = sorted(nodes, key=lambda x: x.get('id'))
-        self.node_ids = [str(n['id']) for n in sorted_nodes]
+        self.order = sorted(range(g.n), key=lambda i: g.raw_ids[i])
+        self.node_ids = [g.node_ids[i] for i in self.order]
         self.node_to_idx = {n_id: i for i, n_id in enumerate(self.node_ids)}
-        self.idx_to_label = {i: n.get('label', f"v{i+1}") for i, n in enumerate(sorted_nodes)}
+        self.idx_to_label = {i: g.label(u) for i, u in enumerate(self.order)}
+        # Кеш стиснутих списків суміжності для Дейкстри
+        self._adjacency = {}
 
-        for node in sorted_nodes:
-            self.G.add_node(str(node['id']), label=node.get('label', f"v{node.get('id')}"))
-            
-        for edge in edges:
-            # Використовуємо 1 як технічну вагу, якщо вона не задана
-            w = float(edge.get('weight', 1))
-            self.G.add_edge(
-                str(edge['from']), 
-                str(edge['to']), 
-                weight=w, 
-                edge_id=edge.get('id'),
-                has_weight=edge.get('hasWeight', False)
-            )
+    def _collapsed_adjacency(self, reverse=False):
+        """CSR без кратних ребер і петель: між u та v лишається лише найлегше ребро.
 
-    def run_dijkstra(self, start_node, end_node):
+        reverse=True дає вхідні дуги (для зворотного пошуку в орієнтованому графі).
+        Результат - Python-списки (offsets, neighbors, weights, edge_idx), кешується.
+        """
+        key = reverse and self.is_directed
+        if key in self._adjacency:
+            return self._adjacency[key]
+        src, dst, w, e = self._collapsed_edges(key)
+        offsets = np.zeros(self.graph.n + 1, dtype=np.int64)
+        np.cumsum(np.bincount(src, minlength=self.graph.n), out=offsets[1:])
+        adjacency = (offsets.tolist(), dst.tolist(), w.tolist(), e.tolist())
+        self._adjacency[key] = adjacency
+        return adjacency
+
+    def _collapsed_edges(self, reverse=False):
+        """Масиви дуг (src, dst, вага, індекс ребра), відсортовані за (src, dst), без кратних і петель"""
+        g = self.graph
+        src, dst = (g.edge_dst, g.edge_src) if reverse else (g.edge_src, g.edge_dst)
+        w, e = g.edge_weight, np.arange(g.m)
+        if not self.is_directed:
+            src, dst, w, e = np.concatenate((src, dst)), np.concatenate((dst, src)), np.concatenate((w, w)), np.concatenate((e, e))
+        not_loop = src != dst
+        src, dst, w, e = src[not_loop], dst[not_loop], w[not_loop], e[not_loop]
+
+        # Сортуємо за (u, v, вага, порядок ребра) і беремо перший запис кожної пари
+        order = np.lexsort((e, w, dst, src))
+        src, dst, w, e = src[order], dst[order], w[order], e[order]
+        first = np.ones(len(src), dtype=bool)
+        first[1:] = (src[1:] != src[:-1]) | (dst[1:] != dst[:-1])
+        return src[first], dst[first], w[first], e[first]
+
+    def _shortest_path_tree(self, source, targets=None):
+        """Дейкстра на купі від source; зупиняється, коли всі targets зафіксовано.
+
+        Повертає відстані та ребро-попередник (u, індекс ребра) для кожної вершини.
+        """
+        offsets, neighbors, weights, edge_idx = self._collapsed_adjacency()
+        dist = {source: 0.0}
+        pred_edge = {}
+        done = set()
+        remaining = set(targets) if targets is not None else None
+        heap = [(0.0, source)]
+        while heap:
+            d, u = heapq.heappop(heap)
+            if u in done: continue
+            done.add(u)
+            if remaining is not None:
+                remaining.discard(u)
+                if not remaining: break
+            for k in range(offsets[u], offsets[u + 1]):
+                v = neighbors[k]
+                nd = d + weights[k]
+                if v not in dist or nd < dist[v]:
+                    dist[v] = nd
+                    pred_edge[v] = (u, edge_idx[k])
+                    heapq.heappush(heap, (nd, v))
+        return {v: dist[v] for v in done}, pred_edge
+
+    def _bidirectional(self, source, target):
+        """Двонаправлена Дейкстра для однієї пари; повертає (відстань, список індексів ребер)"""
+        forward = self._collapsed_adjacency()
+        backward = self._collapsed_adjacency(reverse=True)
+        dist = [{source: 0.0}, {target: 0.0}]
+        pred = [{}, {}]
+        done = [set(), set()]
+        heaps = [[(0.0, source)], [(0.0, target)]]
+        best, meet = float('inf'), None
+
+        while heaps[0] and heaps[1]:
+            # Зупинка: жоден шлях через ще не зафіксовані вершини не буде коротшим
+            if heaps[0][0][0] + heaps[1][0][0] >= best:
+                break
+            side = 0 if len(heaps[0]) <= len(heaps[1]) else 1
+            d, u = heapq.heappop(heaps[side])
+            if u in done[side]: continue
+            done[side].add(u)
+            offsets, neighbors, weights, edge_idx = forward if side == 0 else backward
+            for k in range(offsets[u], offsets[u + 1]):
+                v = neighbors[k]
+                nd = d + weights[k]
+                if v not in dist[side] or nd < dist[side][v]:
+                    dist[side][v] = nd
+                    pred[side][v] = (u, edge_idx[k])
+                    heapq.heappush(heaps[side], (nd, v))
+                if v in dist[1 - side] and nd + dist[1 - side][v] < best:
+                    best = nd + dist[1 - side][v]
+                    meet = v
+
+        if meet is None:
+            return None, None
+        edges = []
+        v = meet
+        while v != source:
+            u, e = pred[0][v]
+            edges.append(e)
+            v = u
+        edges.reverse()
+        v = meet
+        while v != target:
+            u, e = pred[1][v]
+            edges.append(e)
+            v = u
+        return best, edges
+
+    def _path_result(self, source, target, total, edge_idx):
+        """Формування відповіді для шляху source -> target за індексами ребер"""
+        g = self.graph
+        path_nodes = [g.node_ids[source]]
+        path_edges = []
+        u = source
+        for e in edge_idx:
+            a, b = int(g.edge_src[e]), int(g.edge_dst[e])
+            v = b if a == u else a
+            path_edges.append({"from": g.node_ids[u], "to": g.node_ids[v], "id": g.edge_ids[e]})
+            path_nodes.append(g.node_ids[v])
+            u = v
+        return {
+            "success": True,
+            "path_nodes_ids": path_nodes,
+            "path_edges": path_edges,
+            "total_weight": total
+        }
+
+    def _check_weights(self):
+        """Повертає відповідь з помилкою, якщо ваги ребер не підходять для Дейкстри"""
+        g = self.graph
         # ПЕРЕВІРКА: чи всі ребра мають встановлену вагу
         # Якщо в масиві edges хоча б в одного об'єкта hasWeight === false
-        unweighted = [e for e in self.raw_edges if not e.get('hasWeight', False)]
+        unweighted = int((~g.has_weight).sum())
         if unweighted:
             return {
                 "success": False, 
-                "error": f"Алгоритм Дейкстри неможливий: {len(unweighted)} ребер не мають встановленої ваги. Використайте інструмент 'Вага'."
+                "error": f"Алгоритм Дейкстри неможливий: {unweighted} ребер не мають встановленої ваги. Використайте інструмент 'Вага'."
             }
             
         # ПЕРЕВІРКА: наявність від'ємних ваг
-        negative_edges = [e for e in self.raw_edges if float(e.get('weight', 0)) < 0]
-        if negative_edges:
+        if (g.edge_weight < 0).any():
             return {
                 "success": False,
                 "error": "Алгоритм Дейкстри не працює з від'ємними вагами. Виправте ваги ребер."
             }
+        return None
 
-        try:
-            start_node, end_node = str(start_node), str(end_node)
-            
-            if start_node == end_node:
-                return {
-                    "success": True,
-                    "path_nodes_ids": [start_node],
-                    "path_edges": [],
-                    "total_weight": 0
-                }
-            
-            path_nodes = nx.dijkstra_path(self.G, source=start_node, target=end_node, weight='weight')
-            path_weight = nx.dijkstra_path_length(self.G, source=start_node, target=end_node, weight='weight')
-
-            path_edges = []
-            for i in range(len(path_nodes) - 1):
-                u, v = path_nodes[i], path_nodes[i+1]
-                edge_data = self.G.get_edge_data(u, v)
-                # Обираємо ребро з найменшою вагою серед можливих між двома вузлами
-                best_key = min(edge_data, key=lambda k: edge_data[k]['weight'])
-                path_edges.append({
-                    "from": u, "to": v, 
-                    "id": edge_data[best_key].get('edge_id')
-                })
+    def run_dijkstra(self, start_node, end_node):
+        g = self.graph
+        error = self._check_weights()
+        if error:
+            return error
 
+        start_node, end_node = str(start_node), str(end_node)
+        for n_id in (start_node, end_node):
+            if n_id not in g.index:
+                return {"success": False, "error": f"Вершину з ID {n_id} не знайдено"}
+
+        if start_node == end_node:
             return {
                 "success": True,
-                "path_nodes_ids": path_nodes,
-                "path_edges": path_edges,
-                "total_weight": path_weight
+                "path_nodes_ids": [start_node],
+                "path_edges": [],
+                "total_weight": 0
             }
-        except nx.NetworkXNoPath:
+
+        source, target = g.index[start_node], g.index[end_node]
+        total, edge_idx = self._bidirectional(source, target)
+        if edge_idx is None:
             return {"success": False, "error": "Шлях між обраними вершинами не існує."}
-        except Exception as e:
-            return {"success": False, "error": str(e)}
+        return self._path_result(source, target, total, edge_idx)
+
+    def run_dijkstra_many(self, start_nodes, end_nodes=None):
+        """Найкоротші шляхи для всіх пар (джерело, ціль): одне дерево шляхів на кожне джерело.
+
+        Якщо end_nodes не задано, цілями є всі вершини графа.
+        """
+        g = self.graph
+        error = self._check_weights()
+        if error:
+            return error
+
+        start_nodes = [str(n) for n in start_nodes]
+        end_nodes = [str(n) for n in end_nodes] if end_nodes is not None else list(g.node_ids)
+        for n_id in start_nodes + end_nodes:
+            if n_id not in g.index:
+                return {"success": False, "error": f"Вершину з ID {n_id} не знайдено"}
+
+        targets = [g.index[n_id] for n_id in end_nodes]
+        results = []
+        for start_node in dict.fromkeys(start_nodes):
+            source = g.index[start_node]
+            if len(targets) == 1 and targets[0] != source:
+                # Для однієї цілі двонаправлений пошук дешевший за повне дерево
+                total, edge_idx = self._bidirectional(source, targets[0])
+                dist = {targets[0]: total} if edge_idx is not None else {}
+                paths = {targets[0]: edge_idx}
+            else:
+                dist, pred_edge = self._shortest_path_tree(source, targets)
+                paths = {}
+            for end_node, target in zip(end_nodes, targets):
+                entry = {"start_node": start_node, "end_node": end_node}
+                if target not in dist:
+                    results.append({**entry, "success": False, "error": "Шлях між обраними вершинами не існує."})
+                    continue
+                edge_idx = paths.get(target)
+                if edge_idx is None:
+                    # Відновлюємо шлях від цілі до джерела за ребрами-попередниками
+                    edge_idx = []
+                    v = target
+                    while v != source:
+                        u, e = pred_edge[v]
+                        edge_idx.append(e)
+                        v = u
+                    edge_idx.reverse()
+                total = dist[target] if edge_idx else 0
+                results.append({**entry, **self._path_result(source, target, total, edge_idx)})
+
+        return {"success": True, "results": results}
         
-    def run_floyd_warshall(self):
-        """Алгоритм Флойда-Воршелла з виправленою ініціалізацією та орієнтованістю"""
+    def run_floyd_warshall(self, history='full'):
+        """Алгоритм Флойда-Воршелла на NumPy: релаксація через вершину k для всієї матриці одразу.
+
+        history: 'full' - повні матриці M і T на кожному кроці;
+                 'delta' - повний крок 0, далі лише змінені клітинки [i, j, M, T];
+                 'final' - лише фінальні матриці.
+        negative_cycle у відповіді - чи є цикл від'ємної ваги; тоді M і T
+        такі ж, як у класичного покрокового алгоритму, але відстані в них
+        не є найкоротшими.
+        """
+        if history not in FLOYD_HISTORY_MODES:
+            return {"success": False, "error": f"Невідомий режим історії: {history}"}
+
+        g = self.graph
         n = len(self.node_ids)
         # M - матриця відстаней
-        dist = [[float('inf')] * n for _ in range(n)]
-        
+        dist = np.full((n, n), np.inf)
+        np.fill_diagonal(dist, 0)
+
         # Тета (T) ініціалізація: T[i][j] = i + 1 для всіх j != i, і 0 на діагоналі
         # Це відповідає вашому запиту: ((0,1,1,1), (2,0,2,2), (3,3,0,3), (4,4,4,0))
-        pred = [[(i + 1) if i != j else 0 for j in range(n)] for i in range(n)]
-
-        for i in range(n):
-            dist[i][i] = 0
+        pred = np.repeat(np.arange(1, n + 1)[:, None], n, axis=1)
+        np.fill_diagonal(pred, 0)
 
-        # Початкове заповнення матриці відстаней M суворо за напрямком ребер
-        # Для MultiDiGraph edges() повертає (u, v, data), де u -> v
-        for u_id, v_id, data in self.G.edges(data=True):
-            if u_id not in self.node_to_idx or v_id not in self.node_to_idx:
-                continue
+        # Початкове заповнення матриці відстаней M суворо за напрямком ребер;
+        # неорієнтоване ребро задає обидва напрямки
+        pos = np.empty(n, dtype=np.int64)
+        pos[self.order] = np.arange(n)
+        u, v, w = pos[g.edge_src], pos[g.edge_dst], g.edge_weight
+        if not self.is_directed:
+            back = u != v
+            u, v, w = np.concatenate((u, v[back])), np.concatenate((v, u[back])), np.concatenate((w, w[back]))
+        # Серед кратних ребер береться найменша вага; T[u][v] = u + 1 вже задано
+        # ініціалізацією, окрім петлі з від'ємною вагою на діагоналі
+        np.minimum.at(dist, (u, v), w)
+        diag = np.arange(n)
+        negative_loops = dist[diag, diag] < 0
+        pred[diag[negative_loops], diag[negative_loops]] = diag[negative_loops] + 1
 
-            u = self.node_to_idx[u_id]
-            v = self.node_to_idx[v_id]
-            w = data['weight']
+        steps = [] if history == 'final' else [_floyd_snapshot(dist, pred)]
 
-            if w < dist[u][v]:
-                dist[u][v] = w
-                pred[u][v] = u + 1
-
-        def get_snapshot(d_mat, p_mat):
-            """Форматування матриць для фронтенду"""
-            return {
-                "M": [["∞" if x == float('inf') else (int(x) if x == int(x) else x) for x in row] for row in d_mat],
-                "T": [[x for x in row] for row in p_mat]
-            }
+        # Основний цикл Флойда: рядок k і стовпець k через broadcasting
+        # dist[k][k] < 0 означає, що k лежить на циклі від'ємної ваги
+        negative_cycle = False
+        for k in range(n):
+            if dist[k, k] < 0:
+                negative_cycle = True
+                through_k = _through_negative_vertex(dist, k)
+            else:
+                through_k = dist[:, k, None] + dist[None, k, :]
+            improved = through_k < dist
+            np.copyto(dist, through_k, where=improved)
+            # Оновлення Тета: попередником j стає попередник j на шляху з k
+            np.copyto(pred, np.broadcast_to(pred[k], (n, n)), where=improved)
 
-        # Крок 0: Початковий стан
-        steps = [get_snapshot(dist, pred)]
+            if history == 'full':
+                steps.append(_floyd_snapshot(dist, pred))
+            elif history == 'delta':
+                rows, cols = np.nonzero(improved)
+                changes = [
+                    [i, j, _format_distance(d), t]
+                    for i, j, d, t in zip(rows.tolist(), cols.tolist(),
+                                          dist[rows, cols].tolist(), pred[rows, cols].tolist())
+                ]
+                steps.append({"changes": changes})
 
-        # Основний цикл Флойда
-        for k in range(n):
-            for i in range(n):
-                for j in range(n):
-                    # Перевірка умови релаксації через вершину k
-                    if dist[i][k] + dist[k][j] < dist[i][j]:
-                        dist[i][j] = dist[i][k] + dist[k][j]
-                        # Оновлення Тета: попередником j стає попередник j на шляху з k
-                        pred[i][j] = pred[k][j]
-            steps.append(get_snapshot(dist, pred))
+        if history == 'final':
+            steps.append(_floyd_snapshot(dist, pred))
 
         return {
             "success": True,
+            "history": history,
+            "negative_cycle": negative_cycle,
             "steps": steps,
             "labels": [self.idx_to_label[i] for i in range(n)],
             "node_ids": self.node_ids
         }
 
+    # --- Найкоротші шляхи між усіма парами для великих розріджених графів ---
+
+    def run_apsp(self, method='auto', workers=1):
+        """Відстані між усіма парами вершин у форматі фінального кроку Флойда (M і T).
+
+        method: 'floyd' - Флойд-Воршелл, O(V^3);
+                'dijkstra' - Дейкстра з кожної вершини, O(V (V + E) log V), ваги >= 0;
+                'johnson' - перезважування Беллманом-Фордом і Дейкстра (від'ємні ваги без від'ємних циклів);
+                'auto' - вибір за щільністю графа і знаками ваг.
+        Запуски Дейкстри з різних джерел розподіляються між workers процесами.
+        """
+        if method not in APSP_METHODS:
+            return {"success": False, "error": f"Невідомий метод: {method}"}
+        g = self.graph
+        negative = bool((g.edge_weight < 0).any())
+        auto = method == 'auto'
+        if auto:
+            method = self._choose_apsp_method(negative)
+        if method == 'dijkstra' and negative:
+            return {"success": False, "error": "Алгоритм Дейкстри не працює з від'ємними вагами. Використайте метод 'johnson'."}
+
+        potential = None
+        if method == 'johnson' and negative:
+            potential = self._johnson_potential()
+            if potential is None:
+                if not auto:
+                    return {"success": False, "error": "Граф містить цикл від'ємної ваги: використайте алгоритм Флойда."}
+                method = 'floyd'
+        if method == 'floyd' or not g.n:
+            return {**self.run_floyd_warshall('final'), "method": method}
+
+        u, v, w = self._apsp_edges()
+        if potential is not None:
+            # Після перезважування w(u, v) + h(u) - h(v) >= 0
+            w = w + potential[u] - potential[v]
+        dist, pred = _all_sources_dijkstra(g.n, u, v, w, workers)
+        if potential is not None:
+            dist += potential[None, :] - potential[:, None]
+
+        # T у форматі Флойда: номер попередника j на шляху з i (з 1),
+        # для недосяжних j - i + 1, на діагоналі - 0
+        rows = np.arange(g.n)
+        pred = np.where(pred >= 0, pred + 1, rows[:, None] + 1)
+        pred[rows, rows] = 0
+        return {
+            "success": True,
+            "history": "final",
+            "method": method,
+            "negative_cycle": False,
+            "steps": [_floyd_snapshot(dist, pred)],
+            "labels": [self.idx_to_label[i] for i in range(g.n)],
+            "node_ids": self.node_ids
+        }
+
+    def _choose_apsp_method(self, negative):
+        """Дейкстра з кожної вершини - O((V + E) log V) на джерело проти O(V^2) у Флойда"""
+        g = self.graph
+        if negative:
+            # Неорієнтоване ребро від'ємної ваги чи від'ємна петля - це вже від'ємний цикл
+            loops = g.edge_src == g.edge_dst
+            if not self.is_directed or (g.edge_weight[loops] < 0).any():
+                return 'floyd'
+            return 'johnson'
+        if g.n < 2 or (g.n + g.m) * math.log2(g.n) >= g.n * g.n:
+            return 'floyd'
+        return 'dijkstra'
+
+    def _apsp_edges(self):
+        """Дуги без кратних ребер і петель у нумерації матриць M/T"""
+        pos = np.empty(self.graph.n, dtype=np.int64)
+        pos[self.order] = np.arange(self.graph.n)
+        src, dst, w, _ = self._collapsed_edges()
+        return pos[src], pos[dst], w.astype(float)
+
+    def _johnson_potential(self):
+        """Потенціали h Беллмана-Форда від фіктивної вершини; None - є від'ємний цикл"""
+        g = self.graph
+        if not self.is_directed or (g.edge_weight[g.edge_src == g.edge_dst] < 0).any():
+            return None
+        n = g.n
+        u, v, w = self._apsp_edges()
+        # Фіктивна вершина n з дугами нульової ваги до всіх вершин
+        graph = csr_matrix(
+            (np.concatenate((w, np.zeros(n))), (np.concatenate((u, np.full(n, n))), np.concatenate((v, np.arange(n))))),
+            shape=(n + 1, n + 1)
+        )
+        try:
+            return bellman_ford(graph, directed=True, indices=n)[:n]
+        except NegativeCycleError:
+            return None
+
+FLOYD_HISTORY_MODES = ('full', 'delta', 'final')
+APSP_METHODS = ('auto', 'floyd', 'dijkstra', 'johnson')
+# Менші графи обробляються в поточному процесі: запуск пулу дорожчий за обчислення
+APSP_PARALLEL_MIN_VERTICES = 1000
+
+def _dijkstra_rows(n, u, v, w, sources):
+    """Рядки матриць відстаней і попередників для sources (виконується в процесі пулу)"""
+    graph = csr_matrix((w, (u, v)), shape=(n, n))
+    return dijkstra(graph, directed=True, indices=sources, return_predecessors=True)
+
+_apsp_executor = None
+_apsp_workers = 0
+_apsp_users = 0
+_apsp_lock = threading.Lock()
+
+@contextmanager
+def _apsp_pool(workers):
+    """Спільний пул процесів APSP на час одного обчислення.
+
+    Пул з іншою кількістю процесів перебудовується лише тоді, коли ним ніхто
+    не користується; інакше запит працює з наявним пулом. Старий пул
+    закривається без скасування: уже надіслані групи доходять до кінця.
+    """
+    global _apsp_executor, _apsp_workers, _apsp_users
+    with _apsp_lock:
+        if _apsp_executor is None or (_apsp_workers != workers and not _apsp_users):
+            if _apsp_executor is not None:
+                _apsp_executor.shutdown(wait=False)
+            _apsp_executor = ProcessPoolExecutor(max_workers=workers, mp_context=multiprocessing.get_context('spawn'))
+            _apsp_workers = workers
+        _apsp_users += 1
+        executor = _apsp_executor
+    try:
+        yield executor
+    finally:
+        with _apsp_lock:
+            _apsp_users -= 1
+
+def _discard_apsp_executor(executor):
+    """Прибирає зламаний пул, якщо його ще не замінив інший запит"""
+    global _apsp_executor
+    with _apsp_lock:
+        if _apsp_executor is executor:
+            executor.shutdown(wait=False)
+            _apsp_executor = None
+
+def _all_sources_dijkstra(n, u, v, w, workers=1):
+    """Дейкстра (SciPy, купа) з кожної вершини; джерела діляться на групи між процесами.
+
+    У демонічних процесах (пул асинхронних ендпоінтів, фонові задачі) дочірні
+    процеси заборонені - там обчислення виконується послідовно.
+    """
+    sources = np.arange(n)
+    if workers <= 1 or n < APSP_PARALLEL_MIN_VERTICES or multiprocessing.current_process().daemon:
+        return _dijkstra_rows(n, u, v, w, sources)
+    with _apsp_pool(workers) as executor:
+        try:
+            futures = [executor.submit(_dijkstra_rows, n, u, v, w, chunk)
+                       for chunk in np.array_split(sources, workers * 2)]
+            parts = [future.result() for future in futures]
+        except BrokenProcessPool:
+            _discard_apsp_executor(executor)
+            return _dijkstra_rows(n, u, v, w, sources)
+    return np.vstack([d for d, _ in parts]), np.vstack([p for _, p in parts])
+
+def _through_negative_vertex(dist, k):
+    """Кандидати шляхів через k, коли dist[k][k] < 0 (k лежить на від'ємному циклі).
+
+    Класичний Флойд оновлює матрицю на місці рядок за рядком, тож на такому
+    кроці рядок і стовпець k змінюються під час самого кроку: dist[i][k]
+    зменшується на кроці j = k, рядок k - коли до нього доходить черга, а
+    dist[k][k] подвоюється. Тут ці значення відтворюються для кожної клітинки,
+    щоб M і T збігалися з послідовною релаксацією. Рядок T[k] на кроці k не
+    змінюється, тому попередники беруться з нього як зазвичай.
+    """
+    n = len(dist)
+    d_kk = dist[k, k]
+    after = np.arange(n) > k
+    # Значення dist[k][k], яке бачить рядок i: до обробки рядка k - d_kk, після - 2 * d_kk
+    seen_kk = np.where(after, 2 * d_kk, d_kk)
+    row, col = dist[k], dist[:, k]
+    # Рядок k після обробки (клітинка j бачить dist[k][k] до або після кроку j = k)
+    new_row = np.minimum(row, row + seen_kk)
+    new_row[k] = 2 * d_kk
+    # dist[i][k] після кроку j = k у рядку i
+    new_col = np.minimum(col, col + seen_kk)
+    through_k = (np.where(after[None, :], new_col[:, None], col[:, None])
+                 + np.where(after[:, None], new_row[None, :], row[None, :]))
+    through_k[:, k] = new_col
+    through_k[k] = new_row
+    return through_k
+
+def _format_distance(x):
+    """Форматування відстані для фронтенду: ∞ або ціле число, якщо можливо"""
+    return "∞" if x == float('inf') else (int(x) if x == int(x) else x)
+
+def _floyd_snapshot(dist, pred):
+    """Форматування матриць для фронтенду (як _format_distance, але для всієї матриці)"""
+    finite = np.isfinite(dist)
+    integral = finite & (dist == np.round(dist))
+    small = integral & (np.abs(dist) < 2 ** 62)
+    values = dist.astype(object)
+    values[small] = dist[small].astype(np.int64).astype(object)
+    # Цілі за межами int64 - поштучно
+    values[integral & ~small] = [int(x) for x in dist[integral & ~small].tolist()]
+    values[~finite] = "∞"
+    return {
+        "M": values.tolist(),
+        "T": pred.tolist()
+    }
+
 # Функції виклику для Django Views
-def run_floyd(nodes, edges, is_directed):
-    finder = PathFinder(nodes, edges, is_directed)
-    return finder.run_floyd_warshall()
+# graph - готовий CompactGraph (напр. зі сховища графів) замість nodes/edges
+def run_floyd(nodes, edges, is_directed, history='full', graph=None):
+    finder = PathFinder(nodes, edges, is_directed, graph=graph)
+    with phase('floyd'):
+        return finder.run_floyd_warshall(history)
+
+def run_apsp(nodes, edges, is_directed, method='auto', workers=1, graph=None):
+    finder = PathFinder(nodes, edges, is_directed, graph=graph)
+    with phase('apsp'):
+        return finder.run_apsp(method, workers)
+
+def run_dijkstra(nodes, edges, is_directed, start_node, end_node, graph=None):
+    finder = PathFinder(nodes, edges, is_directed, graph=graph)
+    with phase('dijkstra'):
+        return finder.run_dijkstra(start_node, end_node)
 
-def run_dijkstra(nodes, edges, is_directed, start_node, end_node):
-    finder = PathFinder(nodes, edges, is_directed)
-    return finder.run_dijkstra(start_node, end_node)
\ No newline at end of file
+def run_dijkstra_many(nodes, edges, is_directed, start_nodes, end_nodes=None, graph=None):
+    finder = PathFinder(nodes, edges, is_directed, graph=graph)
+    with phase('dijkstra'):
+        return finder.run_dijkstra_many(start_nodes, end_nodes)
\ No newline at end of file
@@ -1,128 +1,81 @@
-import networkx as nx
+from .compact_graph import CompactGraph
+from .euler import EulerSolver
+from .hamiltonian import DEFAULT_TIME_BUDGET, HamiltonianSearch
+from .invariants import InvariantsSolver
+from .lazy import LazyProperties
 
-class GraphSolvers:
-    def __init__(self, nodes, edges, is_directed=False):
-        self.is_directed = is_directed
-        self.G = nx.MultiDiGraph() if is_directed else nx.MultiGraph()
-        self.labels = {}
-        
-        for node in nodes:
-            n_id = str(node.get('id'))
-            self.labels[n_id] = node.get('label', f"v{n_id}")
-            self.G.add_node(n_id)
-        
-        for edge in edges:
-            u, v = str(edge.get('from')), str(edge.get('to'))
-            if u in self.G and v in self.G:
-                # Зберігаємо оригінальний ID ребра в атрибутах NetworkX
-                self.G.add_edge(u, v, weight=float(edge.get('weight', 1)), id=edge.get('id'))
+class GraphSolvers(LazyProperties):
+    # Задачі, які можна запитати окремо через fields
+    FIELDS = ('euler', 'hamilton', 'invariants')
 
-    def _get_path_edges(self, path_ids):
-        """Знаходить послідовність ID ребер для заданого шляху вершин"""
-        edge_ids = []
-        for i in range(len(path_ids) - 1):
-            u, v = path_ids[i], path_ids[i+1]
-            # Шукаємо ребро, яке ще не було додане (актуально для мультиграфів)
-            for key, data in self.G.get_edge_data(u, v).items():
-                if data['id'] not in edge_ids:
-                    edge_ids.append(data['id'])
-                    break
-        return edge_ids
+    def __init__(self, nodes, edges, is_directed=False, graph=None, time_budget=DEFAULT_TIME_BUDGET,
+                 approximate_invariants=False):
+        self.graph = graph if graph is not None else CompactGraph.from_payload(nodes, edges, is_directed)
+        self.is_directed = self.graph.is_directed
+        self.labels = dict(zip(self.graph.node_ids, self.graph.labels))
+        # Ліміт часу (секунди) для переборних задач
+        self.time_budget = time_budget
+        # Жадібні оцінки інваріантів замість точного перебору (для великих графів)
+        self.approximate_invariants = approximate_invariants
 
     def get_eulerian_info(self):
-        result = {"type": "none", "path": [], "edge_ids": [], "message": "Ейлерових структур не знайдено"}
-        nodes_with_edges = [n for n, d in self.G.degree() if d > 0]
-        if not nodes_with_edges: return result
-        sub = self.G.subgraph(nodes_with_edges)
+        g = self.graph
+        res = EulerSolver(g).run()
+        messages = {"cycle": "Знайдено Ейлерів цикл", "path": "Знайдено Ейлерів шлях"}
+        if res['type'] == "none":
+            return {"type": "none", "path": [], "edge_ids": [], "message": "Ейлерових структур не знайдено"}
+        return {
+            "type": res['type'],
+            "path": [g.label(u) for u in res['vertices']],
+            "edge_ids": [g.edge_ids[e] for e in res['edges']],
+            "message": messages[res['type']]
+        }
 
-        try:
-            if nx.is_eulerian(sub):
-                # Отримуємо цикл з ключами ребер
-                circuit = list(nx.eulerian_circuit(sub, keys=True))
-                path_ids = [u for u, v, k in circuit] + [circuit[0][0]]
-                # Витягуємо конкретні ID ребер мультиграфа
-                edge_ids = [sub[u][v][k]['id'] for u, v, k in circuit]
-                return {
-                    "type": "cycle", 
-                    "path": [self.labels[n] for n in path_ids], 
-                    "edge_ids": edge_ids,
-                    "message": "Знайдено Ейлерів цикл"
-                }
-            
-            if nx.has_eulerian_path(sub):
-                path_edges = list(nx.eulerian_path(sub, keys=True))
-                path_ids = [u for u, v, k in path_edges] + [path_edges[-1][1]]
-                edge_ids = [sub[u][v][k]['id'] for u, v, k in path_edges]
-                return {
-                    "type": "path", 
-                    "path": [self.labels[n] for n in path_ids], 
-                    "edge_ids": edge_ids,
-                    "message": "Знайдено Ейлерів шлях"
-                }
-        except Exception: pass
-        return result
+    def _get_edge_ids(self, path_idx):
+        """ID першого ребра між кожною парою сусідніх вершин шляху (індекси CompactGraph)"""
+        return [self.graph.unique_neighbors(u)[v] for u, v in zip(path_idx, path_idx[1:])]
 
     def get_hamiltonian_info(self):
-        nodes = list(self.G.nodes())
-        n = len(nodes)
-        if n == 0 or n > 12: return {"type": "none", "path": [], "edge_ids": [], "message": "Завеликий або порожній граф"}
+        g = self.graph
+        search = HamiltonianSearch(g, time_budget=self.time_budget)
+        res = search.run()
+        info = {"type": "none", "path": [], "edge_ids": [], "exact": res['exact'], "elapsed_ms": res['elapsed_ms']}
 
-        def find_ham(curr, path, looking_for_cycle):
-            if len(path) == n:
-                if not looking_for_cycle: return path
-                if not self.is_directed and n < 3: return None
-                if self.G.has_edge(path[-1], path[0]): return path + [path[0]]
-                return None
-            for neighbor in set(self.G.neighbors(curr)):
-                if neighbor not in path:
-                    res = find_ham(neighbor, path + [neighbor], looking_for_cycle)
-                    if res: return res
-            return None
+        if g.n == 0 or g.n > search.max_vertices:
+            return {**info, "message": "Завеликий або порожній граф"}
 
-        for start in nodes:
-            res = find_ham(start, [start], True)
-            if res:
-                return {"type": "cycle", "path": [self.labels[n] for n in res], "edge_ids": self._get_path_edges(res), "message": "Знайдено Гамільтонів цикл"}
-            
-        for start in nodes:
-            res = find_ham(start, [start], False)
-            if res:
-                return {"type": "path", "path": [self.labels[n] for n in res], "edge_ids": self._get_path_edges(res), "message": "Знайдено Гамільтонів шлях"}
+        for kind, message in (("cycle", "Знайдено Гамільтонів цикл"), ("path", "Знайдено Гамільтонів шлях")):
+            found = res[kind]
+            if found:
+                return {
+                    **info,
+                    "type": kind,
+                    "path": [g.label(u) for u in found],
+                    "edge_ids": [g.edge_ids[e] for e in self._get_edge_ids(found)],
+                    "message": message
+                }
 
-        return {"type": "none", "path": [], "edge_ids": [], "message": "Гамільтонових структур не знайдено"}
+        if not res['exact']:
+            return {**info, "message": "Перевищено ліміт часу пошуку Гамільтонових структур"}
+        return {**info, "message": "Гамільтонових структур не знайдено"}
 
-    # Додайте/оновіть метод у класі GraphSolvers в backend/api/logic/solvers.py
     def get_graph_invariants(self):
-        simple_G = nx.Graph(self.G.to_undirected())
-        simple_G.remove_edges_from(nx.selfloop_edges(simple_G))
-        
-        # Розрахунок розфарбування
-        coloring = nx.coloring.greedy_color(simple_G, strategy="largest_first")
-        chromatic_number = max(coloring.values(), default=-1) + 1
-        
-        try:
-            from networkx.algorithms import approximation
-            clique_number = len(approximation.max_clique(simple_G))
-            independence_set = approximation.maximum_independent_set(simple_G)
-            independence_number = len(independence_set)
-        except Exception:
-            clique_number = 0
-            independence_number = 0
+        # Точні значення з гілками і межами; при вичерпанні ліміту часу - межі
+        return InvariantsSolver(
+            self.graph, time_budget=self.time_budget, approximate=self.approximate_invariants
+        ).run()
 
+    def _field_getters(self):
         return {
-            "chromatic_number": chromatic_number,
-            "clique_number": clique_number,
-            "independence_number": independence_number,
-            "coloring": coloring  # ПОВЕРТАЄМО МАПУ {node_id: color_index}
+            "euler": self.get_eulerian_info,
+            "hamilton": self.get_hamiltonian_info,
+            "invariants": self.get_graph_invariants
         }
 
-    def get_all_solutions(self):
-        return {
-            "euler": self.get_eulerian_info(),
-            "hamilton": self.get_hamiltonian_info(),
-            "invariants": self.get_graph_invariants()
-        }
+    def get_all_solutions(self, fields=None):
+        """Лише запитані розв'язки (усі, якщо fields не задано) + computed_fields"""
+        return self.collect(fields)
 
-def run_solve(nodes, edges, is_directed):
-    solver = GraphSolvers(nodes, edges, is_directed)
-    return solver.get_all_solutions()
\ No newline at end of file
+def run_solve(nodes, edges, is_directed, fields=None, approximate_invariants=False, graph=None):
+    solver = GraphSolvers(nodes, edges, is_directed, graph=graph, approximate_invariants=approximate_invariants)
+    return solver.get_all_solutions(fields)
\ No newline at end of file
@@ -0,0 +1,66 @@
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+# Вимірювання поточного запиту; поза запитом (фонові задачі, бенчмарк) - None
+_current = ContextVar('graph_phase_timings', default=None)
+
+
+class PhaseTimings:
+    """Тривалість фаз одного запиту (секунди) та розміри графа.
+
+    Повторна фаза з тією ж назвою додається до вже виміряного часу.
+    """
+
+    def __init__(self):
+        self.phases = {}
+        self.sizes = {}
+
+    def add(self, name, seconds):
+        self.phases[name] = self.phases.get(name, 0.0) + seconds
+
+
+def start():
+    """Починає вимірювання в поточному контексті; повертає (timings, token)"""
+    timings = PhaseTimings()
+    return timings, _current.set(timings)
+
+
+def stop(token):
+    _current.reset(token)
+
+
+def current():
+    return _current.get()
+
+
+@contextmanager
+def phase(name):
+    """Вимірює блок як фазу name; без активного вимірювання нічого не робить"""
+    timings = _current.get()
+    if timings is None:
+        yield
+        return
+    started = time.perf_counter()
+    try:
+        yield
+    finally:
+        timings.add(name, time.perf_counter() - started)
+
+
+def record_graph(n, m):
+    """Запам'ятовує розмір графа поточного запиту (вершини, ребра)"""
+    timings = _current.get()
+    if timings is not None:
+        timings.sizes = {'nodes': n, 'edges': m}
+
+
+def merge(phases, sizes):
+    """Додає фази, виміряні деінде (напр. у дочірньому процесі), до поточного запиту"""
+    timings = _current.get()
+    if timings is None:
+        return
+    for name, seconds in phases.items():
+        timings.add(name, seconds)
+    if sizes:
+        timings.sizes = sizes
@@ -1,158 +1,185 @@
-import networkx as nx
+from collections import deque
+
+from .compact_graph import CompactGraph
+from .timing import phase
 
 class GraphTraverser:
-    def __init__(self, nodes, edges, is_directed=False):
-        self.is_directed = is_directed
-        self.nodes_dict = {str(n['id']): n.get('label', f"v{n['id']}") for n in nodes}
-        self.G = nx.MultiDiGraph() if is_directed else nx.MultiGraph()
-        
-        for node in nodes: 
-            self.G.add_node(str(node['id']))
-        
-        for edge in edges: 
-            self.G.add_edge(str(edge['from']), str(edge['to']), id=edge.get('id'))
+    def __init__(self, nodes, edges, is_directed=False, graph=None):
+        self.graph = graph if graph is not None else CompactGraph.from_payload(nodes, edges, is_directed)
+        self.is_directed = self.graph.is_directed
+        self.nodes_dict = dict(zip(self.graph.node_ids, self.graph.labels))
 
-    def run_dfs(self, start_node_id):
-        """DFS з детальним протоколом та коректним бектрекінгом."""
-        start_node_id = str(start_node_id)
-        if start_node_id not in self.nodes_dict:
-            return {"error": f"Вершину з ID {start_node_id} не знайдено"}
+        # Індекс будується один раз: сусіди кожної вершини, відсортовані за
+        # лейблом, та ID першого ребра для кожної пари (u, v)
+        offsets, neighbors, edge_idx = self.graph.sorted_adjacency()
+        self.offsets = offsets.tolist()
+        self.neighbors = neighbors.tolist()
+        edge_ids = self.graph.edge_ids
+        self.neighbor_edge_ids = [edge_ids[e] for e in edge_idx.tolist()]
 
-        protocol = []
-        visited = set()
-        stack = [start_node_id]
-        tree_edges = []
+    def _edge_label(self, u, v):
+        labels = self.graph.labels
+        if self.is_directed:
+            return f"({labels[u]}, {labels[v]})"
+        return f"{{{labels[u]}, {labels[v]}}}"
+
+    def _discovery(self, num_key, counter, u, v, slot):
+        """Крок відкриття вершини v по ребру дерева з u (slot - позиція в індексі)"""
+        g = self.graph
+        edge_id = self.neighbor_edge_ids[slot]
+        return {
+            "vertex": g.labels[v],
+            num_key: counter,
+            "push": g.labels[v],
+            "tree_edge": self._edge_label(u, v),
+            "edge_id": edge_id,
+            "tree": {"from": g.node_ids[u], "to": g.node_ids[v], "id": edge_id}
+        }
+
+    def check_start(self, start_node_id):
+        """Повідомлення про помилку, якщо стартової вершини немає, інакше None"""
+        if str(start_node_id) not in self.nodes_dict:
+            return f"Вершину з ID {start_node_id} не знайдено"
+        return None
+
+    # --- Компактний протокол: замість копії стеку/черги лише push/pop ---
+
+    def iter_dfs(self, start_node_id):
+        """Кроки DFS у компактному форматі.
+
+        Крок відкриття вершини містить "push" (лейбл, що кладеться на вершину
+        стеку) і "tree" (ребро дерева обходу); крок відкату - "pop": 1.
+        Стан стеку на кожному кроці клієнт відновлює сам.
+        """
+        start = self.graph.index[str(start_node_id)]
+        offsets, neighbors = self.offsets, self.neighbors
+        visited = [False] * self.graph.n
+        # Курсор кожної вершини: звідки продовжити перегляд її сусідів після
+        # повернення, тож кожен запис індексу переглядається лише раз
+        cursor = offsets[:-1]
+        visited[start] = True
+        stack = [start]
         counter = 1
-        
-        # Початковий стан
-        visited.add(start_node_id)
-        protocol.append({
-            "vertex": self.nodes_dict[start_node_id],
+
+        yield {
+            "vertex": self.graph.labels[start],
             "dfs_num": counter,
-            "stack": [self.nodes_dict[n] for n in stack],
+            "push": self.graph.labels[start],
             "tree_edge": "—",
             "edge_id": None
-        })
+        }
 
         while stack:
             u = stack[-1]
-            unvisited_neighbor = None
-            found_edge_id = None
-            
-            # Сортуємо сусідів для детермінованого обходу (напр. за лейблом або ID)
-            neighbors = sorted(list(self.G.neighbors(u)), key=lambda x: self.nodes_dict.get(x, x))
-            
-            for v in neighbors:
-                if v not in visited:
-                    unvisited_neighbor = v
-                    # Отримуємо ID першого ліпшого ребра між u та v
-                    edge_data = self.G.get_edge_data(u, v)
-                    key = list(edge_data.keys())[0]
-                    found_edge_id = edge_data[key].get('id')
-                    break
-            
-            if unvisited_neighbor:
+            slot, end = cursor[u], offsets[u + 1]
+            # Сусіди вже впорядковані за лейблом
+            while slot < end and visited[neighbors[slot]]:
+                slot += 1
+            cursor[u] = slot + 1
+
+            if slot < end:
                 counter += 1
-                v = unvisited_neighbor
-                visited.add(v)
+                v = neighbors[slot]
+                visited[v] = True
                 stack.append(v)
-                
-                edge_label = f"({self.nodes_dict[u]}, {self.nodes_dict[v]})" if self.is_directed else f"{{{self.nodes_dict[u]}, {self.nodes_dict[v]}}}"
-                tree_edges.append({"from": u, "to": v, "id": found_edge_id})
-
-                protocol.append({
-                    "vertex": self.nodes_dict[v],
-                    "dfs_num": counter,
-                    "stack": [self.nodes_dict[n] for n in stack],
-                    "tree_edge": edge_label,
-                    "edge_id": found_edge_id
-                })
+                yield self._discovery("dfs_num", counter, u, v, slot)
             else:
                 # ВІДКАТ (Backtracking)
                 stack.pop()
-                if stack:
-                    protocol.append({
-                        "vertex": "—",
-                        "dfs_num": "—",
-                        "stack": [self.nodes_dict[n] for n in stack],
-                        "tree_edge": "backtrack",
-                        "edge_id": None
-                    })
-                else:
-                    protocol.append({
-                        "vertex": "—",
-                        "dfs_num": "—",
-                        "stack": "∅",
-                        "tree_edge": "—",
-                        "edge_id": None
-                    })
-        
-        return {"protocol": protocol, "tree_edges": tree_edges}
+                yield {
+                    "vertex": "—",
+                    "dfs_num": "—",
+                    "pop": 1,
+                    "tree_edge": "backtrack" if stack else "—",
+                    "edge_id": None
+                }
 
-    def run_bfs(self, start_node_id):
-        """BFS з чергою та протоколом."""
-        start_node_id = str(start_node_id)
-        if start_node_id not in self.nodes_dict:
-            return {"error": f"Вершину з ID {start_node_id} не знайдено"}
-
-        protocol = []
-        visited = {start_node_id}
-        queue = [start_node_id]
-        tree_edges = []
+    def iter_bfs(self, start_node_id):
+        """Кроки BFS у компактному форматі: "push" додає лейбл у хвіст черги,
+        "pop": 1 знімає вершину з голови."""
+        start = self.graph.index[str(start_node_id)]
+        offsets, neighbors = self.offsets, self.neighbors
+        visited = [False] * self.graph.n
+        visited[start] = True
+        queue = deque([start])
         counter = 1
 
-        protocol.append({
-            "vertex": self.nodes_dict[start_node_id],
+        yield {
+            "vertex": self.graph.labels[start],
             "bfs_num": counter,
-            "queue": [self.nodes_dict[n] for n in queue],
+            "push": self.graph.labels[start],
             "tree_edge": "—",
             "edge_id": None
-        })
-
-        head_idx = 0
-        while head_idx < len(queue):
-            u = queue[head_idx]
-            
-            # Сортуємо для передбачуваності
-            neighbors = sorted(list(self.G.neighbors(u)), key=lambda x: self.nodes_dict.get(x, x))
-            
-            for v in neighbors:
-                if v not in visited:
+        }
+
+        while queue:
+            u = queue[0]
+
+            # Сусіди вже впорядковані за лейблом
+            for slot in range(offsets[u], offsets[u + 1]):
+                v = neighbors[slot]
+                if not visited[v]:
                     counter += 1
-                    visited.add(v)
+                    visited[v] = True
                     queue.append(v)
-                    
-                    edge_data = self.G.get_edge_data(u, v)
-                    key = list(edge_data.keys())[0]
-                    found_edge_id = edge_data[key].get('id')
-                    
-                    edge_label = f"({self.nodes_dict[u]}, {self.nodes_dict[v]})" if self.is_directed else f"{{{self.nodes_dict[u]}, {self.nodes_dict[v]}}}"
-                    tree_edges.append({"from": u, "to": v, "id": found_edge_id})
-
-                    protocol.append({
-                        "vertex": self.nodes_dict[v],
-                        "bfs_num": counter,
-                        "queue": [self.nodes_dict[n] for n in queue[head_idx:]], # Показуємо активну чергу
-                        "tree_edge": edge_label,
-                        "edge_id": found_edge_id
-                    })
-            
-            head_idx += 1
-            # Логуємо стан після видалення елемента з голови черги
-            current_queue = [self.nodes_dict[n] for n in queue[head_idx:]]
-            protocol.append({
+                    yield self._discovery("bfs_num", counter, u, v, slot)
+
+            # Вершина опрацьована - знімаємо її з голови черги
+            queue.popleft()
+            yield {
                 "vertex": "—",
                 "bfs_num": "—",
-                "queue": current_queue if current_queue else "∅",
+                "pop": 1,
                 "tree_edge": "—",
                 "edge_id": None
-            })
+            }
 
+    # --- Повний протокол (зі знімком стеку/черги на кожному кроці) ---
+
+    def _expand(self, steps, num_key, container_key, pop_left):
+        """Розгортає компактні кроки у протокол зі знімками стеку або черги"""
+        protocol = []
+        tree_edges = []
+        container = deque()
+        for step in steps:
+            if "push" in step:
+                container.append(step["push"])
+            elif pop_left:
+                container.popleft()
+            else:
+                container.pop()
+            if "tree" in step:
+                tree_edges.append(step["tree"])
+            protocol.append({
+                "vertex": step["vertex"],
+                num_key: step[num_key],
+                container_key: list(container) if container else "∅",
+                "tree_edge": step["tree_edge"],
+                "edge_id": step["edge_id"]
+            })
         return {"protocol": protocol, "tree_edges": tree_edges}
 
+    def run_dfs(self, start_node_id):
+        """DFS з детальним протоколом та коректним бектрекінгом."""
+        error = self.check_start(start_node_id)
+        if error:
+            return {"error": error}
+        return self._expand(self.iter_dfs(start_node_id), "dfs_num", "stack", pop_left=False)
+
+    def run_bfs(self, start_node_id):
+        """BFS з чергою та протоколом."""
+        error = self.check_start(start_node_id)
+        if error:
+            return {"error": error}
+        return self._expand(self.iter_bfs(start_node_id), "bfs_num", "queue", pop_left=True)
+
 # Глобальні функції виклику
-def run_dfs(nodes, edges, is_directed, start_node):
-    return GraphTraverser(nodes, edges, is_directed).run_dfs(start_node)
+def run_dfs(nodes, edges, is_directed, start_node, graph=None):
+    traverser = GraphTraverser(nodes, edges, is_directed, graph=graph)
+    with phase('dfs'):
+        return traverser.run_dfs(start_node)
 
-def run_bfs(nodes, edges, is_directed, start_node):
-    return GraphTraverser(nodes, edges, is_directed).run_bfs(start_node)
\ No newline at end of file
+def run_bfs(nodes, edges, is_directed, start_node, graph=None):
+    traverser = GraphTraverser(nodes, edges, is_directed, graph=graph)
+    with phase('bfs'):
+        return traverser.run_bfs(start_node)
@@ -0,0 +1,53 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from api import benchmark
+
+
+class Command(BaseCommand):
+    help = "Бенчмарк логічних модулів на згенерованих графах (збереження та порівняння базових ліній)"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--tiers', default='small,medium', help="Рівні розміру: small,medium,large")
+        parser.add_argument('--families', default='', help=f"Сімейства графів: {','.join(benchmark.FAMILIES)}")
+        parser.add_argument('--entries', default='', help="Точки входу: analyze,floyd,dijkstra,dfs,bfs,solve")
+        parser.add_argument('--repeat', type=int, default=3)
+        parser.add_argument('--seed', type=int, default=0)
+        parser.add_argument('--save', help="Зберегти результати як JSON базову лінію")
+        parser.add_argument('--compare', help="Порівняти з базовою лінією з JSON-файлу")
+        parser.add_argument('--threshold', type=float, default=0.2,
+                            help="Допустиме сповільнення (0.2 = +20%%)")
+
+    def handle(self, *args, **options):
+        split = lambda value: [item for item in value.split(',') if item]
+        tiers = split(options['tiers'])
+        unknown = [tier for tier in tiers if tier not in benchmark.TIERS]
+        if unknown:
+            raise CommandError(f"Невідомий рівень: {', '.join(unknown)}")
+
+        def log(key, stats):
+            self.stdout.write(
+                f"{key:<32} V={stats['V']:<6} E={stats['E']:<7} "
+                f"{stats['median_ms']:>10.2f} ms {stats['peak_kb']:>10.1f} KB"
+            )
+
+        report = benchmark.run_benchmarks(
+            tiers=tiers,
+            families=split(options['families']),
+            entries=split(options['entries']),
+            repeat=options['repeat'],
+            seed=options['seed'],
+            log=log,
+        )
+        if options['save']:
+            benchmark.save(report, options['save'])
+            self.stdout.write(self.style.SUCCESS(f"Базову лінію збережено: {options['save']}"))
+
+        if options['compare']:
+            rows = benchmark.compare(benchmark.load(options['compare']), report, options['threshold'])
+            regressions = [row for row in rows if row[5]]
+            for key, metric, old, new, ratio, regressed in rows:
+                line = f"{key:<32} {metric:<10} {old:>10} -> {new:>10}  x{ratio:.2f}"
+                self.stdout.write(self.style.ERROR(line) if regressed else line)
+            if regressions:
+                raise CommandError(f"Регресій понад {options['threshold']:.0%}: {len(regressions)}")
+            self.stdout.write(self.style.SUCCESS("Регресій не виявлено"))
@@ -0,0 +1,24 @@
+from django.core.management.base import BaseCommand
+
+from api import admission
+
+
+class Command(BaseCommand):
+    help = "Калібрування моделі вартості операцій за реальним часом виконання"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--ops', default='', help=f"Операції: {','.join(admission.CALIBRATION)}")
+        parser.add_argument('--seed', type=int, default=0)
+        parser.add_argument('--save', help="Зберегти коефіцієнти в JSON (для GRAPH_ADMISSION['COST_MODEL'])")
+
+    def handle(self, *args, **options):
+        def log(op, V, E, elapsed):
+            self.stdout.write(f"{op:<16} V={V:<6} E={E:<7} {elapsed * 1000:>10.1f} ms")
+
+        ops = [op for op in options['ops'].split(',') if op]
+        coefficients = admission.calibrate(ops=ops, seed=options['seed'], log=log)
+        for op, values in coefficients.items():
+            self.stdout.write(f"{op:<16} {values}")
+        if options['save']:
+            admission.save_coefficients(coefficients, options['save'])
+            self.stdout.write(self.style.SUCCESS(f"Коефіцієнти збережено: {options['save']}"))
@@ -0,0 +1,236 @@
+import bisect
+import cProfile
+import random
+import re
+import threading
+import time
+from pathlib import Path
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from django.conf import settings
+
+from .logic import timing
+
+# Межі кошиків гістограм: тривалість (секунди) та розмір графа (вершини/ребра)
+DURATION_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60)
+SIZE_BUCKETS = (10, 100, 1000, 10000, 100000, 1000000)
+
+
+class Histogram:
+    """Гістограма у стилі Prometheus: лічильники кошиків, сума і кількість"""
+
+    def __init__(self, buckets):
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)
+        self.sum = 0.0
+        self.count = 0
+
+    def observe(self, value):
+        self.counts[bisect.bisect_left(self.buckets, value)] += 1
+        self.sum += value
+        self.count += 1
+
+    def cumulative(self):
+        """Пари (межа, кількість спостережень <= межі), остання межа - +Inf"""
+        total = 0
+        for bound, count in zip(self.buckets + ('+Inf',), self.counts):
+            total += count
+            yield bound, total
+
+
+def _labels(**labels):
+    escape = lambda value: str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+    return ','.join(f'{key}="{escape(value)}"' for key, value in labels.items())
+
+
+class MetricsRegistry:
+    """Агреговані метрики запитів процесу (у кожного воркера - власні)"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._requests = {}
+        self._durations = {}
+        self._sizes = {}
+
+    def observe(self, endpoint, status_code, timings, total):
+        with self._lock:
+            key = (endpoint, str(status_code))
+            self._requests[key] = self._requests.get(key, 0) + 1
+            for name, seconds in (('total', total), *timings.phases.items()):
+                self._histogram(self._durations, (endpoint, name), DURATION_BUCKETS).observe(seconds)
+            for kind, value in timings.sizes.items():
+                self._histogram(self._sizes, (endpoint, kind), SIZE_BUCKETS).observe(value)
+
+    @staticmethod
+    def _histogram(store, key, buckets):
+        if key not in store:
+            store[key] = Histogram(buckets)
+        return store[key]
+
+    def render(self):
+        """Усі метрики в текстовому форматі Prometheus (version 0.0.4)"""
+        lines = []
+        with self._lock:
+            lines += [
+                '# HELP graph_requests_total Кількість запитів до API за ендпоінтом і статусом',
+                '# TYPE graph_requests_total counter',
+            ]
+            for (endpoint, code), count in sorted(self._requests.items()):
+                lines.append(f'graph_requests_total{{{_labels(endpoint=endpoint, status=code)}}} {count}')
+            self._render_histograms(
+                lines, 'graph_phase_duration_seconds',
+                'Тривалість фаз обробки запиту (total - увесь запит)', self._durations, 'phase'
+            )
+            self._render_histograms(
+                lines, 'graph_request_size',
+                'Розмір графа запиту (kind: nodes або edges)', self._sizes, 'kind'
+            )
+        return '\n'.join(lines) + '\n'
+
+    @staticmethod
+    def _render_histograms(lines, name, help_text, store, label):
+        lines += [f'# HELP {name} {help_text}', f'# TYPE {name} histogram']
+        for (endpoint, value), histogram in sorted(store.items()):
+            labels = {'endpoint': endpoint, label: value}
+            for bound, count in histogram.cumulative():
+                lines.append(f'{name}_bucket{{{_labels(**labels, le=bound)}}} {count}')
+            lines.append(f'{name}_sum{{{_labels(**labels)}}} {histogram.sum:.6f}')
+            lines.append(f'{name}_count{{{_labels(**labels)}}} {histogram.count}')
+
+
+class SlowRequestProfiler:
+    """Вибірковий cProfile: статистика зберігається лише для запитів,
+    повільніших за threshold_ms. Одночасно профілюється не більше одного
+    запиту (cProfile не підтримує кілька активних профайлерів).
+
+    cProfile бачить лише потік, що обробляє запит: робота в пулах процесів
+    (асинхронні ендпоінти, задачі, пакети, паралельний APSP) у профілі
+    видна тільки як очікування результату.
+    """
+
+    def __init__(self, threshold_ms, sample_rate=1.0, directory='profiles'):
+        self.threshold_ms = threshold_ms
+        self.sample_rate = sample_rate
+        self.directory = Path(directory)
+        self._lock = threading.Lock()
+
+    def start(self):
+        """Профайлер для запиту, якщо він потрапив у вибірку, інакше None"""
+        if random.random() >= self.sample_rate or not self._lock.acquire(blocking=False):
+            return None
+        profile = cProfile.Profile()
+        try:
+            profile.enable()
+        except ValueError:
+            # Активний інший профайлер (напр. налагоджувач)
+            self._lock.release()
+            return None
+        return profile
+
+    def finish(self, profile, endpoint, total):
+        """Зупиняє профайлер; повертає шлях до файлу статистики або None"""
+        try:
+            profile.disable()
+        finally:
+            self._lock.release()
+        elapsed_ms = total * 1000
+        if elapsed_ms < self.threshold_ms:
+            return None
+        self.directory.mkdir(parents=True, exist_ok=True)
+        slug = re.sub(r'[^A-Za-z0-9]+', '-', endpoint).strip('-') or 'root'
+        path = self.directory / f"{time.strftime('%Y%m%d-%H%M%S')}-{slug}-{elapsed_ms:.0f}ms.prof"
+        profile.dump_stats(path)
+        return path
+
+
+class TimingMiddleware:
+    """Вимірює фази запитів до API (побудова графа, окремі задачі, рендеринг JSON).
+
+    Фази додає в заголовок Server-Timing і в гістограми реєстру метрик.
+    Для потокових відповідей вимірюється лише час до початку відповіді.
+    Працює і в синхронному (WSGI), і в асинхронному (ASGI) ланцюжку.
+    Профілюються лише синхронні запити поза PROFILE_SKIP_PREFIXES: в
+    асинхронному ланцюжку і на маршрутах, що передають обчислення в пул
+    процесів, профіль показав би лише очікування.
+    """
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self.is_async = iscoroutinefunction(get_response)
+        if self.is_async:
+            markcoroutinefunction(self)
+        config = getattr(settings, 'GRAPH_METRICS', {})
+        self.prefix = config.get('PATH_PREFIX', '/api/')
+        self.profile_skip = tuple(config.get('PROFILE_SKIP_PREFIXES', ()))
+        threshold = config.get('PROFILE_SLOW_MS')
+        self.profiler = SlowRequestProfiler(
+            threshold,
+            sample_rate=config.get('PROFILE_SAMPLE_RATE', 1.0),
+            directory=config.get('PROFILE_DIR', 'profiles'),
+        ) if threshold is not None else None
+
+    def __call__(self, request):
+        if self.is_async:
+            return self.__acall__(request)
+        if not request.path.startswith(self.prefix):
+            return self.get_response(request)
+        state = self._begin(profile=not request.path.startswith(self.profile_skip))
+        try:
+            response = self.get_response(request)
+        finally:
+            self._end(request, state)
+        return self._finish(request, response, state)
+
+    async def __acall__(self, request):
+        if not request.path.startswith(self.prefix):
+            return await self.get_response(request)
+        state = self._begin(profile=False)
+        try:
+            response = await self.get_response(request)
+        finally:
+            self._end(request, state)
+        return self._finish(request, response, state)
+
+    def _begin(self, profile):
+        timings, token = timing.start()
+        profile = self.profiler.start() if self.profiler and profile else None
+        return {'timings': timings, 'token': token, 'profile': profile, 'started': time.perf_counter()}
+
+    def _end(self, request, state):
+        state['total'] = time.perf_counter() - state['started']
+        timing.stop(state['token'])
+        state['endpoint'] = request.resolver_match.route if request.resolver_match else 'unmatched'
+        if state['profile'] is not None:
+            self.profiler.finish(state['profile'], state['endpoint'], state['total'])
+
+    def _finish(self, request, response, state):
+        timings, total = state['timings'], state['total']
+        response['Server-Timing'] = server_timing_header(timings, total)
+        get_metrics_registry().observe(state['endpoint'], response.status_code, timings, total)
+        return response
+
+    def process_template_response(self, request, response):
+        # Відповідь DRF рендериться вже після view - рахуємо це окремою фазою
+        timings = timing.current()
+        if timings is not None:
+            started = time.perf_counter()
+            response.add_post_render_callback(lambda r: timings.add('render', time.perf_counter() - started))
+        return response
+
+
+def server_timing_header(timings, total):
+    """Значення Server-Timing: фази в мілісекундах і розмір графа в desc"""
+    parts = [f'{name};dur={seconds * 1000:.2f}' for name, seconds in timings.phases.items()]
+    parts.append(f'total;dur={total * 1000:.2f}')
+    if timings.sizes:
+        parts.append(f'graph;desc="V={timings.sizes["nodes"]} E={timings.sizes["edges"]}"')
+    return ', '.join(parts)
+
+
+_registry = MetricsRegistry()
+
+
+def get_metrics_registry():
+    return _registry
@@ -0,0 +1,69 @@
+import threading
+import time
+import uuid
+from collections import OrderedDict
+
+from django.conf import settings
+
+from .logic.graph_session import GraphSession
+
+
+class SessionRegistry:
+    """Реєстр графових сесій у пам'яті процесу (LRU + час неактивності);
+    max_vertices/max_edges - найбільший розмір графа однієї сесії"""
+
+    def __init__(self, max_sessions=256, ttl=3600, max_vertices=None, max_edges=None):
+        self.max_sessions = max_sessions
+        self.ttl = ttl
+        self.max_vertices = max_vertices
+        self.max_edges = max_edges
+        self._sessions = OrderedDict()
+        self._lock = threading.Lock()
+
+    def create(self, nodes, edges, is_directed=False):
+        session = GraphSession(nodes, edges, is_directed, self.max_vertices, self.max_edges)
+        session_id = uuid.uuid4().hex
+        with self._lock:
+            self._expire()
+            self._sessions[session_id] = (session, time.monotonic())
+            while len(self._sessions) > self.max_sessions:
+                self._sessions.popitem(last=False)
+        return session_id, session
+
+    def get(self, session_id):
+        with self._lock:
+            self._expire()
+            entry = self._sessions.get(session_id)
+            if entry is None:
+                return None
+            self._sessions[session_id] = (entry[0], time.monotonic())
+            self._sessions.move_to_end(session_id)
+            return entry[0]
+
+    def delete(self, session_id):
+        with self._lock:
+            return self._sessions.pop(session_id, None) is not None
+
+    def _expire(self):
+        now = time.monotonic()
+        while self._sessions:
+            session_id, (_, touched) = next(iter(self._sessions.items()))
+            if now - touched <= self.ttl:
+                break
+            del self._sessions[session_id]
+
+
+_registry = None
+_registry_lock = threading.Lock()
+
+
+def get_session_registry():
+    """Спільний реєстр, налаштований через settings.GRAPH_SESSIONS"""
+    global _registry
+    if _registry is None:
+        with _registry_lock:
+            if _registry is None:
+                config = getattr(settings, 'GRAPH_SESSIONS', {})
+                _registry = SessionRegistry(config.get('MAX_SESSIONS', 256), config.get('TTL', 3600),
+                                            config.get('MAX_VERTICES'), config.get('MAX_EDGES'))
+    return _registry
@@ -0,0 +1,241 @@
+import asyncio
+import fcntl
+import json
+import os
+import threading
+import time
+from concurrent.futures import Future
+
+from django.conf import settings
+
+
+class _LeaderGone(Exception):
+    """Ведучий виклик перервано (скасування, вихід) - очікувачі пробують знову"""
+
+
+class SingleFlight:
+    """Злиття однакових одночасних обчислень (single-flight).
+
+    Перший виклик із ключем стає ведучим і обчислює результат, решта викликів
+    з тим самим ключем у процесі чекають на нього і отримують той самий
+    результат або ту саму помилку. Ведучі різних процесів координуються
+    файловим блокуванням <directory>/<key>.lock: процес, що чекав на
+    блокування, залишає позначку <key>.wait, і тоді ведучий публікує
+    результат у <key>.json, звідки його читають протягом result_ttl секунд.
+    Злиття - лише оптимізація: у рідкісних гонках (напр. під час очищення
+    старих файлів) обчислення може виконатися двічі, але не зламатися.
+    """
+
+    def __init__(self, directory=None, result_ttl=5.0, poll_interval=0.02, prune_interval=60.0):
+        self.directory = str(directory) if directory else None
+        if self.directory:
+            os.makedirs(self.directory, exist_ok=True)
+        self.result_ttl = result_ttl
+        self.poll_interval = poll_interval
+        self.prune_interval = prune_interval
+        self._calls = {}
+        self._lock = threading.Lock()
+        self._pruned = time.monotonic()
+        self.computed = 0
+        self.coalesced = 0
+        self.shared_between_processes = 0
+
+    # --- Злиття в межах процесу ---
+
+    def _join(self, key):
+        """(Future обчислення, чи цей виклик ведучий)"""
+        with self._lock:
+            future = self._calls.get(key)
+            if future is not None:
+                self.coalesced += 1
+                return future, False
+            future = self._calls[key] = Future()
+            # Стан RUNNING: скасування очікувача не скасовує спільний Future
+            future.set_running_or_notify_cancel()
+            return future, True
+
+    def _finish(self, key, future, result=None, error=None):
+        with self._lock:
+            self._calls.pop(key, None)
+        if error is None:
+            future.set_result(result)
+        else:
+            future.set_exception(error if isinstance(error, Exception) else _LeaderGone())
+
+    def do(self, key, compute):
+        """compute() один раз на ключ; (результат, чи отримано від чужого обчислення)"""
+        while True:
+            future, leader = self._join(key)
+            if not leader:
+                try:
+                    return future.result(), True
+                except _LeaderGone:
+                    continue
+            try:
+                result, shared = self._lead(key, compute)
+            except BaseException as e:
+                self._finish(key, future, error=e)
+                raise
+            self._finish(key, future, result)
+            return result, shared
+
+    async def do_async(self, key, compute):
+        """Те саме для корутини compute() - для асинхронних views"""
+        while True:
+            future, leader = self._join(key)
+            if not leader:
+                try:
+                    return await asyncio.wrap_future(future), True
+                except _LeaderGone:
+                    continue
+            try:
+                result, shared = await self._lead_async(key, compute)
+            except BaseException as e:
+                self._finish(key, future, error=e)
+                raise
+            self._finish(key, future, result)
+            return result, shared
+
+    def _count_computed(self):
+        with self._lock:
+            self.computed += 1
+
+    # --- Злиття між процесами ---
+
+    def _path(self, key, suffix):
+        return os.path.join(self.directory, f'{key}.{suffix}')
+
+    def _lead(self, key, compute):
+        if self.directory is None:
+            self._count_computed()
+            return compute(), False
+        with open(self._path(key, 'lock'), 'ab') as lock:
+            try:
+                fcntl.flock(lock, fcntl.LOCK_EX | fcntl.LOCK_NB)
+            except BlockingIOError:
+                # Інший процес уже обчислює: позначаємо очікування і чекаємо на нього
+                self._mark_waiting(key)
+                fcntl.flock(lock, fcntl.LOCK_EX)
+            try:
+                found = self._read_result(key)
+                if found is not None:
+                    return found, True
+                self._count_computed()
+                result = compute()
+                self._publish(key, result)
+                return result, False
+            finally:
+                fcntl.flock(lock, fcntl.LOCK_UN)
+                self._maybe_prune()
+
+    async def _lead_async(self, key, compute):
+        if self.directory is None:
+            self._count_computed()
+            return await compute(), False
+        with open(self._path(key, 'lock'), 'ab') as lock:
+            # Неблокуюче опитування: скасування корутини не лишає зайнятого блокування
+            waiting = False
+            while True:
+                try:
+                    fcntl.flock(lock, fcntl.LOCK_EX | fcntl.LOCK_NB)
+                    break
+                except BlockingIOError:
+                    if not waiting:
+                        self._mark_waiting(key)
+                        waiting = True
+                    await asyncio.sleep(self.poll_interval)
+            try:
+                found = await asyncio.to_thread(self._read_result, key)
+                if found is not None:
+                    return found, True
+                self._count_computed()
+                result = await compute()
+                await asyncio.to_thread(self._publish, key, result)
+                return result, False
+            finally:
+                fcntl.flock(lock, fcntl.LOCK_UN)
+                self._maybe_prune()
+
+    def _mark_waiting(self, key):
+        with open(self._path(key, 'wait'), 'ab'):
+            pass
+
+    def _publish(self, key, result):
+        """Результат у файл - лише якщо інший процес позначив, що чекає на нього"""
+        wait_path = self._path(key, 'wait')
+        if not os.path.exists(wait_path):
+            return
+        tmp_path = self._path(key, f'{os.getpid()}.tmp')
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(result, f, ensure_ascii=False, separators=(',', ':'))
+        os.replace(tmp_path, self._path(key, 'json'))
+        try:
+            os.unlink(wait_path)
+        except FileNotFoundError:
+            pass
+
+    def _read_result(self, key):
+        path = self._path(key, 'json')
+        try:
+            if time.time() - os.path.getmtime(path) > self.result_ttl:
+                os.unlink(path)
+                return None
+            with open(path, encoding='utf-8') as f:
+                result = json.load(f)
+        except (FileNotFoundError, ValueError):
+            return None
+        with self._lock:
+            self.shared_between_processes += 1
+        return result
+
+    def _maybe_prune(self):
+        """Видаляє застарілі файли результатів і вільні файли блокувань"""
+        now = time.monotonic()
+        with self._lock:
+            if now - self._pruned < self.prune_interval:
+                return
+            self._pruned = now
+        cutoff = time.time() - max(self.result_ttl, self.prune_interval)
+        for name in os.listdir(self.directory):
+            path = os.path.join(self.directory, name)
+            try:
+                if os.path.getmtime(path) > cutoff:
+                    continue
+                if name.endswith('.lock'):
+                    with open(path, 'ab') as lock:
+                        # Зайняте блокування не чіпаємо
+                        fcntl.flock(lock, fcntl.LOCK_EX | fcntl.LOCK_NB)
+                        os.unlink(path)
+                else:
+                    os.unlink(path)
+            except (BlockingIOError, FileNotFoundError):
+                continue
+
+    def stats(self):
+        with self._lock:
+            return {
+                'in_flight': len(self._calls),
+                'computed': self.computed,
+                'coalesced': self.coalesced,
+                'shared_between_processes': self.shared_between_processes,
+            }
+
+
+_flight = None
+_flight_lock = threading.Lock()
+
+
+def get_single_flight():
+    """Спільний екземпляр, налаштований через settings.GRAPH_SINGLE_FLIGHT (None, якщо вимкнено)"""
+    global _flight
+    config = getattr(settings, 'GRAPH_SINGLE_FLIGHT', {})
+    if not config.get('ENABLED', True):
+        return None
+    if _flight is None:
+        with _flight_lock:
+            if _flight is None:
+                _flight = SingleFlight(
+                    directory=config.get('LOCK_DIR'),
+                    result_ttl=config.get('RESULT_TTL', 5.0),
+                )
+    return _flight
@@ -0,0 +1,137 @@
+from django.test import SimpleTestCase, override_settings
+
+from api.admission import PLANNERS, AdmissionRejected, CostModel, admit, get_cost_model
+
+from .utils import ApiTestCase, payload
+
+FLOYD = {'history': 'full'}
+ANALYZE = {'fields': ['adjacency_matrix', 'degrees', 'connectivity'], 'matrix_format': 'dense', 'mode': 'full'}
+SOLVE = {'fields': ['euler', 'hamilton', 'invariants'], 'approximate_invariants': False}
+
+
+def _cost(endpoint, V, E, options, model=None):
+    return PLANNERS[endpoint][1](model or get_cost_model(), V, E, False, options)
+
+
+def _between(low, high):
+    """Ліміт, у який вкладається low, але не high"""
+    return (low + high) / 2
+
+
+class AdmitTests(SimpleTestCase):
+    model = CostModel()
+
+    def _admit(self, endpoint, options, max_seconds, V=300, E=3000):
+        return admit(endpoint, V, E, False, options, model=self.model, max_seconds=max_seconds)
+
+    def test_cheap_request_runs_as_requested(self):
+        options, decision = self._admit('floyd', FLOYD, 1e6)
+        self.assertEqual((options, decision['decision']), (FLOYD, 'run'))
+        self.assertNotIn('changes', decision)
+
+    def test_floyd_degrades_history_step_by_step(self):
+        costs = {h: _cost('floyd', 300, 3000, {'history': h}, self.model) for h in ('full', 'delta', 'final')}
+        self.assertLess(costs['final'], costs['delta'])
+        self.assertLess(costs['delta'], costs['full'])
+        for history, limit in (('delta', _between(costs['delta'], costs['full'])),
+                               ('final', _between(costs['final'], costs['delta']))):
+            options, decision = self._admit('floyd', FLOYD, limit)
+            self.assertEqual(options['history'], history)
+            self.assertEqual(decision['decision'], 'degrade')
+            self.assertEqual(decision['changes'], {'history': history})
+            self.assertEqual(decision['requested_estimated_ms'], round(costs['full'] * 1000, 1))
+            self.assertLessEqual(decision['estimated_ms'], decision['limit_ms'])
+
+    def test_analyze_degrades_to_sparse_then_without_connectivity_then_large(self):
+        sparse = {**ANALYZE, 'matrix_format': 'csr'}
+        without = {**sparse, 'fields': ['adjacency_matrix', 'degrees']}
+        large = {**ANALYZE, 'mode': 'large'}
+        costs = [_cost('analyze', 300, 3000, options, self.model) for options in (ANALYZE, sparse, without, large)]
+        self.assertEqual(costs, sorted(costs, reverse=True))
+        expected = [(sparse, {'matrix_format': 'csr'}),
+                    (without, {'matrix_format': 'csr', 'skipped_fields': ['connectivity']}),
+                    (large, {'mode': 'large'})]
+        for (options, changes), high, low in zip(expected, costs, costs[1:]):
+            with self.subTest(changes=changes):
+                admitted, decision = self._admit('analyze', ANALYZE, _between(low, high))
+                self.assertEqual((admitted, decision['changes']), (options, changes))
+
+    def test_solve_degrades_to_approximate_invariants(self):
+        exact = _cost('solve', 300, 3000, SOLVE, self.model)
+        approximate = _cost('solve', 300, 3000, {**SOLVE, 'approximate_invariants': True}, self.model)
+        options, decision = self._admit('solve', SOLVE, _between(approximate, exact))
+        self.assertTrue(options['approximate_invariants'])
+        self.assertEqual(decision['changes'], {'approximate_invariants': True})
+
+    def test_reject_when_cheapest_plan_exceeds_limit(self):
+        with self.assertRaises(AdmissionRejected) as raised:
+            self._admit('floyd', FLOYD, 1e-9)
+        decision = raised.exception.decision
+        self.assertEqual(decision['decision'], 'reject')
+        self.assertGreater(decision['requested_estimated_ms'], decision['estimated_ms'])
+        self.assertIn('V=300', decision['error'])
+
+    @override_settings(GRAPH_ADMISSION={'ENABLED': False})
+    def test_disabled_or_unknown_endpoint_is_not_checked(self):
+        self.assertEqual(self._admit('floyd', FLOYD, 1e-9), (FLOYD, None))
+
+    def test_unknown_endpoint_is_not_checked(self):
+        self.assertEqual(self._admit('dijkstra', {}, 1e-9), ({}, None))
+
+
+class AdmissionEndpointTests(ApiTestCase):
+    def setUp(self):
+        super().setUp()
+        n = 40
+        nodes, edges = payload(n, [(u, (u + k) % n) for u in range(n) for k in (1, 2, 5)])
+        self.graph = {'nodes': nodes, 'edges': edges, 'is_directed': False}
+        self.size = n, len(edges)
+
+    def _limit(self, endpoint, low, high):
+        return {'ENABLED': True, 'MAX_SECONDS': _between(_cost(endpoint, *self.size, low),
+                                                          _cost(endpoint, *self.size, high))}
+
+    def test_degraded_floyd_reports_changes_and_is_cached(self):
+        with self.settings(GRAPH_ADMISSION=self._limit('floyd', {'history': 'final'}, {'history': 'delta'})):
+            first = self.post('/api/floyd/', {**self.graph, 'history': 'full'})
+            second = self.post('/api/floyd/', {**self.graph, 'history': 'full'})
+        self.assertEqual(first.status_code, 200)
+        self.assertTrue(first['X-Admission'].startswith('degrade; estimated='))
+        body = first.json()
+        self.assertEqual((body['history'], len(body['steps'])), ('final', 1))
+        self.assertEqual(body['admission']['changes'], {'history': 'final'})
+        self.assertEqual((first['X-Cache'], second['X-Cache']), ('MISS', 'HIT'))
+        self.assertEqual(second.json(), body)
+        # Відповідь спрощеного запиту - та сама, що й для явно запитаного final
+        final = self.post('/api/floyd/', {**self.graph, 'history': 'final'})
+        self.assertEqual(final['X-Cache'], 'HIT')
+        self.assertNotIn('admission', final.json())
+
+    def test_degraded_analyze_and_solve(self):
+        request = {**self.graph, 'fields': ANALYZE['fields']}
+        with self.settings(GRAPH_ADMISSION=self._limit('analyze', {**ANALYZE, 'mode': 'large'},
+                                                       {**ANALYZE, 'matrix_format': 'csr',
+                                                        'fields': ['adjacency_matrix', 'degrees']})):
+            body = self.post('/api/analyze/', request).json()
+        self.assertEqual((body['mode'], body['admission']['changes']), ('large', {'mode': 'large'}))
+        self.assertIn('adjacency_matrix', body['skipped_fields'])
+
+        with self.settings(GRAPH_ADMISSION=self._limit('solve', {**SOLVE, 'approximate_invariants': True}, SOLVE)):
+            body = self.post('/api/solve/', self.graph).json()
+        self.assertEqual(body['admission']['changes'], {'approximate_invariants': True})
+        self.assertEqual(body['invariants']['chromatic_number'], body['invariants']['details']['chromatic_number']['upper'])
+
+    def test_rejected_request_is_unprocessable(self):
+        with self.settings(GRAPH_ADMISSION={'ENABLED': True, 'MAX_SECONDS': 1e-9}):
+            for url in ('/api/floyd/', '/api/analyze/', '/api/solve/', '/api/apsp/'):
+                with self.subTest(url=url):
+                    response = self.post(url, self.graph)
+                    self.assertEqual(response.status_code, 422)
+                    self.assertEqual(response.json()['admission']['decision'], 'reject')
+            # Ендпоінти без моделі вартості не обмежуються
+            self.assertEqual(self.post('/api/traverse/bfs/', {**self.graph, 'start_node': 0}).status_code, 200)
+
+    def test_accepted_request_has_run_header(self):
+        response = self.post('/api/floyd/', self.graph)
+        self.assertTrue(response['X-Admission'].startswith('run; '))
+        self.assertNotIn('admission', response.json())
@@ -0,0 +1,66 @@
+import json
+
+from django.test import override_settings
+
+from api.cache import get_result_cache
+from api.views import floyd_task, task_key
+
+from .utils import ApiTestCase, payload
+
+NODES, EDGES = payload(5, [(0, 1), (1, 2), (2, 3), (3, 4), (4, 0), (0, 2)], [3, 1, 4, 1, 5, 9])
+GRAPH = {'nodes': NODES, 'edges': EDGES, 'is_directed': False}
+OPERATIONS = [
+    ('analyze', {'fields': ['degrees', 'adjacency_list']}, '/api/analyze/'),
+    ('solve', {'fields': ['euler']}, '/api/solve/'),
+    ('traverse', {'type': 'bfs', 'start_node': 0}, '/api/traverse/bfs/'),
+    ('dijkstra', {'start_node': 0, 'end_node': 3}, '/api/dijkstra/'),
+    ('floyd', {'history': 'delta'}, '/api/floyd/'),
+    ('apsp', {'method': 'dijkstra'}, '/api/apsp/'),
+]
+
+
+class BatchEndpointTests(ApiTestCase):
+    def _batch(self, items):
+        response = self.client.post('/api/batch/', json.dumps({'items': items}), content_type='application/json')
+        lines = [json.loads(line) for line in b''.join(response.streaming_content).splitlines()]
+        self.assertTrue(lines[-1]['done'])
+        return lines[:-1]
+
+    def test_results_match_endpoints_and_fill_the_cache(self):
+        operations = [{'op': op, **params} for op, params, _ in OPERATIONS]
+        [item] = self._batch([{'graph': GRAPH, 'operations': operations}])
+        for (op, params, url), result in zip(OPERATIONS, item['results']):
+            with self.subTest(op=op):
+                response = self.post(url, {**GRAPH, **params})
+                self.assertEqual(response['X-Cache'], 'HIT')
+                self.assertEqual(response.json(), result)
+
+    def test_cached_results_are_not_recomputed(self):
+        data = {**GRAPH, 'history': 'final'}
+        get_result_cache().set(task_key(floyd_task(data), data), {'from_cache': True})
+        [item] = self._batch([{'graph': GRAPH, 'operations': [{'op': 'floyd', 'history': 'final'}]}])
+        self.assertEqual(item['results'], [{'from_cache': True}])
+
+    def test_operations_pass_admission(self):
+        items = [{'graph': GRAPH, 'operations': [{'op': 'floyd'}, {'op': 'traverse', 'start_node': 0}]}]
+        with override_settings(GRAPH_ADMISSION={'ENABLED': True, 'MAX_SECONDS': 1e-9}):
+            [item] = self._batch(items)
+        rejected, traversal = item['results']
+        self.assertEqual(rejected['admission']['decision'], 'reject')
+        self.assertIn('protocol', traversal)
+        with override_settings(GRAPH_ADMISSION={'ENABLED': True, 'MAX_SECONDS': 1e-4}):
+            [item] = self._batch(items)
+        degraded = item['results'][0]
+        self.assertEqual(degraded['admission']['decision'], 'degrade')
+        self.assertNotEqual(degraded['history'], 'full')
+
+    def test_errors_stay_within_item_or_operation(self):
+        items = [
+            {'graph': GRAPH, 'operations': [{'op': 'bogus'}, {'op': 'dijkstra', 'start_node': 0}]},
+            {'graph': {'nodes': [{'label': 'no id'}]}, 'operations': [{'op': 'analyze'}]},
+            'not an item',
+        ]
+        first, second, third = self._batch(items)
+        self.assertEqual([('error' in r) for r in first['results']], [True, True])
+        self.assertIn('error', second)
+        self.assertIn('error', third)
@@ -0,0 +1,64 @@
+from django.test import SimpleTestCase
+
+from api.cache import MemoryBackend, ResultCache, canonical_key
+
+from .utils import ApiTestCase
+
+
+def _graph(a, b):
+    nodes = [{'id': a}, {'id': b}]
+    edges = [{'id': a, 'from': a, 'to': b}]
+    return nodes, edges
+
+
+class CanonicalKeyTests(SimpleTestCase):
+    def test_same_request_same_key(self):
+        self.assertEqual(canonical_key('solve', *_graph(1, 2), False), canonical_key('solve', *_graph(1, 2), False))
+
+    def test_json_types_are_preserved(self):
+        self.assertNotEqual(canonical_key('solve', *_graph(1, 2), False), canonical_key('solve', *_graph('1', '2'), False))
+
+    def test_order_direction_and_params_matter(self):
+        key = canonical_key('analyze', *_graph(1, 2), False, {'fields': None})
+        self.assertNotEqual(key, canonical_key('analyze', *_graph(2, 1), False, {'fields': None}))
+        self.assertNotEqual(key, canonical_key('analyze', *_graph(1, 2), True, {'fields': None}))
+        self.assertNotEqual(key, canonical_key('analyze', *_graph(1, 2), False, {'fields': ['degrees']}))
+        self.assertNotEqual(key, canonical_key('solve', *_graph(1, 2), False, {'fields': None}))
+
+
+class ResultCacheTests(SimpleTestCase):
+    def test_get_or_compute(self):
+        cache = ResultCache(MemoryBackend())
+        calls = []
+        compute = lambda: calls.append(1) or {'value': 42}
+        self.assertEqual(cache.get_or_compute('k', compute), ({'value': 42}, 'MISS'))
+        self.assertEqual(cache.get_or_compute('k', compute), ({'value': 42}, 'HIT'))
+        self.assertEqual(len(calls), 1)
+
+    def test_memory_backend_evicts_least_recently_used(self):
+        backend = MemoryBackend(max_entries=2)
+        backend.set('a', b'1')
+        backend.set('b', b'2')
+        backend.get('a')
+        backend.set('c', b'3')
+        self.assertIsNone(backend.get('b'))
+        self.assertEqual(backend.get('a'), b'1')
+        self.assertEqual(backend.evictions, 1)
+
+
+class CachedEndpointTests(ApiTestCase):
+    def _traverse(self, a, b):
+        nodes, edges = _graph(a, b)
+        return self.post('/api/traverse/bfs/', {'nodes': nodes, 'edges': edges, 'start_node': a})
+
+    def test_repeated_request_is_served_from_cache(self):
+        first, second = self._traverse(1, 2), self._traverse(1, 2)
+        self.assertEqual(first['X-Cache'], 'MISS')
+        self.assertEqual(second['X-Cache'], 'HIT')
+        self.assertEqual(first.json(), second.json())
+
+    def test_ids_of_another_type_are_not_served_from_cache(self):
+        numeric, textual = self._traverse(1, 2), self._traverse('1', '2')
+        self.assertEqual(textual['X-Cache'], 'MISS')
+        self.assertEqual(numeric.json()['protocol'][1]['edge_id'], 1)
+        self.assertEqual(textual.json()['protocol'][1]['edge_id'], '1')
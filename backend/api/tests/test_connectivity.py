@@ -0,0 +1,65 @@
+import random
+from unittest import mock
+
+import networkx as nx
+from django.test import SimpleTestCase
+
+from api.logic.connectivity import ConnectivitySolver
+from api.logic.graph_engine import run_analyze
+
+from .utils import compact, random_graphs
+
+
+def _expected(n, edges):
+    """κ простої неорієнтованої основи та λ мультиграфа (без петель) за NetworkX"""
+    simple, weighted = nx.Graph(), nx.Graph()
+    simple.add_nodes_from(range(n))
+    weighted.add_nodes_from(range(n))
+    for u, v in edges:
+        if u == v:
+            continue
+        simple.add_edge(u, v)
+        if weighted.has_edge(u, v):
+            weighted[u][v]['weight'] += 1
+        else:
+            weighted.add_edge(u, v, weight=1)
+    components = nx.number_connected_components(simple) if n else 0
+    if n <= 1 or components != 1:
+        return components, 0, 0
+    return components, nx.node_connectivity(simple), nx.stoer_wagner(weighted)[0]
+
+
+def _families(rng):
+    for n, edges in random_graphs(200, (1, 12), (0.1, 0.9), seed=13):
+        # Кратні ребра та петлі
+        extra = [rng.choice(edges) for _ in range(rng.randint(0, 3))] if edges else []
+        loops = [(u, u) for u in range(n) if rng.random() < 0.1]
+        yield n, edges + extra + loops
+    for n in range(2, 10):
+        yield n, [(rng.randrange(v), v) for v in range(1, n)]
+        yield n, [(u, (u + 1) % n) for u in range(n)] if n >= 3 else [(0, 1)]
+        yield n, [(u, v) for u in range(n) for v in range(u + 1, n)]
+        # Два блоки зі спільною вершиною (точка зчленування)
+        yield 2 * n - 1, ([(u, v) for u in range(n) for v in range(u + 1, n)]
+                          + [(u, v) for u in range(n - 1, 2 * n - 1) for v in range(u + 1, 2 * n - 1)])
+
+
+class ConnectivityTests(SimpleTestCase):
+    def test_matches_networkx(self):
+        rng = random.Random(17)
+        for n, edges in _families(rng):
+            for directed in (False, True):
+                with self.subTest(n=n, edges=edges, directed=directed):
+                    components, kappa, lam = _expected(n, edges)
+                    result = ConnectivitySolver(compact(n, edges, is_directed=directed)).run(components)
+                    self.assertEqual(result['vertex_connectivity'], kappa)
+                    self.assertEqual(result['edge_connectivity'], lam)
+                    self.assertLessEqual(kappa, lam)
+
+    def test_solver_failure_is_logged(self):
+        graph = compact(4, [(0, 1), (2, 3)])
+        with mock.patch.object(ConnectivitySolver, 'run', side_effect=RuntimeError('boom')), \
+                self.assertLogs('api.logic.graph_engine', 'ERROR') as logs:
+            result = run_analyze(None, None, False, ['connectivity'], graph=graph)
+        self.assertEqual(result['connectivity']['components_count'], 2)
+        self.assertIn('boom', logs.output[0])
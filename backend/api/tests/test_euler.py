@@ -0,0 +1,65 @@
+import random
+
+import networkx as nx
+from django.test import SimpleTestCase
+
+from api.logic.euler import EulerSolver
+from api.logic.solvers import run_solve
+
+from .utils import compact, payload
+
+
+def _random_walk_graph(rng, directed):
+    """Мультиграф із випадкового блукання (часто Ейлерів) з кількома зайвими ребрами та петлями"""
+    n = rng.randint(1, 9)
+    walk = [rng.randrange(n) for _ in range(rng.randint(0, 14))]
+    if walk and rng.random() < 0.5:
+        walk.append(walk[0])
+    edges = list(zip(walk, walk[1:]))
+    edges += [(rng.randrange(n), rng.randrange(n)) for _ in range(rng.choice((0, 0, 1, 2)))]
+    rng.shuffle(edges)
+    if not directed:
+        edges = [(v, u) if rng.random() < 0.5 else (u, v) for u, v in edges]
+    return n, edges
+
+
+def _expected_type(edges, directed):
+    if not edges:
+        return 'none'
+    g = nx.MultiDiGraph() if directed else nx.MultiGraph()
+    g.add_edges_from(edges)
+    if nx.is_eulerian(g):
+        return 'cycle'
+    return 'path' if nx.has_eulerian_path(g) else 'none'
+
+
+class EulerSolverTests(SimpleTestCase):
+    def test_matches_networkx_and_uses_every_edge_once(self):
+        rng = random.Random(19)
+        for _ in range(600):
+            directed = rng.random() < 0.5
+            n, edges = _random_walk_graph(rng, directed)
+            with self.subTest(n=n, edges=edges, directed=directed):
+                result = EulerSolver(compact(n, edges, is_directed=directed)).run()
+                kind = _expected_type(edges, directed)
+                self.assertEqual(result['type'], kind)
+                if kind == 'none':
+                    continue
+                vertices, used = result['vertices'], result['edges']
+                self.assertEqual(sorted(used), list(range(len(edges))))
+                self.assertEqual(len(vertices), len(used) + 1)
+                if kind == 'cycle':
+                    self.assertEqual(vertices[0], vertices[-1])
+                for (u, v), e in zip(zip(vertices, vertices[1:]), used):
+                    allowed = {edges[e]} if directed else {edges[e], edges[e][::-1]}
+                    self.assertIn((u, v), allowed)
+
+    def test_solver_reports_labels_and_edge_ids(self):
+        nodes, items = payload(3, [(0, 1), (1, 2), (2, 0), (0, 0)])
+        for item in items:
+            item['id'] = f"e{item['id']}"
+        info = run_solve(nodes, items, False, fields=['euler'])['euler']
+        self.assertEqual(info['type'], 'cycle')
+        self.assertEqual(sorted(info['edge_ids']), ['e0', 'e1', 'e2', 'e3'])
+        self.assertEqual(info['path'][0], info['path'][-1])
+        self.assertTrue(set(info['path']) <= {'v0', 'v1', 'v2'})
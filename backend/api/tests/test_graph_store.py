@@ -0,0 +1,106 @@
+import random
+
+import numpy as np
+
+from api.graph_store import GraphNotFound, decode_graph, encode_graph, get_graph_store
+from api.isomorphic import _without_timings
+
+from .utils import ApiTestCase, compact, payload, random_edges
+
+
+class GraphStoreTests(ApiTestCase):
+    def test_round_trip_keeps_graph_and_indexes(self):
+        rng = random.Random(23)
+        for directed in (False, True):
+            n = 15
+            edges = random_edges(rng, n, 0.2, directed=directed, loops=True)
+            graph = compact(n, edges, [rng.randint(-3, 9) for _ in edges], is_directed=directed)
+            graph.raw_ids[3], graph.edge_ids[0] = 'a', 'e0'
+            restored = decode_graph(encode_graph(graph)[0])
+            with self.subTest(directed=directed):
+                for name in ('edge_src', 'edge_dst', 'edge_weight', 'has_weight', 'offsets', 'neighbors',
+                             'adj_edges', 'in_offsets', 'in_neighbors', 'in_edges', 'adj_weights'):
+                    self.assertTrue(np.array_equal(getattr(restored, name), getattr(graph, name)), name)
+                for name in ('node_ids', 'raw_ids', 'labels', 'edge_ids', 'is_directed', 'index'):
+                    self.assertEqual(getattr(restored, name), getattr(graph, name), name)
+                for a, b in zip(restored.sorted_adjacency(), graph.sorted_adjacency()):
+                    self.assertTrue(np.array_equal(a, b))
+                self.assertEqual(restored.components_count(), graph.components_count())
+                if directed:
+                    self.assertEqual(restored.out_degrees().tolist(), graph.out_degrees().tolist())
+                    self.assertEqual(restored.in_degrees().tolist(), graph.in_degrees().tolist())
+                else:
+                    self.assertEqual(restored.degrees().tolist(), graph.degrees().tolist())
+
+    def test_same_content_has_same_digest(self):
+        first = encode_graph(compact(3, [(0, 1), (1, 2)]))[1]
+        self.assertEqual(first, encode_graph(compact(3, [(0, 1), (1, 2)]))[1])
+        self.assertNotEqual(first, encode_graph(compact(3, [(0, 1), (0, 2)]))[1])
+
+    def test_deleted_graph_is_not_served_from_memory(self):
+        store = get_graph_store()
+        info = store.save(compact(2, [(0, 1)]))
+        store.load(info.id)
+        self.assertTrue(store.delete(info.id))
+        self.assertFalse(store.delete(info.id))
+        with self.assertRaises(GraphNotFound):
+            store.load(info.id)
+
+
+class GraphStoreEndpointTests(ApiTestCase):
+    def setUp(self):
+        super().setUp()
+        nodes, edges = payload(6, [(0, 1), (1, 2), (2, 0), (2, 3), (3, 4), (4, 5), (5, 3)],
+                               [1, 4, 2, 7, 1, 3, 2])
+        for edge in edges:
+            edge['hasWeight'] = True
+        self.graph = {'nodes': nodes, 'edges': edges, 'is_directed': False}
+
+    def _save(self):
+        response = self.post('/api/graphs/', {**self.graph, 'name': 'two triangles'})
+        self.assertEqual(response.status_code, 201)
+        return response.json()
+
+    def test_save_list_info_delete(self):
+        info = self._save()
+        self.assertEqual((info['name'], info['nodes'], info['edges'], info['components']),
+                         ('two triangles', 6, 7, 1))
+        self.assertEqual([g['id'] for g in self.client.get('/api/graphs/').json()['graphs']], [info['id']])
+        self.assertEqual(self.client.get(f"/api/graphs/{info['id']}/").json(), info)
+        self.assertEqual(self.client.delete(f"/api/graphs/{info['id']}/").status_code, 204)
+        self.assertEqual(self.client.get(f"/api/graphs/{info['id']}/").status_code, 404)
+        self.assertEqual(self.client.delete(f"/api/graphs/{info['id']}/").status_code, 404)
+
+    def test_invalid_graph_is_bad_request(self):
+        self.assertEqual(self.post('/api/graphs/', {'nodes': [{'label': 'no id'}]}).status_code, 400)
+
+    def test_graph_id_requests_match_inline_graph(self):
+        graph_id = self._save()['id']
+        requests = [
+            ('/api/analyze/', {}),
+            ('/api/solve/', {}),
+            ('/api/floyd/', {'history': 'final'}),
+            ('/api/apsp/', {'method': 'dijkstra'}),
+            ('/api/dijkstra/', {'start_node': 0, 'end_node': 5}),
+            ('/api/traverse/bfs/', {'start_node': 2}),
+            ('/api/traverse/dfs/', {'start_node': 2}),
+        ]
+        for url, params in requests:
+            with self.subTest(url=url):
+                inline = self.post(url, {**self.graph, **params})
+                stored = self.post(url, {'graph_id': graph_id, **params})
+                self.assertEqual(stored.status_code, 200)
+                # /solve/ над тим самим графом може повернути результат inline-запиту (без часу)
+                result = stored.json()
+                expected = _without_timings(inline.json()) if result.pop('isomorphic_reuse', False) else inline.json()
+                self.assertEqual(result, expected)
+                again = self.post(url, {'graph_id': graph_id, **params})
+                self.assertEqual((stored['X-Cache'], again['X-Cache']), ('MISS', 'HIT'))
+
+    def test_unknown_or_deleted_graph_id_is_not_found(self):
+        graph_id = self._save()['id']
+        self.client.delete(f'/api/graphs/{graph_id}/')
+        for url in ('/api/analyze/', '/api/solve/', '/api/floyd/', '/api/traverse/bfs/'):
+            with self.subTest(url=url):
+                self.assertEqual(self.post(url, {'graph_id': graph_id, 'start_node': 0}).status_code, 404)
+        self.assertEqual(self.post('/api/analyze/', {'graph_id': 'missing'}).status_code, 404)
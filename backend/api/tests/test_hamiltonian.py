@@ -0,0 +1,68 @@
+from itertools import permutations
+
+from django.test import SimpleTestCase
+
+from api.logic.hamiltonian import HamiltonianSearch
+from api.logic.solvers import run_solve
+
+from .utils import compact, payload, random_graphs
+
+
+def _arcs(edges, directed):
+    arcs = {(u, v) for u, v in edges}
+    if not directed:
+        arcs |= {(v, u) for u, v in edges}
+    return arcs
+
+
+def _is_path(order, arcs):
+    return all((u, v) in arcs for u, v in zip(order, order[1:]))
+
+
+def _brute_force(n, edges, directed):
+    """(чи є Гамільтонів цикл, чи є Гамільтонів шлях) повним перебором перестановок"""
+    arcs = _arcs(edges, directed)
+    if n == 1:
+        return directed and (0, 0) in arcs, True
+    has_cycle = (directed or n >= 3) and any(
+        _is_path((0,) + rest + (0,), arcs) for rest in permutations(range(1, n)))
+    has_path = has_cycle or any(_is_path(order, arcs) for order in permutations(range(n)))
+    return has_cycle, has_path
+
+
+class HamiltonianSearchTests(SimpleTestCase):
+    def test_matches_brute_force(self):
+        for directed in (False, True):
+            for n, edges in random_graphs(300, (1, 7), (0.15, 0.6), seed=11, directed=directed, loops=True):
+                with self.subTest(directed=directed, n=n, edges=edges):
+                    result = HamiltonianSearch(compact(n, edges, is_directed=directed), time_budget=None).run()
+                    has_cycle, has_path = _brute_force(n, edges, directed)
+                    arcs = _arcs(edges, directed)
+                    self.assertTrue(result['exact'])
+                    self.assertEqual(result['cycle'] is not None, has_cycle)
+                    if has_cycle:
+                        cycle = result['cycle']
+                        self.assertEqual(cycle[0], cycle[-1])
+                        self.assertEqual(sorted(cycle[:-1]), list(range(n)))
+                        self.assertTrue(_is_path(cycle, arcs))
+                        continue
+                    self.assertEqual(result['path'] is not None, has_path)
+                    if has_path:
+                        self.assertEqual(sorted(result['path']), list(range(n)))
+                        self.assertTrue(_is_path(result['path'], arcs))
+
+    def test_budget_and_size_limits_are_not_exact(self):
+        n = 12
+        edges = [(u, v) for u in range(n) for v in range(u + 1, n) if (u + v) % 3]
+        self.assertFalse(HamiltonianSearch(compact(n, edges), max_vertices=10).run()['exact'])
+        self.assertTrue(HamiltonianSearch(compact(0, [])).run()['exact'])
+
+    def test_solver_edge_ids_follow_the_path(self):
+        edges = [(0, 1), (1, 2), (2, 3), (3, 0), (0, 2)]
+        nodes, items = payload(4, edges)
+        info = run_solve(nodes, items, False, fields=['hamilton'])['hamilton']
+        self.assertEqual(info['type'], 'cycle')
+        labels = {f'v{u}': u for u in range(4)}
+        walk = [labels[label] for label in info['path']]
+        for (u, v), edge_id in zip(zip(walk, walk[1:]), info['edge_ids']):
+            self.assertIn(edges[edge_id], ((u, v), (v, u)))
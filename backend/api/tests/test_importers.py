@@ -0,0 +1,116 @@
+import random
+
+import numpy as np
+from django.test import SimpleTestCase
+
+from api.logic.compact_graph import CompactGraph
+from api.logic.importers import import_graph, iter_line_blocks
+
+from .utils import ApiTestCase
+
+
+def _chunks(data, size):
+    return [data[i:i + size] for i in range(0, len(data), size)]
+
+
+def _assert_same_graph(test, graph, reference):
+    for name in ('edge_src', 'edge_dst', 'edge_weight', 'has_weight', 'offsets', 'neighbors'):
+        test.assertTrue(np.array_equal(getattr(graph, name), getattr(reference, name)), name)
+    test.assertEqual(graph.node_ids, reference.node_ids)
+    test.assertEqual(graph.raw_ids, reference.raw_ids)
+    test.assertEqual(graph.labels, reference.labels)
+    test.assertEqual(graph.edge_ids, reference.edge_ids)
+    test.assertEqual(graph.is_directed, reference.is_directed)
+
+
+class ImporterTests(SimpleTestCase):
+    def test_line_blocks_end_on_line_boundaries(self):
+        data = b"1 2\n3 4\n5 6"
+        for size in range(1, len(data) + 1):
+            blocks = list(iter_line_blocks(_chunks(data, size)))
+            self.assertEqual(b''.join(blocks), data)
+            self.assertTrue(all(block.endswith(b'\n') for block in blocks[:-1]))
+
+    def test_edgelist_matches_json_payload(self):
+        rng = random.Random(0)
+        for directed in (False, True):
+            n, m = 60, 200
+            pairs = [(rng.randrange(n), rng.randrange(n), rng.randint(1, 9)) for _ in range(m)]
+            text = "# коментар\n" + "\n".join(f"{u} {v} {w}" for u, v, w in pairs) + "\n"
+            used = sorted({x for u, v, _ in pairs for x in (u, v)})
+            reference = CompactGraph.from_payload(
+                [{'id': u, 'label': f"v{u}"} for u in used],
+                [{'id': k, 'from': u, 'to': v, 'weight': w, 'hasWeight': True} for k, (u, v, w) in enumerate(pairs)],
+                directed)
+            for size in (7, 64, 1 << 20):
+                with self.subTest(directed=directed, size=size):
+                    graph = import_graph(_chunks(text.encode(), size), 'edgelist', directed)
+                    _assert_same_graph(self, graph, reference)
+
+    def test_csv_header_string_ids_and_bom(self):
+        csv = "﻿source,target,weight,id\n a , b ,2.5,e1\nb,c,1,e2\nc,a,3,e3\n".encode()
+        graph = import_graph(_chunks(csv, 5), 'csv', True)
+        self.assertEqual(graph.raw_ids, ['a', 'b', 'c'])
+        self.assertEqual(graph.edge_ids, ['e1', 'e2', 'e3'])
+        self.assertEqual(graph.edge_weight.tolist(), [2.5, 1.0, 3.0])
+        self.assertTrue(graph.is_directed)
+
+    def test_csv_unknown_header_is_rejected(self):
+        # Раніше "src,dst,cost" ставав ребром між вершинами src і dst
+        for csv in (b"src,dst,cost\n1,2,3\n", b"src,dst\n1,2\n", b"from,dst\n1,2\n"):
+            with self.subTest(csv=csv):
+                with self.assertRaisesRegex(ValueError, 'dst'):
+                    import_graph([csv], 'csv')
+        graph = import_graph([b"a,b,2\nb,c,1\n"], 'csv')
+        self.assertEqual(graph.raw_ids, ['a', 'b', 'c'])
+
+    def test_mixed_numeric_and_string_ids(self):
+        graph = import_graph([b"1 2\n2 3\n", b"x 1\n"], 'edgelist')
+        self.assertEqual(graph.raw_ids, ['1', '2', '3', 'x'])
+        self.assertEqual(graph.edge_src.tolist(), [0, 1, 3])
+        self.assertFalse(graph.has_weight.any())
+
+    def test_matrix_market(self):
+        mtx = b"%%MatrixMarket matrix coordinate pattern symmetric\n% c\n5 5 3\n1 2\n2 3\n3 1\n"
+        graph = import_graph(_chunks(mtx, 7), 'mtx')
+        self.assertEqual((graph.n, graph.m, graph.is_directed), (5, 3, False))
+        self.assertEqual(graph.components_count(), 3)
+        graph = import_graph([b"%%MatrixMarket matrix coordinate real general\n3 3 2\n1 2 0.5\n3 1 2"], 'mtx')
+        self.assertTrue(graph.is_directed)
+        self.assertEqual(graph.edge_weight.tolist(), [0.5, 2.0])
+
+    def test_invalid_input_raises_value_error(self):
+        cases = [
+            (b"1 2\n1 2 3\n", 'edgelist'),
+            (b"1 2 x\n", 'edgelist'),
+            (b"1\n", 'edgelist'),
+            (b"%%MatrixMarket matrix array real general\n", 'mtx'),
+            (b"%%MatrixMarket matrix coordinate pattern general\n2 2 1\n1 3\n", 'mtx'),
+            (b"%%MatrixMarket matrix coordinate pattern general\n2 2 1\na b\n", 'mtx'),
+            (b"%%MatrixMarket matrix coordinate pattern general\n2 2 2\n1 2\n1 b\n", 'mtx'),
+            (b"", 'mtx'),
+        ]
+        for data, fmt in cases:
+            with self.subTest(data=data):
+                with self.assertRaises(ValueError):
+                    import_graph([data], fmt)
+        with self.assertRaises(ValueError):
+            import_graph([b"1 2\n2 3\n3 4\n"], 'edgelist', max_edges=2)
+
+
+class ImportEndpointTests(ApiTestCase):
+    def _import(self, data, query=''):
+        return self.client.post(f'/api/graphs/import/{query}', data, content_type='text/plain')
+
+    def test_import_then_analyze_by_graph_id(self):
+        response = self._import(b"\xef\xbb\xbffrom,to\n1,2\n2,3\n", '?file_format=csv&name=path')
+        self.assertEqual(response.status_code, 201)
+        info = response.json()
+        self.assertEqual((info['nodes'], info['edges'], info['name']), (3, 2, 'path'))
+        data = self.post('/api/analyze/', {'graph_id': info['id'], 'fields': ['degrees']}).json()
+        self.assertEqual([d['degree'] for d in data['degrees']], [1, 2, 1])
+
+    def test_invalid_file_is_bad_request(self):
+        mtx = b"%%MatrixMarket matrix coordinate pattern general\n2 2 1\na b\n"
+        self.assertEqual(self._import(mtx, '?file_format=mtx').status_code, 400)
+        self.assertEqual(self._import(b"1 2 3 4 5\n").status_code, 400)
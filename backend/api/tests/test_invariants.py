@@ -0,0 +1,115 @@
+import tracemalloc
+
+import numpy as np
+from django.test import SimpleTestCase
+
+from api.logic.compact_graph import CompactGraph
+from api.logic.invariants import InvariantsSolver
+
+from .utils import compact, random_graphs
+
+
+def _adjacency(n, edges):
+    adj = [set() for _ in range(n)]
+    for u, v in edges:
+        if u != v:
+            adj[u].add(v)
+            adj[v].add(u)
+    return adj
+
+
+def _colorable(adj, k):
+    """Перебір з поверненням: чи є правильне розфарбування в k кольорів"""
+    n = len(adj)
+    colors = [-1] * n
+    order = sorted(range(n), key=lambda u: -len(adj[u]))
+
+    def assign(i):
+        if i == n:
+            return True
+        u = order[i]
+        for c in range(k):
+            if all(colors[w] != c for w in adj[u]):
+                colors[u] = c
+                if assign(i + 1):
+                    return True
+                colors[u] = -1
+        return False
+
+    return assign(0)
+
+
+def _chromatic(adj):
+    k = 1 if adj else 0
+    while not _colorable(adj, k):
+        k += 1
+    return k
+
+
+def _max_clique(adj):
+    """Найбільша кліка перебором усіх підмножин вершин"""
+    n = len(adj)
+    best = 0
+    for mask in range(1 << n):
+        members = [u for u in range(n) if mask >> u & 1]
+        if len(members) > best and all(w in adj[u] for u in members for w in members if w != u):
+            best = len(members)
+    return best
+
+
+class InvariantsSolverTests(SimpleTestCase):
+    def test_chromatic_number_matches_brute_force(self):
+        # Регресія: насиченість уже розфарбованих сусідів не відновлювалась при поверненні
+        for n, edges in random_graphs(200, (8, 16), seed=1):
+            adj = _adjacency(n, edges)
+            result = InvariantsSolver(compact(n, edges), time_budget=None).run()
+            with self.subTest(n=n, edges=edges):
+                self.assertEqual(result['chromatic_number'], _chromatic(adj))
+                self.assertEqual(result['details']['chromatic_number']['status'], 'exact')
+                coloring = result['coloring']
+                self.assertEqual(len(set(coloring.values())), result['chromatic_number'])
+                for u, v in edges:
+                    if u != v:
+                        self.assertNotEqual(coloring[str(u)], coloring[str(v)])
+
+    def test_clique_and_independence_numbers_match_brute_force(self):
+        for n, edges in random_graphs(60, (6, 12), seed=2):
+            adj = _adjacency(n, edges)
+            complement = [set(range(n)) - adj[u] - {u} for u in range(n)]
+            result = InvariantsSolver(compact(n, edges), time_budget=None).run()
+            with self.subTest(n=n, edges=edges):
+                self.assertEqual(result['clique_number'], _max_clique(adj))
+                self.assertEqual(result['independence_number'], _max_clique(complement))
+
+    def test_approximate_bounds_are_valid(self):
+        for n, edges in random_graphs(30, (8, 14), seed=3):
+            adj = _adjacency(n, edges)
+            result = InvariantsSolver(compact(n, edges), approximate=True).run()
+            with self.subTest(n=n, edges=edges):
+                self.assertGreaterEqual(result['chromatic_number'], _chromatic(adj))
+                self.assertLessEqual(result['clique_number'], _max_clique(adj))
+                coloring = {int(u): c for u, c in result['coloring'].items()}
+                self.assertTrue(all(coloring[u] != coloring[v] for u in range(n) for v in adj[u]))
+                self.assertEqual(len(set(coloring.values())), result['chromatic_number'])
+
+    def test_approximate_large_sparse_graph_stays_linear(self):
+        # 40 тис. вершин: бітові маски точного методу зайняли б понад 100 МБ
+        n = 40_000
+        rng = np.random.default_rng(0)
+        src, dst = rng.integers(0, n, n), rng.integers(0, n, n)
+        graph = CompactGraph([str(u) for u in range(n)], list(range(n)), list(range(n)),
+                             src, dst, np.ones(n), list(range(n)), np.zeros(n, dtype=bool))
+        tracemalloc.start()
+        try:
+            solver = InvariantsSolver(graph, approximate=True)
+            result = solver.run()
+            peak = tracemalloc.get_traced_memory()[1]
+        finally:
+            tracemalloc.stop()
+        self.assertIsNone(solver.adj)
+        self.assertLess(peak, 32 * 1024 * 1024)
+        coloring = result['coloring']
+        proper = src != dst
+        self.assertTrue(all(coloring[str(u)] != coloring[str(v)]
+                            for u, v in zip(src[proper].tolist(), dst[proper].tolist())))
+        self.assertLessEqual(result['clique_number'], result['chromatic_number'])
@@ -0,0 +1,148 @@
+import random
+
+import networkx as nx
+from django.test import SimpleTestCase, override_settings
+
+from api.cache import get_result_cache
+from api.isomorphic import run_solve_reusing
+from api.logic.isomorphism import find_isomorphism, wl_colors
+
+from .utils import ApiTestCase, random_graphs
+
+
+def _relabelled(rng, n, edges, directed):
+    """Ізоморфна копія: переставлені вершини з рядковими ID і мітками, перемішані
+    ребра з рядковими ID (у неорієнтованому графі - з випадковим напрямком запису)"""
+    perm = list(range(n))
+    rng.shuffle(perm)
+    nodes = [{'id': f'n{perm[u]}', 'label': f'L{perm[u]}'} for u in rng.sample(range(n), n)]
+    items = []
+    for k, (u, v) in enumerate(edges):
+        u, v = perm[u], perm[v]
+        if not directed and rng.random() < 0.5:
+            u, v = v, u
+        items.append({'id': f'e{k}', 'from': f'n{u}', 'to': f'n{v}'})
+    rng.shuffle(items)
+    return nodes, items
+
+
+def _random_edges_like(rng, n, m, directed):
+    """Випадкові m ребер на n вершинах - зазвичай неізоморфні вихідному графу"""
+    edges = [(rng.randrange(n), rng.randrange(n)) for _ in range(m)]
+    return edges if directed else [(min(e), max(e)) for e in edges]
+
+
+def _plain(n, edges):
+    return ([{'id': u, 'label': f'v{u}'} for u in range(n)],
+            [{'id': k, 'from': u, 'to': v} for k, (u, v) in enumerate(edges)])
+
+
+class IsomorphismTests(SimpleTestCase):
+    def test_find_isomorphism_matches_networkx(self):
+        rng = random.Random(29)
+        for directed in (False, True):
+            for n, edges in random_graphs(150, (1, 8), (0.2, 0.7), seed=31, directed=directed, loops=True):
+                other = _random_edges_like(rng, n, len(edges), directed) if rng.random() < 0.5 else None
+                if other is None:
+                    perm = rng.sample(range(n), n)
+                    other = [(perm[u], perm[v]) for u, v in edges]
+                    rng.shuffle(other)
+                with self.subTest(directed=directed, edges=edges, other=other):
+                    a = (n, [u for u, _ in edges], [v for _, v in edges])
+                    b = (n, [u for u, _ in other], [v for _, v in other])
+                    colors_a, print_a = wl_colors(*a, directed)
+                    colors_b, print_b = wl_colors(*b, directed)
+                    mapping = find_isomorphism((*a, colors_a), (*b, colors_b), directed)
+                    G = nx.MultiDiGraph() if directed else nx.MultiGraph()
+                    H = G.__class__()
+                    G.add_nodes_from(range(n))
+                    H.add_nodes_from(range(n))
+                    G.add_edges_from(edges)
+                    H.add_edges_from(other)
+                    isomorphic = nx.is_isomorphic(G, H)
+                    self.assertEqual(mapping is not None, isomorphic)
+                    if isomorphic:
+                        self.assertEqual(print_a, print_b)
+                        phi, psi = mapping
+                        self.assertEqual(sorted(psi), list(range(len(edges))))
+                        for (u, v), e in zip(edges, psi):
+                            image = other[e]
+                            self.assertIn((phi[u], phi[v]), (image,) if directed else (image, image[::-1]))
+
+
+class IsomorphicReuseTests(ApiTestCase):
+    def assertValidSolution(self, result, fresh, nodes, items, directed):
+        """Перенесений результат коректний для графа (nodes, items) і збігається з новим розв'язком"""
+        label = {node['id']: node['label'] for node in nodes}
+        ends = {item['id']: (label[item['from']], label[item['to']]) for item in items}
+
+        def follows(path, edge_ids):
+            for (a, b), e in zip(zip(path, path[1:]), edge_ids):
+                self.assertIn((a, b), (ends[e],) if directed else (ends[e], ends[e][::-1]))
+
+        euler = result['euler']
+        self.assertEqual(euler['type'], fresh['euler']['type'])
+        if euler['type'] != 'none':
+            self.assertEqual(sorted(euler['edge_ids']), sorted(ends))
+            follows(euler['path'], euler['edge_ids'])
+
+        hamilton = result['hamilton']
+        self.assertEqual(hamilton['type'], fresh['hamilton']['type'])
+        if hamilton['type'] != 'none':
+            walk = hamilton['path'][:-1] if hamilton['type'] == 'cycle' else hamilton['path']
+            self.assertEqual(sorted(walk), sorted(label.values()))
+            follows(hamilton['path'], hamilton['edge_ids'])
+
+        invariants = result['invariants']
+        for name in ('chromatic_number', 'clique_number', 'independence_number'):
+            self.assertEqual(invariants[name], fresh['invariants'][name])
+        coloring = invariants['coloring']
+        self.assertEqual(sorted(coloring), sorted(str(node['id']) for node in nodes))
+        for item in items:
+            if item['from'] != item['to']:
+                self.assertNotEqual(coloring[str(item['from'])], coloring[str(item['to'])])
+        self.assertEqual(len(set(coloring.values())), invariants['chromatic_number'])
+
+    def test_permuted_graph_reuses_translated_result(self):
+        rng = random.Random(37)
+        for directed in (False, True):
+            for n, edges in random_graphs(40, (2, 9), (0.25, 0.7), seed=41, directed=directed, loops=True):
+                with self.subTest(directed=directed, n=n, edges=edges):
+                    # Малі випадкові графи повторюються: кожен випадок - з порожнього кешу
+                    get_result_cache().clear()
+                    first = run_solve_reusing(*_plain(n, edges), directed)
+                    self.assertNotIn('isomorphic_reuse', first)
+                    nodes, items = _relabelled(rng, n, edges, directed)
+                    reused = run_solve_reusing(nodes, items, directed)
+                    self.assertTrue(reused['isomorphic_reuse'])
+                    # Час вимірювався для іншого графа - у перенесеному результаті його немає
+                    self.assertIn('elapsed_ms', first['hamilton'])
+                    self.assertNotIn('elapsed_ms', reused['hamilton'])
+                    self.assertEqual(reused['hamilton']['exact'], first['hamilton']['exact'])
+                    for name, info in reused['invariants']['details'].items():
+                        self.assertNotIn('elapsed_ms', info)
+                        self.assertEqual(info['status'], first['invariants']['details'][name]['status'])
+                    with override_settings(GRAPH_ISOMORPHIC_REUSE={'ENABLED': False}):
+                        fresh = run_solve_reusing(nodes, items, directed)
+                    self.assertValidSolution(reused, fresh, nodes, items, directed)
+
+    def test_same_fingerprint_without_isomorphism_is_solved_again(self):
+        # C6 і два трикутники: однаковий відбиток 1-WL (2-регулярні), але не ізоморфні
+        hexagon = [(u, (u + 1) % 6) for u in range(6)]
+        triangles = [(0, 1), (1, 2), (2, 0), (3, 4), (4, 5), (5, 3)]
+        self.assertEqual(wl_colors(6, *zip(*hexagon))[1], wl_colors(6, *zip(*triangles))[1])
+        self.assertEqual(run_solve_reusing(*_plain(6, hexagon), False)['hamilton']['type'], 'cycle')
+        result = run_solve_reusing(*_plain(6, triangles), False)
+        self.assertNotIn('isomorphic_reuse', result)
+        self.assertEqual(result['hamilton']['type'], 'none')
+        self.assertEqual(result['euler']['type'], 'none')
+        # Обидва графи тепер у кошику: повторний запит будь-якого з них перевикористовується
+        self.assertTrue(run_solve_reusing(*_plain(6, hexagon), False)['isomorphic_reuse'])
+        self.assertTrue(run_solve_reusing(*_plain(6, triangles), False)['isomorphic_reuse'])
+
+    def test_reuse_is_limited_to_matching_parameters(self):
+        edges = [(0, 1), (1, 2), (2, 0), (2, 3)]
+        run_solve_reusing(*_plain(4, edges), False, fields=['euler'])
+        self.assertNotIn('isomorphic_reuse', run_solve_reusing(*_plain(4, edges), False, fields=['hamilton']))
+        self.assertNotIn('isomorphic_reuse', run_solve_reusing(*_plain(4, edges), True, fields=['euler']))
+        self.assertTrue(run_solve_reusing(*_plain(4, edges), False, fields=['euler'])['isomorphic_reuse'])
@@ -0,0 +1,49 @@
+import time
+
+from django.test import SimpleTestCase
+
+from api.jobs import Job
+from api.views import analyze_task, solve_task, task_key
+
+from .utils import ApiTestCase, payload
+
+GRAPH = dict(zip(('nodes', 'edges'), payload(5, [(0, 1), (1, 2), (2, 3), (3, 4), (4, 0), (0, 2)])))
+
+
+class JobCacheKeyTests(SimpleTestCase):
+    def test_solve_job_key_depends_on_time_budget(self):
+        sync_key = task_key(solve_task(GRAPH), GRAPH)
+        self.assertNotEqual(Job('solve', GRAPH, 60).cache_key(), sync_key)
+        # Ліміт 2 с - по 1 с на переборну задачу, як у синхронному /solve/
+        self.assertEqual(Job('solve', GRAPH, 2).cache_key(), sync_key)
+
+    def test_analyze_job_shares_key_with_sync_analyze(self):
+        self.assertEqual(Job('analyze', GRAPH, 60).cache_key(), task_key(analyze_task(GRAPH), GRAPH))
+        data = {**GRAPH, 'fields': ['degrees']}
+        self.assertEqual(Job('analyze', data, 60).cache_key(), task_key(analyze_task(data), data))
+
+
+class JobEndpointTests(ApiTestCase):
+    def _run(self, data):
+        job = self.post('/api/jobs/', data)
+        self.assertEqual(job.status_code, 202)
+        job_id = job.json()['job_id']
+        deadline = time.monotonic() + 60
+        while time.monotonic() < deadline:
+            state = self.client.get(f'/api/jobs/{job_id}/').json()
+            if state['status'] not in ('queued', 'running'):
+                return state
+            time.sleep(0.05)
+        self.fail('Задача не завершилася')
+
+    def test_analyze_job_result_is_served_by_sync_endpoint(self):
+        state = self._run({**GRAPH, 'kind': 'analyze'})
+        self.assertEqual(state['status'], 'done')
+        response = self.post('/api/analyze/', GRAPH)
+        self.assertEqual(response['X-Cache'], 'HIT')
+        self.assertEqual(response.json(), state['result'])
+
+    def test_solve_job_with_longer_budget_does_not_feed_sync_cache(self):
+        state = self._run({**GRAPH, 'kind': 'solve', 'timeout': 30})
+        self.assertEqual(state['status'], 'done')
+        self.assertEqual(self.post('/api/solve/', GRAPH)['X-Cache'], 'MISS')
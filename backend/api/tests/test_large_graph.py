@@ -0,0 +1,86 @@
+import random
+from collections import Counter
+from unittest import mock
+
+import networkx as nx
+import numpy as np
+from django.test import SimpleTestCase
+
+from api.logic.compact_graph import CompactGraph
+from api.logic.graph_engine import GraphAnalyzer, LargeGraphAnalyzer, run_analyze
+from api.logic.large_graph import edge_stats, payload_edges
+
+from .utils import compact, payload, random_graphs
+
+
+def _histogram(degrees):
+    return sorted(Counter(degrees).items())
+
+
+class EdgeStatsTests(SimpleTestCase):
+    def test_components_and_degrees_match_networkx(self):
+        for directed in (False, True):
+            for n, edges in random_graphs(150, (1, 40), (0.0, 0.15), seed=3, directed=directed, loops=True):
+                with self.subTest(directed=directed, n=n, edges=edges):
+                    src = np.array([u for u, _ in edges], dtype=np.int64)
+                    dst = np.array([v for _, v in edges], dtype=np.int64)
+                    stats = edge_stats(n, src, dst, chunk=7)
+                    g = nx.MultiGraph()
+                    g.add_nodes_from(range(n))
+                    g.add_edges_from(edges)
+                    self.assertEqual(stats.components, nx.number_connected_components(g))
+                    self.assertEqual(stats.out_degrees.tolist(), np.bincount(src, minlength=n).tolist())
+                    self.assertEqual(stats.in_degrees.tolist(), np.bincount(dst, minlength=n).tolist())
+
+    def test_payload_edges_match_compact_graph(self):
+        nodes = [{'id': 1}, {'id': 'a'}, {'id': '1', 'label': 'dup'}, {'id': 2}]
+        edges = [{'from': 1, 'to': 'a'}, {'from': 'a', 'to': 9}, {'from': '2', 'to': 1}, {'from': 2, 'to': 2}]
+        arrays = payload_edges(nodes, edges)
+        graph = CompactGraph.from_payload(nodes, edges)
+        self.assertEqual(arrays.n, graph.n)
+        self.assertEqual(arrays.edge_src.tolist(), graph.edge_src.tolist())
+        self.assertEqual(arrays.edge_dst.tolist(), graph.edge_dst.tolist())
+
+
+class LargeGraphAnalyzerTests(SimpleTestCase):
+    def test_matches_full_analyzer(self):
+        rng = random.Random(5)
+        for directed in (False, True):
+            for n, edges in random_graphs(120, (1, 25), (0.0, 0.3), seed=7, directed=directed):
+                # Дерева - окремий випадок для κ і λ
+                if rng.random() < 0.2:
+                    edges = [(rng.randrange(v), v) for v in range(1, n)]
+                with self.subTest(directed=directed, n=n, edges=edges):
+                    nodes, items = payload(n, edges)
+                    large = run_analyze(nodes, items, directed, mode='large')
+                    full = GraphAnalyzer(nodes, items, directed).get_all_properties(
+                        ['degrees', 'is_regular', 'connectivity'])
+                    self.assertEqual(large['is_regular'], full['is_regular'])
+                    if directed:
+                        for key, name in (('in_degree', 'in_degree'), ('out_degree', 'out_degree')):
+                            self.assertEqual(large['degrees'][key]['histogram'],
+                                             [list(p) for p in _histogram(d[name] for d in full['degrees'])])
+                    else:
+                        self.assertEqual(large['degrees']['degree']['histogram'],
+                                         [list(p) for p in _histogram(d['degree'] for d in full['degrees'])])
+                    connectivity = large['connectivity']
+                    self.assertEqual(connectivity['components_count'], full['connectivity']['components_count'])
+                    if connectivity['vertex_connectivity'] is not None:
+                        self.assertEqual(connectivity['vertex_connectivity'],
+                                         full['connectivity']['vertex_connectivity'])
+                        self.assertEqual(connectivity['edge_connectivity'],
+                                         full['connectivity']['edge_connectivity'])
+
+    def test_payload_is_not_built_into_csr(self):
+        nodes, items = payload(4, [(0, 1), (1, 2), (2, 3)])
+        with mock.patch.object(CompactGraph, '_build_csr', side_effect=AssertionError('CSR built')):
+            result = run_analyze(nodes, items, False, mode='large')
+        self.assertEqual(result['connectivity']['method']['vertex_connectivity'], 'tree')
+        self.assertEqual(result['skipped_fields'], list(LargeGraphAnalyzer.SKIPPED))
+
+    def test_prebuilt_graph_is_reused(self):
+        graph = compact(3, [(0, 1), (1, 2), (2, 0)], is_directed=True)
+        analyzer = LargeGraphAnalyzer(None, None, graph=graph)
+        self.assertIs(analyzer.graph, graph)
+        self.assertTrue(analyzer.get_property('is_regular'))
+        self.assertEqual(analyzer.get_property('connectivity')['method']['vertex_connectivity'], 'skipped')
@@ -0,0 +1,30 @@
+import tempfile
+from pathlib import Path
+
+from django.test import override_settings
+
+from .utils import ApiTestCase, payload
+
+NODES, EDGES = payload(3, [(0, 1), (1, 2)])
+
+
+class SlowRequestProfilerTests(ApiTestCase):
+    def _profiles(self, skip):
+        tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp.cleanup)
+        config = {'PROFILE_SLOW_MS': 0, 'PROFILE_SAMPLE_RATE': 1.0, 'PROFILE_DIR': tmp.name,
+                  'PROFILE_SKIP_PREFIXES': skip}
+        with override_settings(GRAPH_METRICS=config):
+            # Проміжні шари будуються заново для нового клієнта
+            client = self.client_class()
+            response = client.post('/api/analyze/', {'nodes': NODES, 'edges': EDGES, 'fields': ['degrees']},
+                                   content_type='application/json')
+        self.assertEqual(response.status_code, 200)
+        return [path.name for path in Path(tmp.name).glob('*.prof')]
+
+    def test_synchronous_requests_are_profiled(self):
+        [name] = self._profiles([])
+        self.assertIn('analyze', name)
+
+    def test_skipped_prefixes_are_not_profiled(self):
+        self.assertEqual(self._profiles(['/api/analyze/']), [])
@@ -0,0 +1,289 @@
+import random
+from unittest import mock
+
+import networkx as nx
+from django.test import SimpleTestCase
+
+from api.logic import pathfinding
+from api.logic.pathfinding import run_apsp, run_dijkstra, run_dijkstra_many, run_floyd
+
+from .utils import payload
+
+INF = float('inf')
+
+
+def _baseline_floyd(n, arcs):
+    """Класичний покроковий Флойд-Воршелл на списках - еталон для M і T"""
+    dist = [[0 if i == j else INF for j in range(n)] for i in range(n)]
+    pred = [[(i + 1) if i != j else 0 for j in range(n)] for i in range(n)]
+    for u, v, w in arcs:
+        if w < dist[u][v]:
+            dist[u][v] = w
+            pred[u][v] = u + 1
+
+    def snapshot():
+        return {
+            'M': [['∞' if x == INF else (int(x) if x == int(x) else x) for x in row] for row in dist],
+            'T': [list(row) for row in pred],
+        }
+
+    steps = [snapshot()]
+    for k in range(n):
+        for i in range(n):
+            for j in range(n):
+                if dist[i][k] + dist[k][j] < dist[i][j]:
+                    dist[i][j] = dist[i][k] + dist[k][j]
+                    pred[i][j] = pred[k][j]
+        steps.append(snapshot())
+    return steps
+
+
+def _random_weighted(rng, n, directed, weights):
+    edges, arcs = [], []
+    for _ in range(rng.randint(0, 2 * n)):
+        u, v, w = rng.randrange(n), rng.randrange(n), rng.randint(*weights)
+        edges.append((u, v, w))
+        arcs.append((u, v, w))
+        if not directed and u != v:
+            arcs.append((v, u, w))
+    return edges, arcs
+
+
+def _floyd(n, edges, directed, history='full'):
+    nodes, items = payload(n, [(u, v) for u, v, _ in edges], [w for _, _, w in edges])
+    return run_floyd(nodes, items, directed, history)
+
+
+def _apsp(n, edges, directed, method, workers=1):
+    nodes, items = payload(n, [(u, v) for u, v, _ in edges], [w for _, _, w in edges])
+    return run_apsp(nodes, items, directed, method, workers)
+
+
+def _networkx_graph(n, arcs):
+    """Простий орграф з найлегшою дугою серед кратних"""
+    G = nx.DiGraph()
+    G.add_nodes_from(range(n))
+    for u, v, w in arcs:
+        if not G.has_edge(u, v) or w < G[u][v]['weight']:
+            G.add_edge(u, v, weight=w)
+    return G
+
+
+class FloydWarshallTests(SimpleTestCase):
+    def test_matches_baseline_including_negative_cycles(self):
+        rng = random.Random(0)
+        seen_negative = False
+        for _ in range(300):
+            n, directed = rng.randint(1, 8), rng.random() < 0.7
+            edges, arcs = _random_weighted(rng, n, directed, (-4, 9))
+            result = _floyd(n, edges, directed)
+            with self.subTest(n=n, edges=edges, directed=directed):
+                self.assertEqual(result['steps'], _baseline_floyd(n, arcs))
+                negative = any(result['steps'][-1]['M'][i][i] != 0 for i in range(n))
+                self.assertEqual(result['negative_cycle'], negative)
+                seen_negative |= negative
+        self.assertTrue(seen_negative)
+
+    def test_distances_match_networkx(self):
+        rng = random.Random(1)
+        for _ in range(50):
+            n, directed = rng.randint(2, 12), rng.random() < 0.5
+            edges, arcs = _random_weighted(rng, n, directed, (0, 20))
+            G = nx.DiGraph()
+            G.add_nodes_from(range(n))
+            for u, v, w in arcs:
+                if not G.has_edge(u, v) or w < G[u][v]['weight']:
+                    G.add_edge(u, v, weight=w)
+            expected = nx.floyd_warshall(G)
+            M = _floyd(n, edges, directed, 'final')['steps'][-1]['M']
+            with self.subTest(n=n, edges=edges, directed=directed):
+                for i in range(n):
+                    for j in range(n):
+                        self.assertEqual(M[i][j], '∞' if expected[i][j] == INF else expected[i][j])
+
+    def test_delta_history_replays_full_history(self):
+        rng = random.Random(2)
+        for _ in range(30):
+            n, directed = rng.randint(1, 8), rng.random() < 0.5
+            edges, _ = _random_weighted(rng, n, directed, (-2, 9))
+            full = _floyd(n, edges, directed, 'full')['steps']
+            delta = _floyd(n, edges, directed, 'delta')['steps']
+            final = _floyd(n, edges, directed, 'final')['steps']
+            M, T = [list(r) for r in delta[0]['M']], [list(r) for r in delta[0]['T']]
+            with self.subTest(n=n, edges=edges, directed=directed):
+                self.assertEqual(delta[0], full[0])
+                for step, expected in zip(delta[1:], full[1:]):
+                    for i, j, d, t in step['changes']:
+                        M[i][j], T[i][j] = d, t
+                    self.assertEqual({'M': M, 'T': T}, expected)
+                self.assertEqual(final, full[-1:])
+
+
+class AllPairsTests(SimpleTestCase):
+    def assertShortestPaths(self, result, n, arcs, expected):
+        """M збігається з еталоном, а шлях, відновлений за T, має вагу M[i][j]"""
+        M, T = result['steps'][-1]['M'], result['steps'][-1]['T']
+        weight = {}
+        for u, v, w in arcs:
+            weight[u, v] = min(w, weight.get((u, v), INF))
+        for i in range(n):
+            for j in range(n):
+                target = expected[i].get(j, INF)
+                self.assertEqual(M[i][j], '∞' if target == INF else target)
+                if i == j or target == INF:
+                    continue
+                total, v = 0, j
+                for _ in range(n):
+                    if v == i:
+                        break
+                    u = T[i][v] - 1
+                    total += weight[u, v]
+                    v = u
+                self.assertEqual((v, total), (i, target))
+
+    def test_methods_match_networkx(self):
+        rng = random.Random(3)
+        for _ in range(80):
+            n, directed = rng.randint(1, 12), rng.random() < 0.5
+            edges, arcs = _random_weighted(rng, n, directed, (0, 20))
+            expected = dict(nx.all_pairs_dijkstra_path_length(_networkx_graph(n, arcs)))
+            for method in ('auto', 'floyd', 'dijkstra', 'johnson'):
+                with self.subTest(n=n, edges=edges, directed=directed, method=method):
+                    result = _apsp(n, edges, directed, method)
+                    self.assertTrue(result['success'])
+                    self.assertShortestPaths(result, n, arcs, expected)
+
+    def test_negative_weights(self):
+        rng = random.Random(4)
+        checked = 0
+        while checked < 60:
+            n = rng.randint(2, 10)
+            edges, arcs = _random_weighted(rng, n, True, (-3, 12))
+            G = _networkx_graph(n, arcs)
+            if nx.negative_edge_cycle(G):
+                continue
+            checked += 1
+            expected = dict(nx.all_pairs_bellman_ford_path_length(G))
+            for method in ('auto', 'johnson', 'floyd'):
+                with self.subTest(n=n, edges=edges, method=method):
+                    result = _apsp(n, edges, True, method)
+                    self.assertShortestPaths(result, n, arcs, expected)
+                    if method == 'auto' and any(w < 0 for _, _, w in edges):
+                        self.assertEqual(result['method'], 'johnson')
+            if any(w < 0 for _, _, w in edges):
+                self.assertFalse(_apsp(n, edges, True, 'dijkstra')['success'])
+
+    def test_negative_cycle(self):
+        edges = [(0, 1, 1), (1, 2, -3), (2, 0, 1)]
+        self.assertFalse(_apsp(3, edges, True, 'johnson')['success'])
+        result = _apsp(3, edges, True, 'auto')
+        self.assertEqual((result['method'], result['negative_cycle']), ('floyd', True))
+        self.assertEqual(_apsp(3, [(0, 1, -1)], False, 'auto')['method'], 'floyd')
+        self.assertFalse(_apsp(3, edges, True, 'bellman')['success'])
+
+    def test_parallel_sources_match_sequential(self):
+        rng = random.Random(5)
+        edges, _ = _random_weighted(rng, 30, True, (0, 9))
+        sequential = _apsp(30, edges, True, 'dijkstra')
+        with mock.patch('api.logic.pathfinding.APSP_PARALLEL_MIN_VERTICES', 0):
+            parallel = _apsp(30, edges, True, 'dijkstra', workers=2)
+        self.assertEqual(parallel['steps'], sequential['steps'])
+
+    def test_shared_pool_is_not_rebuilt_while_in_use(self):
+        # Процеси пулу запускаються лише при submit, тож тест їх не створює
+        with mock.patch.multiple(pathfinding, _apsp_executor=None, _apsp_workers=0, _apsp_users=0):
+            with pathfinding._apsp_pool(2) as first:
+                with pathfinding._apsp_pool(3) as second:
+                    self.assertIs(second, first)
+                self.assertEqual(pathfinding._apsp_workers, 2)
+            with pathfinding._apsp_pool(3) as third:
+                self.assertIsNot(third, first)
+                self.assertEqual(pathfinding._apsp_workers, 3)
+            self.assertEqual(pathfinding._apsp_users, 0)
+            # Зламаний пул, який уже замінено, не чіпає нового
+            pathfinding._discard_apsp_executor(first)
+            self.assertIs(pathfinding._apsp_executor, third)
+            pathfinding._discard_apsp_executor(third)
+            self.assertIsNone(pathfinding._apsp_executor)
+
+
+def _dijkstra_graph(rng):
+    """Зважений мультиграф з паралельними ребрами, петлями, нульовими вагами та
+    ізольованими вершинами (недосяжні цілі)"""
+    n = rng.randint(2, 12)
+    edges = []
+    for _ in range(rng.randint(0, 3 * n)):
+        u, v = rng.randrange(n - 1), rng.randrange(n - 1)
+        edges.append((u, v, rng.choice((0, 0.5, 1, 2, 3, 7.5, 10))))
+        if rng.random() < 0.2:
+            edges.append((u, v, rng.randint(0, 10)))
+    nodes, items = payload(n, [(u, v) for u, v, _ in edges], [w for _, _, w in edges])
+    for item in items:
+        item['hasWeight'] = True
+    return n, edges, nodes, items
+
+
+class DijkstraTests(SimpleTestCase):
+    def assertValidPath(self, result, source, target, expected, edges, directed):
+        self.assertTrue(result['success'])
+        self.assertEqual(result['total_weight'], expected)
+        nodes = result['path_nodes_ids']
+        self.assertEqual((nodes[0], nodes[-1]), (str(source), str(target)))
+        total = 0
+        for step, a, b in zip(result['path_edges'], nodes, nodes[1:]):
+            u, v, w = edges[step['id']]
+            self.assertEqual((step['from'], step['to']), (a, b))
+            self.assertIn((a, b), ((str(u), str(v)),) if directed else ((str(u), str(v)), (str(v), str(u))))
+            total += w
+        self.assertEqual(total, expected)
+
+    def test_pairs_match_networkx(self):
+        rng = random.Random(6)
+        for _ in range(150):
+            directed = rng.random() < 0.5
+            n, edges, nodes, items = _dijkstra_graph(rng)
+            arcs = [(u, v, w) for u, v, w in edges]
+            if not directed:
+                arcs += [(v, u, w) for u, v, w in edges]
+            G = _networkx_graph(n, arcs)
+            for source in range(n):
+                expected = nx.single_source_dijkstra_path_length(G, source)
+                for target in range(n):
+                    with self.subTest(edges=edges, directed=directed, source=source, target=target):
+                        result = run_dijkstra(nodes, items, directed, source, target)
+                        if target not in expected:
+                            self.assertFalse(result['success'])
+                        else:
+                            self.assertValidPath(result, source, target, expected[target], edges, directed)
+
+    def test_many_matches_single_pairs(self):
+        rng = random.Random(7)
+        for _ in range(60):
+            directed = rng.random() < 0.5
+            n, edges, nodes, items = _dijkstra_graph(rng)
+            starts = [rng.randrange(n) for _ in range(rng.randint(1, 3))]
+            for ends in (None, [rng.randrange(n)], [rng.randrange(n) for _ in range(3)]):
+                with self.subTest(edges=edges, directed=directed, starts=starts, ends=ends):
+                    many = run_dijkstra_many(nodes, items, directed, starts, ends)
+                    self.assertTrue(many['success'])
+                    pairs = [(s, t) for s in dict.fromkeys(starts) for t in (ends if ends else range(n))]
+                    self.assertEqual([(r['start_node'], r['end_node']) for r in many['results']],
+                                     [(str(s), str(t)) for s, t in pairs])
+                    for (s, t), entry in zip(pairs, many['results']):
+                        single = run_dijkstra(nodes, items, directed, s, t)
+                        self.assertEqual(entry['success'], single['success'])
+                        if single['success']:
+                            self.assertValidPath(entry, s, t, single['total_weight'], edges, directed)
+
+    def test_invalid_requests(self):
+        nodes, items = payload(3, [(0, 1), (1, 2)], [1, -2])
+        for item in items:
+            item['hasWeight'] = True
+        self.assertFalse(run_dijkstra(nodes, items, True, 0, 2)['success'])
+        self.assertFalse(run_dijkstra_many(nodes, items, True, [0])['success'])
+        items[1]['weight'] = 2
+        self.assertFalse(run_dijkstra(nodes, items, True, 0, 7)['success'])
+        self.assertFalse(run_dijkstra_many(nodes, items, True, [0], [7])['success'])
+        del items[1]['hasWeight']
+        self.assertFalse(run_dijkstra(nodes, items, True, 0, 2)['success'])
+        self.assertEqual(run_dijkstra(*payload(1, []), False, 0, 0)['path_nodes_ids'], ['0'])
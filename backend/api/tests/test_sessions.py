@@ -0,0 +1,186 @@
+import random
+
+from django.test import SimpleTestCase, override_settings
+
+from api.logic.graph_engine import run_analyze
+from api.logic.graph_session import GraphSession
+from api.sessions import SessionRegistry
+
+from .utils import ApiTestCase
+
+CHEAP = ['adjacency_matrix', 'incidence_matrix', 'adjacency_list', 'degrees', 'is_regular']
+
+
+def _random_op(rng, session, next_id):
+    nodes, edges = list(session.labels), list(session.edges)
+    kind = rng.choice(['add_node', 'add_edge', 'add_edge', 'remove_edge', 'remove_node', 'rename_node', 'set_weight'])
+    if kind == 'add_node' or not nodes:
+        return {'op': 'add_node', 'id': next_id}
+    if kind == 'add_edge' or (not edges and kind in ('remove_edge', 'set_weight')):
+        return {'op': 'add_edge', 'id': f'e{next_id}', 'from': rng.choice(nodes), 'to': rng.choice(nodes)}
+    if kind == 'remove_edge':
+        return {'op': 'remove_edge', 'id': rng.choice(edges)}
+    if kind == 'set_weight':
+        return {'op': 'set_weight', 'id': rng.choice(edges), 'weight': rng.randint(1, 9)}
+    if kind == 'rename_node':
+        return {'op': 'rename_node', 'id': rng.choice(nodes), 'label': f'x{next_id}'}
+    return {'op': 'remove_node', 'id': rng.choice(nodes)}
+
+
+class GraphSessionTests(SimpleTestCase):
+    def test_incremental_properties_match_full_analysis(self):
+        rng = random.Random(0)
+        for directed in (False, True):
+            session = GraphSession([{'id': u} for u in range(5)], [], directed)
+            for step in range(120):
+                session.apply([_random_op(rng, session, step + 5)])
+                nodes, edges = session.to_payload()
+                expected = run_analyze(nodes, edges, directed, CHEAP + ['connectivity'])
+                props = session.get_properties(list(GraphSession.FIELDS))
+                with self.subTest(directed=directed, step=step):
+                    for name in CHEAP:
+                        self.assertEqual(props[name], expected[name], name)
+                    self.assertEqual(props['connectivity']['components_count'],
+                                     expected['connectivity']['components_count'])
+
+    def test_batch_is_atomic(self):
+        session = GraphSession([{'id': 1}, {'id': 2}], [{'id': 'a', 'from': 1, 'to': 2}])
+        before = session.get_properties(list(GraphSession.FIELDS))
+        bad_batches = [
+            [{'op': 'add_node', 'id': 3}, {'op': 'add_edge', 'id': 'b', 'from': 3, 'to': 4}],
+            [{'op': 'remove_node', 'id': 1}, {'op': 'remove_edge', 'id': 'a'}],
+            [{'op': 'add_edge', 'id': 'b', 'from': 1, 'to': 2}, {'op': 'add_edge', 'id': 'b', 'from': 2, 'to': 1}],
+            [{'op': 'set_weight', 'id': 'a', 'weight': 2}, {'op': 'set_weight', 'id': 'a', 'weight': 'x'}],
+            [{'op': 'rename_node', 'id': 1, 'label': 'q'}, {'op': 'rename_node', 'id': 2}],
+            [{'op': 'add_node', 'id': 3}, {'op': 'explode'}],
+        ]
+        for ops in bad_batches:
+            with self.subTest(ops=ops):
+                with self.assertRaises((KeyError, ValueError)):
+                    session.apply(ops)
+                self.assertEqual(session.get_properties(list(GraphSession.FIELDS)), before)
+        # Видалена в тій самій пачці вершина та її ребра вже не існують, додана - існує
+        session.apply([{'op': 'remove_node', 'id': 2}, {'op': 'add_node', 'id': 2},
+                       {'op': 'add_edge', 'id': 'a', 'from': 1, 'to': 2}])
+        self.assertEqual(session.version, before['version'] + 4)
+
+    def test_changed_fields(self):
+        session = GraphSession([{'id': 1}, {'id': 2}], [{'id': 'a', 'from': 1, 'to': 2}])
+        self.assertEqual(session.apply([{'op': 'set_weight', 'id': 'a', 'weight': 3}]), [])
+        self.assertEqual(session.apply([{'op': 'rename_node', 'id': 1, 'label': 'A'}]), ['adjacency_list', 'degrees'])
+        self.assertEqual(session.apply([{'op': 'remove_edge', 'id': 'a'}]), list(GraphSession.FIELDS))
+        props = session.get_properties(['degrees'])
+        self.assertEqual(props['computed_fields'], ['degrees'])
+        self.assertNotIn('adjacency_matrix', props)
+        props = session.get_properties()
+        self.assertEqual(props['computed_fields'], list(GraphSession.DEFAULT_FIELDS))
+        self.assertNotIn('incidence_matrix', props)
+
+    def test_initial_payload_is_normalized_like_analyze(self):
+        nodes = [{'id': 1}, {'id': 2, 'label': 'old'}, {'id': '2', 'label': 'B'}, {'id': 3}]
+        edges = [{'from': 1, 'to': 2}, {'from': 2, 'to': 3}, {'id': 'x', 'from': 1, 'to': 3},
+                 {'id': 'x', 'from': 3, 'to': 3}, {'id': 'y', 'from': 1, 'to': 9}]
+        for directed in (False, True):
+            session = GraphSession(nodes, edges, directed)
+            expected = run_analyze(nodes, edges, directed, CHEAP + ['connectivity'])
+            props = session.get_properties(list(GraphSession.FIELDS))
+            with self.subTest(directed=directed):
+                for name in CHEAP:
+                    self.assertEqual(props[name], expected[name], name)
+                self.assertEqual([e['id'] for e in session.to_payload()[1]], [None, None, 'x', 'x'])
+                # Операції адресують перше ребро з ID "x"; ребра без ID та повтори - ні
+                session.apply([{'op': 'remove_edge', 'id': 'x'}])
+                self.assertEqual([(e['from'], e['to']) for e in session.to_payload()[1]],
+                                 [('1', '2'), ('2', '3'), ('3', '3')])
+                with self.assertRaises(ValueError):
+                    session.apply([{'op': 'remove_edge', 'id': 'x'}])
+                with self.assertRaises(ValueError):
+                    session.apply([{'op': 'remove_edge', 'id': None}])
+                session.apply([{'op': 'remove_node', 'id': 3}])
+                self.assertEqual(len(session.edges), 1)
+
+    def test_size_limits(self):
+        registry = SessionRegistry(max_vertices=3, max_edges=2)
+        with self.assertRaises(ValueError):
+            registry.create([{'id': u} for u in range(4)], [])
+        _, session = registry.create([{'id': u} for u in range(3)], [{'id': 0, 'from': 0, 'to': 1}])
+        with self.assertRaises(ValueError):
+            session.apply([{'op': 'add_node', 'id': 3}])
+        with self.assertRaises(ValueError):
+            session.apply([{'op': 'add_edge', 'id': k, 'from': 1, 'to': 2} for k in (1, 2)])
+        session.apply([{'op': 'remove_edge', 'id': 0}, {'op': 'add_edge', 'id': 1, 'from': 1, 'to': 2},
+                       {'op': 'add_edge', 'id': 2, 'from': 0, 'to': 2}])
+        self.assertEqual(len(session.edges), 2)
+
+
+class SessionEndpointTests(ApiTestCase):
+    def _create(self, **extra):
+        response = self.post('/api/sessions/', {
+            'nodes': [{'id': u} for u in range(4)],
+            'edges': [{'id': u, 'from': u, 'to': (u + 1) % 4} for u in range(4)],
+            **extra,
+        })
+        self.assertEqual(response.status_code, 201)
+        return response.json()
+
+    def test_ops_return_only_changed_fields(self):
+        session_id = self._create(fields=['degrees'])['session_id']
+        data = self.post(f'/api/sessions/{session_id}/ops/',
+                         {'ops': [{'op': 'rename_node', 'id': 0, 'label': 'A'}]}).json()
+        self.assertEqual(data['changed_fields'], ['adjacency_list', 'degrees'])
+        self.assertEqual(data['computed_fields'], ['degrees'])
+        self.assertNotIn('adjacency_list', data)
+        data = self.post(f'/api/sessions/{session_id}/ops/', {
+            'ops': [{'op': 'set_weight', 'id': 0, 'weight': 5}], 'include': ['solutions'],
+        }).json()
+        self.assertEqual(data['computed_fields'], [])
+        self.assertIn('euler', data['solutions'])
+        data = self.client.get(f'/api/sessions/{session_id}/?fields=is_regular').json()
+        self.assertEqual(data['computed_fields'], ['is_regular'])
+        self.assertEqual(data['stale'], ['connectivity'])
+
+    def test_ops_return_matrices_only_when_named(self):
+        created = self._create()
+        self.assertEqual(created['computed_fields'], ['degrees', 'is_regular', 'connectivity'])
+        session_id = created['session_id']
+        data = self.post(f'/api/sessions/{session_id}/ops/',
+                         {'ops': [{'op': 'add_edge', 'id': 9, 'from': 0, 'to': 2}]}).json()
+        self.assertEqual(data['changed_fields'], list(GraphSession.FIELDS))
+        self.assertEqual(data['computed_fields'], ['degrees', 'is_regular', 'connectivity'])
+        self.assertNotIn('adjacency_matrix', data)
+        self.assertNotIn('incidence_matrix', data)
+        self.assertEqual(data['connectivity'], {'components_count': 1})
+        data = self.post(f'/api/sessions/{session_id}/ops/', {
+            'ops': [{'op': 'remove_edge', 'id': 9}], 'fields': ['adjacency_matrix'],
+        }).json()
+        self.assertEqual(data['computed_fields'], ['adjacency_matrix'])
+        self.assertEqual(data['adjacency_matrix'][0], [0, 1, 0, 1])
+
+    def test_failed_batch_leaves_session_unchanged(self):
+        created = self._create(fields=['adjacency_matrix'])
+        session_id = created['session_id']
+        response = self.post(f'/api/sessions/{session_id}/ops/', {
+            'ops': [{'op': 'add_node', 'id': 9}, {'op': 'remove_edge', 'id': 42}],
+        })
+        self.assertEqual(response.status_code, 400)
+        data = self.client.get(f'/api/sessions/{session_id}/?fields=adjacency_matrix').json()
+        self.assertEqual(data['version'], created['version'])
+        self.assertEqual(data['adjacency_matrix'], created['adjacency_matrix'])
+
+    def test_heavy_properties_pass_admission(self):
+        session_id = self._create()['session_id']
+        with override_settings(GRAPH_ADMISSION={'ENABLED': True, 'MAX_SECONDS': 1e-9}):
+            response = self.client.get(f'/api/sessions/{session_id}/?include=connectivity')
+            self.assertEqual(response.status_code, 422)
+            self.assertEqual(response.json()['admission']['decision'], 'reject')
+            # Пачка, відхилена контролем допуску, не застосовується
+            response = self.post(f'/api/sessions/{session_id}/ops/', {
+                'ops': [{'op': 'add_node', 'id': 9}], 'include': ['solutions'],
+            })
+            self.assertEqual(response.status_code, 422)
+        with override_settings(GRAPH_ADMISSION={'ENABLED': True, 'MAX_SECONDS': 1.5}):
+            response = self.client.get(f'/api/sessions/{session_id}/?include=solutions')
+        self.assertEqual(response.status_code, 200)
+        data = response.json()
+        self.assertEqual(data['admission']['changes'], {'approximate_invariants': True})
+        self.assertEqual(data['version'], 0)
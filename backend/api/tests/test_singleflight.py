@@ -0,0 +1,172 @@
+import multiprocessing
+import os
+import shutil
+import tempfile
+import threading
+import time
+
+from django.test import SimpleTestCase
+
+from api.singleflight import SingleFlight
+
+KEY = 'k' * 64
+
+
+def _lead_in_child(directory, started, release, outcome):
+    """Ведучий в іншому процесі: тримає блокування ключа, доки не отримає release"""
+    flight = SingleFlight(directory)
+
+    def compute():
+        started.set()
+        release.wait(10)
+        if outcome == 'raise':
+            raise RuntimeError('ведучий упав')
+        if outcome == 'die':
+            os._exit(1)
+        return {'from': 'child'}
+
+    try:
+        flight.do(KEY, compute)
+    except RuntimeError:
+        pass
+
+
+def _wait_for(predicate, timeout=10):
+    deadline = time.monotonic() + timeout
+    while not predicate():
+        if time.monotonic() > deadline:
+            raise AssertionError('умова не настала')
+        time.sleep(0.01)
+
+
+class SingleFlightThreadTests(SimpleTestCase):
+    def test_concurrent_callers_share_one_compute(self):
+        flight = SingleFlight()
+        calls, results = [], []
+        gate = threading.Event()
+
+        def compute():
+            calls.append(1)
+            gate.wait(5)
+            return {'value': 1}
+
+        threads = [threading.Thread(target=lambda: results.append(flight.do(KEY, compute))) for _ in range(8)]
+        for thread in threads:
+            thread.start()
+        _wait_for(lambda: flight.stats()['coalesced'] == 7)
+        gate.set()
+        for thread in threads:
+            thread.join()
+        self.assertEqual(len(calls), 1)
+        self.assertEqual(sorted(shared for _, shared in results), [False] + [True] * 7)
+        self.assertTrue(all(result == {'value': 1} for result, _ in results))
+        self.assertEqual(flight.stats()['in_flight'], 0)
+
+    def test_leader_error_reaches_waiters_and_is_not_remembered(self):
+        flight = SingleFlight()
+        gate = threading.Event()
+        errors = []
+
+        def failing():
+            gate.wait(5)
+            raise ValueError('boom')
+
+        def call():
+            try:
+                flight.do(KEY, failing)
+            except ValueError as e:
+                errors.append(str(e))
+
+        threads = [threading.Thread(target=call) for _ in range(4)]
+        for thread in threads:
+            thread.start()
+        _wait_for(lambda: flight.stats()['coalesced'] == 3)
+        gate.set()
+        for thread in threads:
+            thread.join()
+        self.assertEqual(errors, ['boom'] * 4)
+        self.assertEqual(flight.do(KEY, lambda: 2), (2, False))
+
+
+class SingleFlightProcessTests(SimpleTestCase):
+    def setUp(self):
+        self.directory = self._fresh_directory()
+        self.context = multiprocessing.get_context('spawn')
+        self.started, self.release = self.context.Event(), self.context.Event()
+
+    def _fresh_directory(self):
+        directory = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, directory, True)
+        return directory
+
+    def _start_leader(self, outcome='return'):
+        child = self.context.Process(target=_lead_in_child,
+                                     args=(self.directory, self.started, self.release, outcome))
+        child.start()
+        self.addCleanup(child.join, 10)
+        self.assertTrue(self.started.wait(30))
+        return child
+
+    def _wait_behind_leader(self, compute):
+        """Виклик у потоці, який чекає на блокування ведучого; (потік, результати)"""
+        flight = SingleFlight(self.directory)
+        results = []
+        thread = threading.Thread(target=lambda: results.append(flight.do(KEY, compute)))
+        thread.start()
+        _wait_for(lambda: os.path.exists(os.path.join(self.directory, f'{KEY}.wait')))
+        return flight, thread, results
+
+    def test_waiting_process_gets_leaders_result(self):
+        child = self._start_leader()
+        flight, thread, results = self._wait_behind_leader(lambda: {'from': 'parent'})
+        self.release.set()
+        thread.join(10)
+        child.join(10)
+        self.assertEqual(results, [({'from': 'child'}, True)])
+        self.assertEqual(flight.stats()['shared_between_processes'], 1)
+        self.assertEqual(flight.stats()['computed'], 0)
+        # Позначку очікування прибрано, результат опубліковано
+        self.assertFalse(os.path.exists(os.path.join(self.directory, f'{KEY}.wait')))
+        self.assertTrue(os.path.exists(os.path.join(self.directory, f'{KEY}.json')))
+
+    def test_failed_or_dead_leader_lets_waiter_compute(self):
+        for outcome in ('raise', 'die'):
+            with self.subTest(outcome=outcome):
+                # Результат попереднього випадку ще живий у своєму каталозі
+                self.directory = self._fresh_directory()
+                self.started.clear()
+                self.release.clear()
+                child = self._start_leader(outcome)
+                flight, thread, results = self._wait_behind_leader(lambda: {'from': 'parent'})
+                self.release.set()
+                thread.join(10)
+                child.join(10)
+                # Блокування померлого процесу звільняє ядро, результату немає - рахуємо самі
+                self.assertEqual(results, [({'from': 'parent'}, False)])
+                self.assertEqual(flight.stats()['computed'], 1)
+
+    def test_stale_result_and_lock_files_expire(self):
+        flight = SingleFlight(self.directory, result_ttl=0.05, prune_interval=0.05)
+        flight._publish(KEY, {'old': True})
+        self.assertFalse(os.path.exists(os.path.join(self.directory, f'{KEY}.json')))
+        flight._mark_waiting(KEY)
+        flight._publish(KEY, {'old': True})
+        self.assertEqual(flight._read_result(KEY), {'old': True})
+        time.sleep(0.1)
+        # Застарілий результат не видається і видаляється
+        self.assertIsNone(flight._read_result(KEY))
+        self.assertEqual(flight.do(KEY, lambda: {'new': True}), ({'new': True}, False))
+
+        # Прибирання: вільне старе блокування видаляється, зайняте - ні
+        held = self._start_leader()
+        free_lock = os.path.join(self.directory, 'free.lock')
+        open(free_lock, 'w').close()
+        old = time.time() - 60
+        for name in os.listdir(self.directory):
+            os.utime(os.path.join(self.directory, name), (old, old))
+        flight._pruned = 0
+        flight._maybe_prune()
+        self.assertFalse(os.path.exists(free_lock))
+        self.assertTrue(os.path.exists(os.path.join(self.directory, f'{KEY}.lock')))
+        self.release.set()
+        held.join(10)
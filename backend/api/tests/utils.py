@@ -0,0 +1,57 @@
+import random
+import tempfile
+from pathlib import Path
+
+from django.conf import settings
+from django.test import SimpleTestCase, override_settings
+
+from api.cache import get_result_cache
+from api.logic.compact_graph import CompactGraph
+
+
+def random_edges(rng, n, p, directed=False, loops=False):
+    """Випадковий граф G(n, p): список пар (u, v) без кратних ребер"""
+    pairs = [(u, v) for u in range(n) for v in range(n)
+             if (u != v or loops) and (directed or u <= v)]
+    return [pair for pair in pairs if rng.random() < p]
+
+
+def payload(n, edges, weights=None):
+    """(nodes, edges) у форматі запиту API: ID вершин - 0..n-1, ID ребер - номери"""
+    nodes = [{'id': u, 'label': f'v{u}'} for u in range(n)]
+    items = [{'id': k, 'from': u, 'to': v} for k, (u, v) in enumerate(edges)]
+    if weights is not None:
+        for item, w in zip(items, weights):
+            item['weight'] = w
+    return nodes, items
+
+
+def compact(n, edges, weights=None, is_directed=False):
+    return CompactGraph.from_payload(*payload(n, edges, weights), is_directed)
+
+
+def random_graphs(count, n_range, p_range=(0.2, 0.8), seed=0, **kwargs):
+    """count випадкових графів (n, edges) з відтворюваним зерном"""
+    rng = random.Random(seed)
+    for _ in range(count):
+        n = rng.randint(*n_range)
+        yield n, random_edges(rng, n, rng.uniform(*p_range), **kwargs)
+
+
+class ApiTestCase(SimpleTestCase):
+    """Тести ендпоінтів: сховище графів у тимчасовому каталозі, порожній кеш
+    результатів, без міжпроцесного злиття запитів"""
+
+    def setUp(self):
+        tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp.cleanup)
+        override = override_settings(
+            GRAPH_STORE={**settings.GRAPH_STORE, 'PATH': Path(tmp.name) / 'graph_store.sqlite3'},
+            GRAPH_SINGLE_FLIGHT={'ENABLED': False},
+        )
+        override.enable()
+        self.addCleanup(override.disable)
+        get_result_cache().clear()
+
+    def post(self, url, data):
+        return self.client.post(url, data, content_type='application/json')
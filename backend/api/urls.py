@@ -4,7 +4,27 @@ from .views import (
     SolveGraphView, 
     DijkstraView, 
     FloydView,
-    TraverseView
+    ApspView,
+    TraverseView,
+    CacheStatsView,
+    GraphSessionListView,
+    GraphSessionView,
+    GraphSessionOpsView,
+    GraphStoreListView,
+    GraphImportView,
+    GraphStoreView,
+    JobListView,
+    JobView,
+    JobStreamView,
+    BatchView
+)
+from .async_views import (
+    AsyncAnalyzeGraphView,
+    AsyncSolveGraphView,
+    AsyncDijkstraView,
+    AsyncFloydView,
+    AsyncApspView,
+    AsyncTraverseView
 )
 
 urlpatterns = [
@@ -12,5 +32,25 @@ urlpatterns = [
     path('solve/', SolveGraphView.as_view()),
     path('dijkstra/', DijkstraView.as_view()),
     path('floyd/', FloydView.as_view(), name='floyd'),
+    path('apsp/', ApspView.as_view()),
     path('traverse/<str:type>/', TraverseView.as_view()), # Універсальний шлях для DFS/BFS
+    path('cache/stats/', CacheStatsView.as_view()),
+    path('sessions/', GraphSessionListView.as_view()),
+    path('sessions/<str:session_id>/', GraphSessionView.as_view()),
+    path('sessions/<str:session_id>/ops/', GraphSessionOpsView.as_view()),
+    path('graphs/', GraphStoreListView.as_view()),
+    path('graphs/import/', GraphImportView.as_view()),
+    path('graphs/<str:graph_id>/', GraphStoreView.as_view()),
+    path('jobs/', JobListView.as_view()),
+    path('jobs/<str:job_id>/', JobView.as_view()),
+    path('jobs/<str:job_id>/stream/', JobStreamView.as_view()),
+    path('batch/', BatchView.as_view()),
+
+    # Асинхронні варіанти (ASGI): обчислення в пулі процесів, 429 при перевантаженні
+    path('async/analyze/', AsyncAnalyzeGraphView.as_view()),
+    path('async/solve/', AsyncSolveGraphView.as_view()),
+    path('async/dijkstra/', AsyncDijkstraView.as_view()),
+    path('async/floyd/', AsyncFloydView.as_view()),
+    path('async/apsp/', AsyncApspView.as_view()),
+    path('async/traverse/<str:type>/', AsyncTraverseView.as_view()),
 ]
\ No newline at end of file
@@ -2,81 +2,576 @@ from rest_framework.views import APIView
 from rest_framework.response import Response
 from rest_framework import status
 import networkx as nx
-from .logic.graph_engine import GraphAnalyzer
+import json
+from collections import namedtuple
+from django.http import HttpResponse, StreamingHttpResponse
+from .cache import canonical_key, get_result_cache, stored_graph_key
+from .graph_store import GraphNotFound, get_graph_store, run_stored
+from .jobs import FINISHED, get_job_manager
+from .batch import BATCH_ORDERS, get_batch_runner
+from .metrics import get_metrics_registry
+from .singleflight import get_single_flight
+from .admission import AdmissionRejected, admit
+from .isomorphic import run_solve_reusing
+from django.conf import settings
+from .sessions import get_session_registry
+from .logic.graph_engine import ANALYZE_MODES, MATRIX_FORMATS, GraphAnalyzer, run_analyze
 from .logic.solvers import GraphSolvers
 from .logic import pathfinding, traversals
+from .logic.compact_graph import CompactGraph
+from .logic.importers import IMPORT_FORMATS, import_graph
+
+def cached_response(key, compute):
+    """Відповідь із кешу результатів; compute викликається лише при промаху, а
+    однакові одночасні запити чекають на одне обчислення (X-Cache: SHARED)"""
+    result, state = get_result_cache().get_or_compute(key, compute, get_single_flight())
+    response = Response(result)
+    response['X-Cache'] = state
+    return response
+
+def fields_params(cls, fields):
+    """Параметр кешу для вибіркових полів (None, якщо запитано всі)"""
+    return {'fields': fields} if fields != list(cls.FIELDS) else None
+
+# --- Опис обчислення кожного ендпоінта: (ендпоінт кешу, орієнтованість,
+# параметри кешу, функція, аргументи, рішення контролю допуску, збережений
+# граф). Спільний для синхронних і асинхронних views, тож обидва варіанти
+# діляться кешем результатів. Важкі операції перед запуском проходять
+# контроль допуску: виконуються як є, у дешевшому варіанті або
+# відхиляються (AdmissionRejected). ---
+
+Task = namedtuple('Task', 'endpoint is_directed params func args admission graph', defaults=(None, None))
+
+# Граф запиту: nodes/edges з тіла або збережений граф за graph_id (stored -
+# GraphInfo; nodes і edges тоді None, а орієнтованість береться зі сховища)
+RequestGraph = namedtuple('RequestGraph', 'nodes edges is_directed stored')
+
+def request_graph(data, is_directed=False):
+    graph_id = data.get('graph_id')
+    if graph_id is None:
+        return RequestGraph(data.get('nodes', []), data.get('edges', []), is_directed, None)
+    stored = get_graph_store().info(str(graph_id))
+    if stored is None:
+        raise GraphNotFound(graph_id)
+    return RequestGraph(None, None, stored.is_directed, stored)
+
+def graph_size(graph):
+    if graph.stored is not None:
+        return graph.stored.nodes, graph.stored.edges
+    return len(graph.nodes), len(graph.edges)
+
+def load_graph(graph):
+    """CompactGraph збереженого графа (None для графа з тіла запиту)"""
+    return get_graph_store().load(graph.stored.id)[1] if graph.stored is not None else None
+
+def task_key(task, data):
+    """Ключ кешу: збережений граф представлений хешем вмісту, а не списками"""
+    if task.graph is not None:
+        return stored_graph_key(task.endpoint, task.graph.digest, task.params)
+    return canonical_key(task.endpoint, data.get('nodes', []), data.get('edges', []), task.is_directed, task.params)
+
+def task_call(task):
+    """(функція, аргументи) обчислення; збережений граф читається зі сховища"""
+    if task.graph is None:
+        return task.func, task.args
+    return run_stored, (get_graph_store().path, task.graph.id, task.func, *task.args)
+
+def analyze_task(data):
+    graph = request_graph(data, data.get('is_directed', False))
+    # Формат матриць: 'dense' (за замовчуванням), 'coo' або 'csr'
+    matrix_format = data.get('matrix_format', 'dense')
+    if matrix_format not in MATRIX_FORMATS:
+        raise ValueError(f"Невідомий формат матриці: {matrix_format}")
+    # Режим: 'full' (за замовчуванням) або 'large' - лише лінійні за V властивості
+    mode = data.get('mode', 'full')
+    if mode not in ANALYZE_MODES:
+        raise ValueError(f"Невідомий режим аналізу: {mode}")
+    # Лише потрібні панелі властивості, напр. "fields": ["degrees", "is_regular"]
+    fields = GraphAnalyzer.select_fields(data.get('fields'))
+    options, admission = admit('analyze', *graph_size(graph), graph.is_directed,
+                               {'fields': fields, 'matrix_format': matrix_format, 'mode': mode})
+    fields, matrix_format, mode = options['fields'], options['matrix_format'], options['mode']
+    params = fields_params(GraphAnalyzer, fields)
+    if mode == 'large':
+        params = {**(params or {}), 'mode': mode}
+    elif matrix_format != 'dense':
+        params = {**(params or {}), 'matrix_format': matrix_format}
+    args = (graph.nodes, graph.edges, graph.is_directed, fields, matrix_format, mode)
+    return Task('analyze', graph.is_directed, params, run_analyze, args, admission, graph.stored)
+
+def solve_task(data):
+    graph = request_graph(data, data.get('is_directed', False))
+    # Окремі задачі: "fields": ["euler"] тощо (за замовчуванням - усі)
+    fields = GraphSolvers.select_fields(data.get('fields'))
+    # "approximate_invariants": true - жадібні оцінки інваріантів замість точних
+    options, admission = admit('solve', *graph_size(graph), graph.is_directed, {
+        'fields': fields,
+        'approximate_invariants': bool(data.get('approximate_invariants', False)),
+    })
+    fields, approximate = options['fields'], options['approximate_invariants']
+    params = fields_params(GraphSolvers, fields)
+    if approximate:
+        params = {**(params or {}), 'approximate_invariants': True}
+    args = (graph.nodes, graph.edges, graph.is_directed, fields, approximate)
+    # Ізоморфний граф (інші ID і мітки) отримує перенесений збережений результат
+    return Task('solve', graph.is_directed, params, run_solve_reusing, args, admission, graph.stored)
+
+def dijkstra_task(data):
+    graph = request_graph(data, data.get('is_directed', False))
+    # Багато пар: списки sources і (необов'язково) targets в одному запиті
+    if 'sources' in data:
+        sources = [str(n) for n in data['sources']]
+        targets = [str(n) for n in data['targets']] if data.get('targets') is not None else None
+        args = (graph.nodes, graph.edges, graph.is_directed, sources, targets)
+        return Task('dijkstra', graph.is_directed, {'sources': sources, 'targets': targets},
+                    pathfinding.run_dijkstra_many, args, None, graph.stored)
+
+    params = {'start_node': str(data['start_node']), 'end_node': str(data['end_node'])}
+    # start_node і end_node - це ID (число або рядок)
+    args = (graph.nodes, graph.edges, graph.is_directed, data['start_node'], data['end_node'])
+    return Task('dijkstra', graph.is_directed, params, pathfinding.run_dijkstra, args, None, graph.stored)
+
+def floyd_task(data):
+    # Отримуємо прапорець орієнтованості (перевіряємо обидва варіанти назви)
+    graph = request_graph(data, data.get('is_directed', data.get('isDirected', False)))
+    # Режим історії кроків: 'full' (за замовчуванням), 'delta' або 'final'
+    history = data.get('history', 'full')
+    options, admission = admit('floyd', *graph_size(graph), graph.is_directed, {'history': history})
+    history = options['history']
+    args = (graph.nodes, graph.edges, graph.is_directed, history)
+    return Task('floyd', graph.is_directed, {'history': history}, pathfinding.run_floyd, args, admission, graph.stored)
+
+def apsp_task(data, workers=None):
+    graph = request_graph(data, data.get('is_directed', data.get('isDirected', False)))
+    # Метод: 'auto' (за замовчуванням), 'floyd', 'dijkstra' або 'johnson'
+    method = data.get('method', 'auto')
+    options, admission = admit('apsp', *graph_size(graph), graph.is_directed, {'method': method})
+    if workers is None:
+        workers = getattr(settings, 'GRAPH_APSP', {}).get('WORKERS', 1)
+    args = (graph.nodes, graph.edges, graph.is_directed, options['method'], workers)
+    return Task('apsp', graph.is_directed, {'method': options['method']}, pathfinding.run_apsp, args, admission,
+                graph.stored)
+
+def traverse_task(data, type):
+    graph = request_graph(data, data.get('is_directed', False))
+    start_node = data.get('start_node')
+    run = traversals.run_dfs if type == 'dfs' else traversals.run_bfs
+    args = (graph.nodes, graph.edges, graph.is_directed, start_node)
+    return Task(f'traverse/{type}', graph.is_directed, {'start_node': str(start_node)}, run, args, None, graph.stored)
+
+def admission_header(decision):
+    """Значення X-Admission: рішення та оцінка часу"""
+    return f"{decision['decision']}; estimated={decision['estimated_ms']}ms"
+
+def with_admission(result, decision):
+    """Спрощений запит повідомляє про це в тілі відповіді (поза кешем)"""
+    if decision and decision['decision'] == 'degrade':
+        return {**result, 'admission': decision}
+    return result
+
+def task_response(data, make_task, *args):
+    """Відповідь за описом обчислення; відхилений контролем допуску запит - 422,
+    невідомий graph_id - 404"""
+    try:
+        task = make_task(data, *args)
+        func, func_args = task_call(task)
+        response = cached_response(task_key(task, data), lambda: func(*func_args))
+    except AdmissionRejected as e:
+        return Response({"error": str(e), "admission": e.decision}, status=status.HTTP_422_UNPROCESSABLE_ENTITY)
+    except GraphNotFound as e:
+        return Response({"error": str(e)}, status=status.HTTP_404_NOT_FOUND)
+    if task.admission:
+        response.data = with_admission(response.data, task.admission)
+        response['X-Admission'] = admission_header(task.admission)
+    return response
 
 class AnalyzeGraphView(APIView):
     def post(self, request):
         try:
-            analyzer = GraphAnalyzer(
-                request.data.get('nodes', []), 
-                request.data.get('edges', []), 
-                request.data.get('is_directed', False)
-            )
-            return Response(analyzer.get_all_properties())
+            return task_response(request.data, analyze_task)
         except Exception as e:
             return Response({"error": str(e)}, status=status.HTTP_400_BAD_REQUEST)
 
 class SolveGraphView(APIView):
     def post(self, request):
         try:
-            # Створюємо екземпляр класу GraphSolvers
-            solver = GraphSolvers(
-                request.data.get('nodes', []),
-                request.data.get('edges', []),
-                request.data.get('is_directed', False)
-            )
-            # Викликаємо метод отримання всіх розв'язків
-            return Response(solver.get_all_solutions())
+            return task_response(request.data, solve_task)
         except Exception as e:
-            # Виводимо помилку в консоль сервера для діагностики
-            import traceback
-            print(f"DEBUG: Error in SolveGraphView: {str(e)}")
-            traceback.print_exc()
-            return Response({"error": str(e)}, status=400)
+            return Response({"error": str(e)}, status=status.HTTP_400_BAD_REQUEST)
 
 class DijkstraView(APIView):
     def post(self, request):
-        data = request.data
-        # Виклик має бути чітким:
-        result = pathfinding.run_dijkstra(
-            data['nodes'], 
-            data['edges'], 
-            data.get('is_directed', False),
-            data['start_node'], # Це має бути ID (число або рядок)
-            data['end_node']    # Це має бути ID
-        )
-        return Response(result)
+        return task_response(request.data, dijkstra_task)
     
 class FloydView(APIView):
     def post(self, request):
-        data = request.data
-        # Отримуємо прапорець орієнтованості (перевіряємо обидва варіанти назви)
-        is_directed = data.get('is_directed', data.get('isDirected', False))
-        
-        result = pathfinding.run_floyd(
-            data['nodes'], 
-            data['edges'], 
-            is_directed
-        )
-        return Response(result)
+        return task_response(request.data, floyd_task)
+
+class ApspView(APIView):
+    """Відстані між усіма парами: той самий формат M/T, що й фінальний крок /floyd/"""
+    def post(self, request):
+        return task_response(request.data, apsp_task)
+
+def stream_traversal(traverser, type, start_node):
+    """NDJSON-потік компактних кроків обходу; останній рядок - {"done": true, "steps": N}"""
+    steps = traverser.iter_dfs(start_node) if type == 'dfs' else traverser.iter_bfs(start_node)
+
+    def lines():
+        count = 0
+        for step in steps:
+            count += 1
+            yield json.dumps(step, ensure_ascii=False) + '\n'
+        yield json.dumps({"done": True, "steps": count}) + '\n'
+
+    return StreamingHttpResponse(lines(), content_type='application/x-ndjson')
 
 class TraverseView(APIView):
-    """Обхід графа (DFS/BFS) з детальним протоколом"""
+    """Обхід графа (DFS/BFS) з детальним протоколом.
+
+    "protocol": "delta" - потокова відповідь із кроками push/pop замість знімків
+    стеку/черги (без кешування результату).
+    """
     def post(self, request, type):
         try:
             data = request.data
-            nodes = data.get('nodes', [])
-            edges = data.get('edges', [])
-            is_directed = data.get('is_directed', False)
             start_node = data.get('start_node')
 
-            if type == 'dfs':
-                result = traversals.run_dfs(nodes, edges, is_directed, start_node)
-            else:
-                result = traversals.run_bfs(nodes, edges, is_directed, start_node)
-                
-            return Response(result)
+            if data.get('protocol') == 'delta':
+                graph = request_graph(data, data.get('is_directed', False))
+                traverser = traversals.GraphTraverser(graph.nodes, graph.edges, graph.is_directed, graph=load_graph(graph))
+                error = traverser.check_start(start_node)
+                if error:
+                    return Response({"error": error}, status=status.HTTP_400_BAD_REQUEST)
+                return stream_traversal(traverser, type, start_node)
+
+            return task_response(data, traverse_task, type)
+        except GraphNotFound as e:
+            return Response({"error": str(e)}, status=status.HTTP_404_NOT_FOUND)
+        except Exception as e:
+            return Response({"error": str(e)}, status=status.HTTP_400_BAD_REQUEST)
+
+class CacheStatsView(APIView):
+    """Лічильники кешу результатів (влучання, промахи, витіснення, розмір) і злиття однакових запитів"""
+    def get(self, request):
+        flight = get_single_flight()
+        return Response({**get_result_cache().stats(), 'single_flight': flight.stats() if flight else None})
+
+class MetricsView(APIView):
+    """Метрики процесу в текстовому форматі Prometheus (лише з локальних адрес)"""
+    def get(self, request):
+        allowed = getattr(settings, 'GRAPH_METRICS', {}).get('ALLOWED_IPS', ['127.0.0.1', '::1'])
+        if request.META.get('REMOTE_ADDR') not in allowed:
+            return Response({"error": "Доступ заборонено"}, status=status.HTTP_403_FORBIDDEN)
+        return HttpResponse(get_metrics_registry().render(), content_type='text/plain; version=0.0.4; charset=utf-8')
+
+def session_admission(size, include):
+    """Контроль допуску для важких властивостей сесії розміру size = (V, E,
+    орієнтованість): (параметри за назвою, рішення).
+
+    solutions оцінюються як /solve/ і можуть перейти на жадібні оцінки
+    інваріантів; connectivity - як /analyze/ з одним полем, тож варіант без
+    нього означає відмову."""
+    options, decision = {}, None
+    if 'connectivity' in include:
+        chosen, connectivity = admit('analyze', *size, {'fields': ['connectivity'], 'matrix_format': 'dense',
+                                                        'mode': 'full'})
+        if connectivity and connectivity['decision'] == 'degrade':
+            raise AdmissionRejected({
+                'decision': 'reject',
+                'estimated_ms': connectivity['requested_estimated_ms'],
+                'limit_ms': connectivity['limit_ms'],
+                'error': f"Запит завеликий: оцінка часу зв'язності {connectivity['requested_estimated_ms'] / 1000:.1f} с "
+                         f"перевищує ліміт {connectivity['limit_ms'] / 1000:.0f} с (V={size[0]}, E={size[1]})",
+            })
+    if 'solutions' in include:
+        chosen, decision = admit('solve', *size, {'fields': list(GraphSolvers.FIELDS), 'approximate_invariants': False})
+        options['solutions'] = {'approximate_invariants': chosen['approximate_invariants']}
+    return options, decision
+
+def session_response(session_id, session, fields=None, include=(), extra=None, status_code=status.HTTP_200_OK,
+                     admission=None):
+    """Стан сесії: вибрані дешеві властивості та важкі після контролю допуску
+    (admission - уже прийняте рішення session_admission)"""
+    size = len(session.labels), len(session.edges), session.is_directed
+    options, decision = admission or session_admission(size, include)
+    result = {'session_id': session_id, **(extra or {}), **session.get_properties(fields, include, options)}
+    response = Response(with_admission(result, decision), status=status_code)
+    if decision:
+        response['X-Admission'] = admission_header(decision)
+    return response
+
+def query_list(params, name):
+    """Список через кому з рядка запиту (None, якщо параметра немає)"""
+    value = params.get(name)
+    return [item for item in value.split(',') if item] if value else None
+
+class GraphSessionListView(APIView):
+    """Створення серверної сесії графа: далі клієнт надсилає лише дельти"""
+    def post(self, request):
+        try:
+            data = request.data
+            session_id, session = get_session_registry().create(
+                data.get('nodes', []),
+                data.get('edges', []),
+                data.get('is_directed', False)
+            )
+            with session.lock:
+                return session_response(session_id, session, data.get('fields'), status_code=status.HTTP_201_CREATED)
+        except (KeyError, ValueError) as e:
+            return Response({"error": str(e)}, status=status.HTTP_400_BAD_REQUEST)
+
+class GraphSessionView(APIView):
+    """Стан сесії: ?fields=degrees,adjacency_list - лише ці дешеві властивості (за
+    замовчуванням степені, регулярність і компоненти; матриці - лише за назвою);
+    важкі - через ?include=connectivity,solutions"""
+    def get(self, request, session_id):
+        session = get_session_registry().get(session_id)
+        if session is None:
+            return Response({"error": "Сесію не знайдено"}, status=status.HTTP_404_NOT_FOUND)
+        include = query_list(request.query_params, 'include') or []
+        try:
+            with session.lock:
+                return session_response(session_id, session, query_list(request.query_params, 'fields'), include)
+        except AdmissionRejected as e:
+            return Response({"error": str(e), "admission": e.decision}, status=status.HTTP_422_UNPROCESSABLE_ENTITY)
+        except ValueError as e:
+            return Response({"error": str(e)}, status=status.HTTP_400_BAD_REQUEST)
+
+    def delete(self, request, session_id):
+        if not get_session_registry().delete(session_id):
+            return Response({"error": "Сесію не знайдено"}, status=status.HTTP_404_NOT_FOUND)
+        return Response(status=status.HTTP_204_NO_CONTENT)
+
+class GraphSessionOpsView(APIView):
+    """Застосування дельт: {"ops": [{"op": "add_edge", "id": ..., "from": ..., "to": ...}, ...]}.
+
+    Пачка застосовується атомарно. У відповіді - змінені пачкою дешеві дельти
+    (степені, регулярність, компоненти) та перелік усіх змінених властивостей
+    changed_fields; матриці й список суміжності - лише якщо названі в "fields"."""
+    def post(self, request, session_id):
+        session = get_session_registry().get(session_id)
+        if session is None:
+            return Response({"error": "Сесію не знайдено"}, status=status.HTTP_404_NOT_FOUND)
+        include = request.data.get('include', [])
+        try:
+            with session.lock:
+                ops = request.data.get('ops', [])
+                # Допуск - за розміром графа після пачки, до її застосування
+                changed, V, E = session.check(ops)
+                admission = session_admission((V, E, session.is_directed), include)
+                session.apply(ops)
+                fields = request.data.get('fields')
+                if fields is None:
+                    fields = [name for name in changed if name in session.DEFAULT_FIELDS]
+                return session_response(session_id, session, fields, include,
+                                        {'changed_fields': changed}, admission=admission)
+        except AdmissionRejected as e:
+            return Response({"error": str(e), "admission": e.decision}, status=status.HTTP_422_UNPROCESSABLE_ENTITY)
+        except (KeyError, ValueError) as e:
+            return Response({"error": str(e)}, status=status.HTTP_400_BAD_REQUEST)
+
+class GraphStoreListView(APIView):
+    """Сховище графів: граф завантажується один раз, далі ендпоінти отримують "graph_id"
+    замість nodes/edges"""
+    def get(self, request):
+        return Response({'graphs': [info._asdict() for info in get_graph_store().list()]})
+
+    def post(self, request):
+        data = request.data
+        try:
+            graph = CompactGraph.from_payload(data.get('nodes', []), data.get('edges', []), data.get('is_directed', False))
+        except (KeyError, TypeError, ValueError) as e:
+            return Response({"error": str(e)}, status=status.HTTP_400_BAD_REQUEST)
+        info = get_graph_store().save(graph, name=str(data.get('name', '')))
+        return Response(info._asdict(), status=status.HTTP_201_CREATED)
+
+class GraphImportView(APIView):
+    """Імпорт великого графа у сховище з файла ребер: edgelist ("u v [w]"), csv або mtx (Matrix Market).
+
+    Файл - у полі "file" multipart-форми або сирим тілом запиту; параметри - у рядку запиту:
+    ?file_format=csv&is_directed=1&name=... (формат за замовчуванням - за розширенням файла).
+    Файл розбирається блоками одразу в масиви NumPy, без JSON і словників на кожне ребро.
+    """
+    def post(self, request):
+        params = request.query_params
+        config = getattr(settings, 'GRAPH_STORE', {})
+        chunk_size = config.get('IMPORT_CHUNK_BYTES', 1024 * 1024)
+
+        upload = request.FILES.get('file') if request.content_type.startswith('multipart/') else None
+        if upload is not None:
+            name, chunks = upload.name, upload.chunks(chunk_size)
+        elif request.stream is not None:
+            stream = request.stream
+            name, chunks = '', iter(lambda: stream.read(chunk_size), b'')
+        else:
+            return Response({"error": "Порожній файл"}, status=status.HTTP_400_BAD_REQUEST)
+
+        extension = name.rsplit('.', 1)[-1].lower() if '.' in name else ''
+        fmt = params.get('file_format') or (extension if extension in IMPORT_FORMATS else 'edgelist')
+        is_directed = params.get('is_directed')
+        if is_directed is not None:
+            is_directed = is_directed.lower() in ('1', 'true', 'yes')
+        try:
+            graph = import_graph(chunks, fmt, is_directed, config.get('IMPORT_MAX_EDGES'))
+        except (UnicodeDecodeError, ValueError) as e:
+            return Response({"error": str(e)}, status=status.HTTP_400_BAD_REQUEST)
+        info = get_graph_store().save(graph, name=params.get('name', name))
+        return Response(info._asdict(), status=status.HTTP_201_CREATED)
+
+class GraphStoreView(APIView):
+    def get(self, request, graph_id):
+        info = get_graph_store().info(graph_id)
+        if info is None:
+            return Response({"error": "Граф не знайдено"}, status=status.HTTP_404_NOT_FOUND)
+        return Response(info._asdict())
+
+    def delete(self, request, graph_id):
+        if not get_graph_store().delete(graph_id):
+            return Response({"error": "Граф не знайдено"}, status=status.HTTP_404_NOT_FOUND)
+        return Response(status=status.HTTP_204_NO_CONTENT)
+
+class JobListView(APIView):
+    """Фонова задача: {"kind": "solve" | "analyze", "nodes": [...], "edges": [...], "timeout": 30}"""
+    def post(self, request):
+        data = request.data
+        try:
+            job = get_job_manager().submit(data.get('kind', 'solve'), data, data.get('timeout'))
+        except (TypeError, ValueError) as e:
+            return Response({"error": str(e)}, status=status.HTTP_400_BAD_REQUEST)
+        if job is None:
+            return Response({"error": "Черга задач переповнена, спробуйте пізніше"},
+                            status=status.HTTP_429_TOO_MANY_REQUESTS)
+        return Response(job.snapshot(), status=status.HTTP_202_ACCEPTED)
+
+class JobView(APIView):
+    """Опитування стану задачі (з частковими результатами) та її скасування"""
+    def get(self, request, job_id):
+        job = get_job_manager().get(job_id)
+        if job is None:
+            return Response({"error": "Задачу не знайдено"}, status=status.HTTP_404_NOT_FOUND)
+        return Response(job.snapshot())
+
+    def delete(self, request, job_id):
+        job = get_job_manager().cancel(job_id)
+        if job is None:
+            return Response({"error": "Задачу не знайдено"}, status=status.HTTP_404_NOT_FOUND)
+        return Response(job.snapshot())
+
+class JobStreamView(APIView):
+    """Потік оновлень стану задачі у форматі NDJSON (рядок на кожну зміну)"""
+    def get(self, request, job_id):
+        job = get_job_manager().get(job_id)
+        if job is None:
+            return Response({"error": "Задачу не знайдено"}, status=status.HTTP_404_NOT_FOUND)
+
+        def updates():
+            revision = -1
+            while True:
+                current = job.wait_change(revision, timeout=15)
+                snapshot = job.snapshot()
+                # Без змін за таймаут - порожній рядок підтримує з'єднання
+                yield (json.dumps(snapshot, ensure_ascii=False) if current != revision else '') + '\n'
+                revision = current
+                if snapshot['status'] in FINISHED:
+                    return
+
+        return StreamingHttpResponse(updates(), content_type='application/x-ndjson')
+
+# Операції пакета -> опис обчислення, як в окремих ендпоінтів
+BATCH_TASKS = {
+    'analyze': analyze_task,
+    'solve': solve_task,
+    'dijkstra': dijkstra_task,
+    'floyd': floyd_task,
+    # Елемент пакета вже виконується в процесі пулу - без вкладеного пулу
+    'apsp': lambda data: apsp_task(data, workers=1),
+    'traverse': lambda data: traverse_task(data, data.get('type', 'dfs')),
+}
+
+# error - помилка всього елемента (тоді операції не виконуються)
+BatchPlan = namedtuple('BatchPlan', 'results calls pending error', defaults=(None,))
+
+def plan_batch_item(item):
+    """Операції елемента пакета проходять той самий контроль допуску і мають ті
+    самі ключі кешу, що й окремі запити до ендпоінтів. Готові результати (з
+    кешу, відмови, помилки) - одразу в results, решта - обчислення calls для
+    пулу; pending: номер операції -> (ключ кешу, рішення про допуск)"""
+    if not isinstance(item, dict) or not isinstance(item.get('operations', []), list):
+        return BatchPlan(None, [], {}, "Елемент пакета: {\"graph\": {...}, \"operations\": [...]}")
+    graph = item.get('graph', {})
+    results, calls, pending = [], [], {}
+    for slot, op in enumerate(item.get('operations', [])):
+        results.append(None)
+        try:
+            make = BATCH_TASKS.get(op.get('op'))
+            if make is None:
+                raise ValueError(f"Невідома операція: {op.get('op')}")
+            data = {key: value for key, value in op.items() if key != 'graph_id'}
+            data.update(nodes=graph.get('nodes', []), edges=graph.get('edges', []),
+                        is_directed=graph.get('is_directed', False))
+            task = make(data)
+            key = task_key(task, data)
+            cached = get_result_cache().get(key)
+            if cached is not None:
+                results[slot] = with_admission(cached, task.admission)
+                continue
+            calls.append((slot, task.func, task.args[2:]))
+            pending[slot] = (key, task.admission)
+        except AdmissionRejected as e:
+            results[slot] = {"error": str(e), "admission": e.decision}
         except Exception as e:
-            return Response({"error": str(e)}, status=status.HTTP_400_BAD_REQUEST)
\ No newline at end of file
+            results[slot] = {"error": str(e)}
+    return BatchPlan(results, calls, pending)
+
+def finish_batch_item(plan, done):
+    """Результати пулу -> у відповідь елемента і в кеш результатів"""
+    if plan.error or 'error' in done:
+        return {'index': done['index'], 'error': plan.error or done['error']}
+    cache = get_result_cache()
+    for entry in done['results']:
+        key, admission = plan.pending[entry['slot']]
+        if 'error' in entry:
+            plan.results[entry['slot']] = {"error": entry['error']}
+            continue
+        cache.set(key, entry['result'])
+        plan.results[entry['slot']] = with_admission(entry['result'], admission)
+    return {'index': done['index'], 'results': plan.results}
+
+class BatchView(APIView):
+    """Пакет графів з операціями за один запит.
+
+    {"items": [{"graph": {"nodes": [...], "edges": [...], "is_directed": false},
+                "operations": [{"op": "analyze"}, {"op": "traverse", "type": "bfs", "start_node": 1}]}],
+     "order": "input" | "completed"}
+
+    Відповідь - NDJSON: рядок {"index": i, "results": [...]} на кожен елемент
+    (помилки - в межах елемента чи операції) і підсумковий {"done": true, ...}.
+    Кожна операція проходить контроль допуску і кеш результатів, як окремий
+    запит; у пул процесів потрапляють лише промахи кешу.
+    """
+    def post(self, request):
+        items = request.data.get('items')
+        order = request.data.get('order', 'input')
+        if not isinstance(items, list):
+            return Response({"error": "Очікується список items"}, status=status.HTTP_400_BAD_REQUEST)
+        if order not in BATCH_ORDERS:
+            return Response({"error": f"Невідомий порядок видачі: {order}"}, status=status.HTTP_400_BAD_REQUEST)
+        max_items = getattr(settings, 'GRAPH_BATCH', {}).get('MAX_ITEMS', 10000)
+        if len(items) > max_items:
+            return Response({"error": f"Завеликий пакет: понад {max_items} елементів"},
+                            status=status.HTTP_400_BAD_REQUEST)
+
+        def lines():
+            plans, work = [], []
+            for item in items:
+                plan = plan_batch_item(item)
+                plans.append(plan)
+                work.append({'graph': item.get('graph', {}) if plan.calls else None, 'calls': plan.calls})
+            errors = 0
+            for done in get_batch_runner().run(work, order):
+                result = finish_batch_item(plans[done['index']], done)
+                errors += 'error' in result or any('error' in r for r in result['results'])
+                yield json.dumps(result, ensure_ascii=False) + '\n'
+            yield json.dumps({"done": True, "items": len(items), "failed_items": errors}) + '\n'
+
+        return StreamingHttpResponse(lines(), content_type='application/x-ndjson')
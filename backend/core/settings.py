@@ -39,6 +39,7 @@ MIDDLEWARE = [
     'django.contrib.auth.middleware.AuthenticationMiddleware',
     'django.contrib.messages.middleware.MessageMiddleware',
     'django.middleware.clickjacking.XFrameOptionsMiddleware',
+    'api.metrics.TimingMiddleware',  # Server-Timing і гістограми для /api/
 ]
 
 ROOT_URLCONF = 'core.urls'
@@ -109,4 +110,119 @@ REST_FRAMEWORK = {
         'rest_framework.renderers.JSONRenderer',
         'rest_framework.renderers.BrowsableAPIRenderer', # Для зручного тестування в браузері
     ]
-}
\ No newline at end of file
+}
+
+# --- КЕШ РЕЗУЛЬТАТІВ АЛГОРИТМІВ ---
+# 'memory' - LRU у пам'яті процесу; 'sqlite' - локальний файл, спільний для воркерів
+GRAPH_RESULT_CACHE = {
+    'BACKEND': os.environ.get('GRAPH_CACHE_BACKEND', 'memory'),
+    'PATH': BASE_DIR / 'result_cache.sqlite3',
+    'MAX_ENTRIES': 512,
+    'MAX_BYTES': 64 * 1024 * 1024,
+}
+
+# --- ЗЛИТТЯ ОДНАКОВИХ ОДНОЧАСНИХ ЗАПИТІВ ---
+# Запити з однаковим ключем кешу, що прийшли під час обчислення, чекають на
+# нього замість повторного розрахунку. Між процесами - через файлові
+# блокування в LOCK_DIR (None - лише в межах процесу); RESULT_TTL - скільки
+# секунд опублікований для інших процесів результат лишається на диску
+GRAPH_SINGLE_FLIGHT = {
+    'ENABLED': True,
+    'LOCK_DIR': BASE_DIR / 'singleflight',
+    'RESULT_TTL': 5,
+}
+
+# --- ПОВТОРНЕ ВИКОРИСТАННЯ /solve/ ДЛЯ ІЗОМОРФНИХ ГРАФІВ ---
+# Результати зберігаються в кеші результатів за відбитком Вейсфейлера-Лемана
+# і переносяться на граф з іншими ID після перевірки ізоморфізму. Лише для
+# графів до MAX_VERTICES / MAX_EDGES; BUCKET_SIZE - скільки неізоморфних
+# графів з однаковим відбитком тримати під одним ключем
+GRAPH_ISOMORPHIC_REUSE = {
+    'ENABLED': True,
+    'MAX_VERTICES': 200,
+    'MAX_EDGES': 2000,
+    'BUCKET_SIZE': 4,
+}
+
+# --- СЕРВЕРНІ СЕСІЇ ГРАФІВ ---
+# Сесії зберігаються в пам'яті процесу; TTL - час неактивності в секундах.
+# Сесія тримає щільні матриці суміжності (V^2) та інцидентності (V * E),
+# тож розмір графа однієї сесії обмежено MAX_VERTICES і MAX_EDGES
+GRAPH_SESSIONS = {
+    'MAX_SESSIONS': 256,
+    'TTL': 3600,
+    'MAX_VERTICES': 1000,
+    'MAX_EDGES': 5000,
+}
+
+# --- СХОВИЩЕ ГРАФІВ (/api/graphs/) ---
+# Граф завантажується один раз і далі передається за graph_id; у SQLite
+# зберігаються масиви ребер і готові індекси. LOADED_GRAPHS - скільки
+# розібраних графів тримати в пам'яті процесу. Імпорт файлів ребер
+# (/api/graphs/import/) читає тіло блоками по IMPORT_CHUNK_BYTES
+GRAPH_STORE = {
+    'PATH': BASE_DIR / 'graph_store.sqlite3',
+    'LOADED_GRAPHS': 8,
+    'IMPORT_CHUNK_BYTES': 1024 * 1024,
+    'IMPORT_MAX_EDGES': 20_000_000,
+}
+
+# --- ФОНОВІ ЗАДАЧІ (solve / analyze) ---
+# MAX_WORKERS - одночасних процесів; TIMEOUT - ліміт задачі в секундах;
+# KEEP_FINISHED - скільки секунд зберігати завершені задачі для опитування
+GRAPH_JOBS = {
+    'MAX_WORKERS': 2,
+    'MAX_QUEUED': 32,
+    'TIMEOUT': 60,
+    'KEEP_FINISHED': 600,
+    'START_METHOD': 'spawn',
+}
+
+# --- ПАКЕТНІ ЗАПИТИ (/batch/) ---
+# Елементи пакета виконуються групами по CHUNK_SIZE у пулі з MAX_WORKERS процесів
+GRAPH_BATCH = {
+    'MAX_WORKERS': 2,
+    'MAX_ITEMS': 10000,
+    'CHUNK_SIZE': 16,
+    'START_METHOD': 'spawn',
+}
+
+# --- АСИНХРОННІ ЕНДПОІНТИ (/api/async/...) ---
+# MAX_WORKERS постійних процесів для обчислень; ще MAX_QUEUED запитів чекають
+# у черзі, решта отримує 429
+GRAPH_ASYNC = {
+    'MAX_WORKERS': 2,
+    'MAX_QUEUED': 16,
+    'START_METHOD': 'spawn',
+}
+
+# --- ВІДСТАНІ МІЖ УСІМА ПАРАМИ (/apsp/) ---
+# Запуски Дейкстри з різних джерел розподіляються між WORKERS процесами
+# (для графів від 1000 вершин; у пулі /api/async/ - послідовно)
+GRAPH_APSP = {
+    'WORKERS': 2,
+}
+
+# --- КОНТРОЛЬ ДОПУСКУ ВАЖКИХ ЗАПИТІВ (/floyd/, /apsp/, /analyze/, /solve/) ---
+# Запит з оцінкою часу понад MAX_SECONDS виконується в дешевшому варіанті
+# або відхиляється (422). COST_MODEL - JSON з коефіцієнтами від
+# `manage.py calibrate_costs` (None - вбудовані коефіцієнти)
+GRAPH_ADMISSION = {
+    'ENABLED': True,
+    'MAX_SECONDS': 10,
+    'COST_MODEL': None,
+}
+
+# --- МЕТРИКИ ТА ПРОФІЛЮВАННЯ ---
+# /metrics доступний лише з ALLOWED_IPS. PROFILE_SLOW_MS (мс) вмикає cProfile
+# для частки PROFILE_SAMPLE_RATE запитів; статистика повільніших запитів - у PROFILE_DIR.
+# Профіль охоплює лише синхронну роботу в потоці запиту: ASGI-ланцюжок і маршрути
+# PROFILE_SKIP_PREFIXES (обчислення в пулі процесів) не профілюються, а паралельний
+# APSP (workers > 1) у профілі видно лише як очікування
+GRAPH_METRICS = {
+    'ALLOWED_IPS': ['127.0.0.1', '::1'],
+    'PROFILE_SLOW_MS': float(os.environ['GRAPH_PROFILE_SLOW_MS']) if os.environ.get('GRAPH_PROFILE_SLOW_MS') else None,
+    'PROFILE_SAMPLE_RATE': 0.1,
+    'PROFILE_DIR': BASE_DIR / 'profiles',
+    'PROFILE_SKIP_PREFIXES': ['/api/async/', '/api/jobs/', '/api/batch/'],
+}
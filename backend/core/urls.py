@@ -1,5 +1,6 @@
 from django.contrib import admin
 from django.urls import path, include
+from api.views import MetricsView
 
 urlpatterns = [
     # Стандартна панель адміністратора Django
@@ -9,4 +10,7 @@ urlpatterns = [
     # Тепер всі наші алгоритми будуть доступні за префіксом /api/
     # Наприклад: http://localhost:8000/api/analyze/
     path('api/', include('api.urls')),
+
+    # Метрики для Prometheus (лише локально)
+    path('metrics', MetricsView.as_view()),
 ]
\ No newline at end of file
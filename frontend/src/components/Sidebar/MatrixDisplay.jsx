@@ -1,57 +1,111 @@
-import React from 'react';
+import React, { useState } from 'react';
+
+// Скільки рядків матриці рендерити за раз
+const ROWS_PAGE = 50;
+
+/**
+ * Доступ до рядків матриці незалежно від формату відповіді:
+ * щільний вкладений список або розріджені { format: 'coo' | 'csr', shape, ... }.
+ * Рядок розгортається лише тоді, коли його справді малюють.
+ */
+const matrixRows = (matrix) => {
+  if (Array.isArray(matrix)) {
+    return { count: matrix.length, getRow: (i) => matrix[i] };
+  }
+  const [rowCount, colCount] = matrix.shape;
+  let { indptr, indices, data } = matrix;
+  if (matrix.format === 'coo') {
+    // COO -> CSR підрахунком елементів у рядках
+    indptr = new Array(rowCount + 1).fill(0);
+    matrix.row.forEach(r => { indptr[r + 1] += 1; });
+    for (let i = 0; i < rowCount; i++) indptr[i + 1] += indptr[i];
+    const next = indptr.slice(0, rowCount);
+    indices = new Array(matrix.col.length);
+    data = new Array(matrix.data.length);
+    matrix.row.forEach((r, k) => {
+      indices[next[r]] = matrix.col[k];
+      data[next[r]] = matrix.data[k];
+      next[r] += 1;
+    });
+  }
+  return {
+    count: rowCount,
+    getRow: (i) => {
+      const row = new Array(colCount).fill(0);
+      for (let k = indptr[i]; k < indptr[i + 1]; k++) row[indices[k]] += data[k];
+      return row;
+    }
+  };
+};
+
+const isEmptyMatrix = (matrix) => !matrix || (Array.isArray(matrix) ? matrix.length === 0 : matrix.shape[0] === 0);
 
 const MatrixDisplay = ({ adjMatrix, incMatrix, nodes = [], edges = [], isDirected }) => {
+  const [visibleRows, setVisibleRows] = useState(ROWS_PAGE);
+
   // Якщо snapshot порожній, не рендеримо таблиці, щоб не було розбіжностей
-  if (!adjMatrix || !nodes || nodes.length === 0) return null;
+  if (isEmptyMatrix(adjMatrix) || !nodes || nodes.length === 0) return null;
 
-  const renderTable = (matrix, cols, rows, title) => (
-    <section className="py-8 first:pt-0">
-      <h3 className="font-black text-slate-900 text-sm uppercase tracking-[0.2em] mb-6 px-1">
-        {title}
-      </h3>
-      
-      <div className="overflow-x-auto border-2 border-slate-100 rounded-xl shadow-sm">
-        <table className="w-full text-center border-collapse">
-          <thead>
-            <tr className="bg-slate-50 border-b-2 border-slate-100">
-              <th className="p-4 border-r border-slate-100 bg-slate-100/30 text-[10px] font-black text-slate-400 italic min-w-[60px]">
-                V \ {title.includes('інцидент') ? 'E' : 'V'}
-              </th>
-              {cols.map((c, i) => (
-                <th 
-                  key={i} 
-                  className="p-4 border-r border-slate-100 last:border-0 font-black text-slate-900 text-[11px] uppercase min-w-[50px]"
-                >
-                  {c}
+  const renderTable = (matrix, cols, rows, title) => {
+    const { count, getRow } = matrixRows(matrix);
+    const shown = Math.min(count, visibleRows);
+    return (
+      <section className="py-8 first:pt-0">
+        <h3 className="font-black text-slate-900 text-sm uppercase tracking-[0.2em] mb-6 px-1">
+          {title}
+        </h3>
+        
+        <div className="overflow-x-auto border-2 border-slate-100 rounded-xl shadow-sm">
+          <table className="w-full text-center border-collapse">
+            <thead>
+              <tr className="bg-slate-50 border-b-2 border-slate-100">
+                <th className="p-4 border-r border-slate-100 bg-slate-100/30 text-[10px] font-black text-slate-400 italic min-w-[60px]">
+                  V \ {title.includes('інцидент') ? 'E' : 'V'}
                 </th>
-              ))}
-            </tr>
-          </thead>
-          <tbody className="divide-y divide-slate-100">
-            {matrix.map((row, i) => (
-              <tr key={i} className="hover:bg-slate-50 transition-colors">
-                <td className="p-4 bg-slate-50 border-r border-slate-100 font-black text-slate-900 text-xs">
-                  {rows[i]}
-                </td>
-                {row.map((val, j) => (
-                  <td 
-                    key={j} 
-                    className={`p-4 border-r border-slate-100 last:border-0 font-mono text-sm transition-all ${
-                      val !== 0 
-                        ? "text-indigo-700 font-black bg-indigo-50/30" 
-                        : "text-slate-300"
-                    }`}
+                {cols.map((c, i) => (
+                  <th 
+                    key={i} 
+                    className="p-4 border-r border-slate-100 last:border-0 font-black text-slate-900 text-[11px] uppercase min-w-[50px]"
                   >
-                    {val}
-                  </td>
+                    {c}
+                  </th>
                 ))}
               </tr>
-            ))}
-          </tbody>
-        </table>
-      </div>
-    </section>
-  );
+            </thead>
+            <tbody className="divide-y divide-slate-100">
+              {Array.from({ length: shown }, (_, i) => (
+                <tr key={i} className="hover:bg-slate-50 transition-colors">
+                  <td className="p-4 bg-slate-50 border-r border-slate-100 font-black text-slate-900 text-xs">
+                    {rows[i]}
+                  </td>
+                  {getRow(i).map((val, j) => (
+                    <td 
+                      key={j} 
+                      className={`p-4 border-r border-slate-100 last:border-0 font-mono text-sm transition-all ${
+                        val !== 0 
+                          ? "text-indigo-700 font-black bg-indigo-50/30" 
+                          : "text-slate-300"
+                      }`}
+                    >
+                      {val}
+                    </td>
+                  ))}
+                </tr>
+              ))}
+            </tbody>
+          </table>
+        </div>
+        {shown < count && (
+          <button
+            onClick={() => setVisibleRows(v => v + ROWS_PAGE)}
+            className="mt-4 px-4 py-2 text-xs font-black uppercase tracking-widest text-indigo-700 bg-indigo-50 rounded-lg hover:bg-indigo-100 transition-colors"
+          >
+            Показати ще ({count - shown})
+          </button>
+        )}
+      </section>
+    );
+  };
 
   // Формуємо назви ребер на основі snapshot'а
   const edgeLabels = (edges || []).map(e => {
@@ -73,7 +127,7 @@ const MatrixDisplay = ({ adjMatrix, incMatrix, nodes = [], edges = [], isDirecte
         "Матриця суміжності"
       )}
       
-      {incMatrix && incMatrix.length > 0 && edgeLabels.length > 0 && 
+      {!isEmptyMatrix(incMatrix) && edgeLabels.length > 0 && 
         renderTable(
           incMatrix, 
           edgeLabels, 
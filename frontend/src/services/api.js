@@ -28,11 +28,87 @@ const formatGraphData = (nodes, edges, isDirected) => {
   };
 };
 
+/**
+ * Відновлення повних матриць M і T для кожного кроку Флойда.
+ * У режимі 'delta' сервер надсилає повний крок 0, а далі лише змінені клітинки [i, j, M, T].
+ */
+const replayFloydSteps = (result) => {
+  if (result.history !== 'delta' || !result.steps?.length) return result;
+
+  let M = result.steps[0].M;
+  let T = result.steps[0].T;
+  const steps = [{ M, T }];
+
+  for (const step of result.steps.slice(1)) {
+    M = M.map(row => [...row]);
+    T = T.map(row => [...row]);
+    step.changes.forEach(([i, j, m, t]) => {
+      M[i][j] = m;
+      T[i][j] = t;
+    });
+    steps.push({ M, T });
+  }
+  return { ...result, steps };
+};
+
+/**
+ * Читання NDJSON-потоку обходу (DFS/BFS) з компактними кроками push/pop.
+ * Стек (DFS) або черга (BFS) відновлюється локально, тож результат має той самий
+ * вигляд, що й повний протокол: { protocol, tree_edges }.
+ */
+const readTraversalStream = async (type, payload) => {
+  const response = await fetch(`${API_URL}/traverse/${type}/`, {
+    method: 'POST',
+    headers: { 'Content-Type': 'application/json' },
+    body: JSON.stringify({ ...payload, protocol: 'delta' })
+  });
+  if (!response.ok) throw await response.json();
+
+  const numKey = type === 'dfs' ? 'dfs_num' : 'bfs_num';
+  const containerKey = type === 'dfs' ? 'stack' : 'queue';
+  const container = [];
+  const protocol = [];
+  const tree_edges = [];
+
+  const applyStep = (step) => {
+    if (step.done) return;
+    if ('push' in step) container.push(step.push);
+    else if (type === 'dfs') container.pop();
+    else container.shift();
+    if (step.tree) tree_edges.push(step.tree);
+    protocol.push({
+      vertex: step.vertex,
+      [numKey]: step[numKey],
+      [containerKey]: container.length ? [...container] : '∅',
+      tree_edge: step.tree_edge,
+      edge_id: step.edge_id
+    });
+  };
+
+  const reader = response.body.getReader();
+  const decoder = new TextDecoder();
+  let buffer = '';
+  for (;;) {
+    const { value, done } = await reader.read();
+    buffer += decoder.decode(value || new Uint8Array(), { stream: !done });
+    const lines = buffer.split('\n');
+    buffer = lines.pop();
+    lines.filter(line => line.trim()).forEach(line => applyStep(JSON.parse(line)));
+    if (done) break;
+  }
+  if (buffer.trim()) applyStep(JSON.parse(buffer));
+  return { protocol, tree_edges };
+};
+
 export const graphApi = {
   // 1. Отримання базових характеристик (матриці, степені, зв'язність)
   analyze: async (nodes, edges, isDirected) => {
     try {
-      const response = await apiClient.post('/analyze/', formatGraphData(nodes, edges, isDirected));
+      // Матриці приходять у розрідженому CSR - MatrixDisplay розгортає лише видимі рядки
+      const response = await apiClient.post('/analyze/', {
+        ...formatGraphData(nodes, edges, isDirected),
+        matrix_format: 'csr'
+      });
       return response.data;
     } catch (error) {
       console.error("Помилка при аналізі графа:", error);
@@ -72,8 +148,11 @@ runDijkstra: async (nodes, edges, isDirected, startNode, endNode) => {
   // Алгоритм Флойда-Уоршелла
   runFloyd: async (nodes, edges, isDirected) => {
     try {
-      const response = await apiClient.post('/floyd/', formatGraphData(nodes, edges, isDirected));
-      return response.data;
+      const response = await apiClient.post('/floyd/', {
+        ...formatGraphData(nodes, edges, isDirected),
+        history: 'delta'
+      });
+      return replayFloydSteps(response.data);
     } catch (error) {
       throw error.response?.data || { error: "Помилка в алгоритмі Флойда" };
     }
@@ -86,10 +165,9 @@ runDijkstra: async (nodes, edges, isDirected, startNode, endNode) => {
         ...formatGraphData(nodes, edges, isDirected),
         start_node: startNode
       };
-      const response = await apiClient.post('/traverse/dfs/', payload);
-      return response.data;
+      return await readTraversalStream('dfs', payload);
     } catch (error) {
-      throw error.response?.data || { error: "Помилка в алгоритмі DFS" };
+      throw error.error ? error : { error: "Помилка в алгоритмі DFS" };
     }
   },
 
@@ -100,10 +178,9 @@ runDijkstra: async (nodes, edges, isDirected, startNode, endNode) => {
         ...formatGraphData(nodes, edges, isDirected),
         start_node: startNode
       };
-      const response = await apiClient.post('/traverse/bfs/', payload);
-      return response.data;
+      return await readTraversalStream('bfs', payload);
     } catch (error) {
-      throw error.response?.data || { error: "Помилка в алгоритмі BFS" };
+      throw error.error ? error : { error: "Помилка в алгоритмі BFS" };
     }
   }
 };
\ No newline at end of file